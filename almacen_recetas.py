@@ -0,0 +1,106 @@
+import json
+import os
+from receta import Receta
+from unidades import normalizar
+from busqueda import IndiceBusqueda
+
+"""almacén compartido de recetas: lee recetas.json una sola vez y lo vuelve a leer solo si el archivo cambia"""
+class AlmacenRecetas:
+    def __init__(self, ruta="recetas.json"):
+        self.ruta = ruta
+        self._firma = None  # (mtime, tamaño) del archivo cuando se leyó
+        self._recetas = []
+        self._por_id = {}
+        self._por_nombre = {}
+        self._por_reactivo = {}
+        self._requerimientos = {}
+        self._busqueda = None
+        self._recetas_busqueda = None  # lista de recetas con la que se armó el índice de búsqueda
+
+    def _actualizar(self):
+        """vuelve a leer el archivo solo si cambió su fecha de modificación o su tamaño"""
+        estado = os.stat(self.ruta)
+        firma = (estado.st_mtime_ns, estado.st_size)
+        if firma == self._firma:
+            return
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            recetas = json.load(f)
+        if not isinstance(recetas, list):
+            raise ValueError("el formato de los datos en recetas.json es incorrecto")
+        self._recetas = recetas
+        self._por_id = {r["id"]: r for r in recetas}
+        self._por_nombre = {r["nombre"]: r for r in recetas}
+        self._por_reactivo = {}
+        for receta in recetas:
+            for reactivo in receta["reactivos_utilizados"]:
+                self._por_reactivo.setdefault(reactivo["reactivo_id"], {})[receta["id"]] = receta
+        """todas las cantidades de todas las recetas se pasan a unidades base en una sola operación"""
+        usos = [(receta["id"], r) for receta in recetas for r in receta["reactivos_utilizados"]]
+        cantidades_base = normalizar([r["cantidad_necesaria"] for _, r in usos], [r["unidad_medida"] for _, r in usos])
+        self._requerimientos = {r["id"]: [] for r in recetas}
+        for (receta_id, reactivo), cantidad in zip(usos, cantidades_base):
+            self._requerimientos[receta_id].append((reactivo["reactivo_id"], cantidad))
+        self._firma = firma
+
+    def invalidar(self):
+        """obliga a releer el archivo en el próximo acceso"""
+        self._firma = None
+
+    def recetas(self):
+        """devuelve todas las recetas como diccionarios"""
+        self._actualizar()
+        return self._recetas
+
+    def obtener_por_id(self, receta_id):
+        self._actualizar()
+        return self._por_id.get(receta_id)
+
+    def obtener_por_nombre(self, nombre):
+        self._actualizar()
+        return self._por_nombre.get(nombre)
+
+    def recetas_con_reactivo(self, reactivo_id):
+        """recetas que usan ese reactivo"""
+        self._actualizar()
+        return list(self._por_reactivo.get(reactivo_id, {}).values())
+
+    def requerimientos_base(self, receta_id):
+        """lista de (reactivo_id, cantidad en unidades base) de la receta, o None si no existe"""
+        self._actualizar()
+        return self._requerimientos.get(receta_id)
+
+    def busqueda(self):
+        """índice de búsqueda aproximada por nombre y objetivo; se rearma solo si el archivo cambió"""
+        recetas = self.recetas()
+        if recetas is not self._recetas_busqueda:
+            self._busqueda = IndiceBusqueda()
+            self._busqueda.cargar((r["id"], r["nombre"], (r.get("objetivo", ""),)) for r in recetas)
+            self._recetas_busqueda = recetas
+        return self._busqueda
+
+    def buscar_aproximado(self, texto, cantidad=10):
+        """[(receta, puntaje)] con los nombres más parecidos al texto"""
+        return [(self._por_id[i], puntaje) for i, puntaje in self.busqueda().buscar(texto, cantidad)]
+
+    def autocompletar(self, prefijo, cantidad=10):
+        return [self._por_id[i] for i in self.busqueda().autocompletar(prefijo, cantidad)]
+
+    def obtener_receta(self, receta_id):
+        """devuelve la receta con ese ID como objeto Receta, o None"""
+        datos = self.obtener_por_id(receta_id)
+        if datos is None:
+            return None
+        return Receta(
+            datos["id"], datos["nombre"], datos["objetivo"], datos["reactivos_utilizados"],
+            datos["procedimiento"], datos.get("valores_a_medir", []), self._requerimientos[receta_id]
+        )
+
+
+_almacenes = {}
+
+def obtener_almacen_recetas(ruta="recetas.json"):
+    """devuelve el almacén compartido para esa ruta, creándolo la primera vez"""
+    clave = os.path.abspath(ruta)
+    if clave not in _almacenes:
+        _almacenes[clave] = AlmacenRecetas(ruta)
+    return _almacenes[clave]
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+from almacenamiento_sqlite import AlmacenamientoSQLite
+from lector_json import iterar_registros, validar_registros
+from instrumentacion import contar_bytes
+
+"""formas de persistir las colecciones del laboratorio (reactivos, experimentos, resultados)"""
+
+
+def cambio_guardar(registro):
+    """cambio que agrega o reemplaza un registro identificado por su "id" """
+    return {"op": "put", "registro": registro}
+
+def cambio_eliminar(registro_id):
+    """cambio que elimina el registro con ese "id" """
+    return {"op": "del", "id": registro_id}
+
+def cambio_agregar(registro):
+    """cambio que agrega un registro sin clave (por ejemplo un resultado)"""
+    return {"op": "add", "registro": registro}
+
+
+def escribir_atomico(ruta, datos):
+    """escribe el json en un archivo temporal y lo renombra, así nunca queda un archivo a medias"""
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+    contar_bytes("escritos", ruta)
+
+
+def firma_archivo(ruta):
+    """hash del contenido del archivo, o None si no existe"""
+    try:
+        with open(ruta, "rb") as f:
+            h = hashlib.blake2b(digest_size=16)
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+    except FileNotFoundError:
+        return None
+    return h.hexdigest()
+
+
+class AlmacenamientoJSON:
+    """guarda cada colección como un archivo json completo (reescribe todo en cada guardado)"""
+    GUARDADO_EN_SEGUNDO_PLANO = True  # ver ContextoLaboratorio.activar_guardado_automatico
+
+    def cargar(self, ruta):
+        """devuelve la lista de registros del archivo; lanza FileNotFoundError si no existe"""
+        return list(self.iterar(ruta))
+
+    def iterar(self, ruta, campos_requeridos=()):
+        """recorre los registros del archivo (arreglo json o json lines) sin cargarlo entero, validando cada uno"""
+        return iterar_registros(ruta, campos_requeridos)
+
+    def guardar(self, ruta, registros):
+        """reescribe la colección completa, de forma atómica"""
+        escribir_atomico(ruta, registros)
+
+    def guardar_cambios(self, ruta, cambios, obtener_todos):
+        """persiste una lista de cambios; aquí equivale a reescribir la colección completa"""
+        self.guardar(ruta, obtener_todos())
+
+
+class AlmacenamientoDiario(AlmacenamientoJSON):
+    """guarda un snapshot json más un diario de cambios (json lines) que se compacta periódicamente.
+    la primera línea del diario dice sobre qué snapshot se escribió (un hash de su contenido): si al cargar no
+    coincide con el snapshot actual, el diario ya estaba incluido en él (la compactación se cortó después de
+    reemplazar el snapshot y antes de reemplazar el diario) y no se vuelve a aplicar"""
+    GUARDADO_EN_SEGUNDO_PLANO = False
+
+    def __init__(self, umbral_compactacion=1000):
+        self.umbral_compactacion = umbral_compactacion
+        self._lineas_diario = {}
+
+    def ruta_diario(self, ruta):
+        return ruta + ".log"
+
+    def cargar(self, ruta):
+        """carga el snapshot y le aplica los cambios del diario en orden"""
+        return list(self.iterar(ruta))
+
+    def iterar(self, ruta, campos_requeridos=()):
+        """el diario (que la compactación mantiene pequeño) se lee entero ahora; el snapshot se recorre por
+        partes y a cada registro se le aplica el último cambio de su id"""
+        cambios, agregados = self._leer_diario(ruta)
+        try:
+            registros = super().iterar(ruta)
+        except FileNotFoundError:
+            if not os.path.exists(self.ruta_diario(ruta)):
+                raise
+            registros = []
+        return validar_registros(self._aplicar(registros, cambios, agregados), campos_requeridos, ruta)
+
+    def _aplicar(self, registros, cambios, agregados):
+        """los registros del snapshot quedan en su lugar (reemplazados o quitados); los que solo están en el
+        diario van al final, en el orden en que aparecieron"""
+        for registro in registros:
+            if isinstance(registro, dict) and "id" in registro and registro["id"] in cambios:
+                registro = cambios.pop(registro["id"])
+                if registro is None:
+                    continue
+            yield registro
+        for clave, registro in agregados:
+            if clave is None:
+                yield registro
+            elif cambios.get(clave) is not None:
+                yield cambios.pop(clave)
+
+    def _leer_diario(self, ruta):
+        """devuelve el último cambio por id (None si se eliminó) y la lista de los que no están en el snapshot
+        como pares (id, registro), con id None para los registros sin clave"""
+        cambios = {}
+        agregados = []
+        lineas = 0
+        vigente = True
+        try:
+            with open(self.ruta_diario(ruta), "r+b") as f:
+                while True:
+                    inicio = f.tell()
+                    linea = f.readline()
+                    if not linea:
+                        break
+                    """solo la última línea puede haber quedado a medias (sin su salto de línea) por una escritura
+                    interrumpida; esa se descarta. una línea dañada en el medio es un error: lo que sigue ya se
+                    había guardado y no se puede perder"""
+                    try:
+                        cambio = json.loads(linea.decode("utf-8"))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        if linea.endswith(b"\n"):
+                            raise ValueError(f"el diario {self.ruta_diario(ruta)} está dañado (byte {inicio})")
+                        f.truncate(inicio)
+                        break
+                    if not linea.endswith(b"\n"):
+                        f.write(b"\n")  # se cortó justo antes del salto de línea; el próximo cambio va en otra línea
+                    if cambio["op"] == "base":
+                        if inicio == 0 and cambio["firma"] != firma_archivo(ruta):
+                            vigente = False
+                            break
+                        continue
+                    lineas += 1
+                    if cambio["op"] == "put":
+                        clave = cambio["registro"]["id"]
+                        if cambios.get(clave) is None:
+                            agregados.append((clave, None))
+                        cambios[clave] = cambio["registro"]
+                    elif cambio["op"] == "del":
+                        cambios[cambio["id"]] = None
+                    elif cambio["op"] == "add":
+                        agregados.append((None, cambio["registro"]))
+        except FileNotFoundError:
+            pass
+        if not vigente:
+            """el diario es de un snapshot anterior y ya está incluido en el actual: se descarta"""
+            self._escribir_diario(ruta, firma_archivo(ruta))
+            return {}, []
+        self._lineas_diario[ruta] = lineas
+        return cambios, agregados
+
+    def _escribir_diario(self, ruta, firma):
+        """deja un diario vacío para el snapshot con esa firma, reemplazándolo de forma atómica"""
+        temporal = self.ruta_diario(ruta) + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "base", "firma": firma}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta_diario(ruta))
+        self._lineas_diario[ruta] = 0
+
+    def guardar(self, ruta, registros):
+        """compacta: escribe el snapshot de forma atómica y después lo reemplaza el diario por uno vacío que
+        apunta a él; si se corta en el medio, el diario viejo queda apuntando al snapshot anterior y se ignora"""
+        escribir_atomico(ruta, registros)
+        self._escribir_diario(ruta, firma_archivo(ruta))
+
+    def guardar_cambios(self, ruta, cambios, obtener_todos):
+        """agrega los cambios al diario; si este crece demasiado se compacta"""
+        with open(self.ruta_diario(ruta), "a", encoding="utf-8") as f:
+            inicio = f.tell()
+            if inicio == 0:
+                f.write(json.dumps({"op": "base", "firma": firma_archivo(ruta)}) + "\n")
+            for cambio in cambios:
+                f.write(json.dumps(cambio, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+            contar_bytes("escritos", self.ruta_diario(ruta), f.tell() - inicio)
+        self._lineas_diario[ruta] = self._lineas_diario.get(ruta, 0) + len(cambios)
+        if self._lineas_diario[ruta] >= self.umbral_compactacion:
+            self.guardar(ruta, obtener_todos())
+
+
+def crear_almacenamiento(modo=None):
+    """crea el almacenamiento indicado o el de la variable de entorno LAB_ALMACENAMIENTO (json por defecto)"""
+    modo = modo or os.environ.get("LAB_ALMACENAMIENTO", "json")
+    if modo == "diario":
+        return AlmacenamientoDiario()
+    if modo == "sqlite":
+        return AlmacenamientoSQLite(os.environ.get("LAB_BD", "laboratorio.db"))
+    if modo == "json":
+        return AlmacenamientoJSON()
+    raise ValueError(f"modo de almacenamiento desconocido: {modo}")
@@ -0,0 +1,293 @@
+import json
+import os
+import sqlite3
+from lector_json import iterar_registros, validar_registros
+
+"""almacenamiento de las colecciones del laboratorio en una base de datos sqlite (modo WAL)"""
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS reactivos (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    descripcion TEXT,
+    costo REAL,
+    categoria TEXT,
+    inventario_disponible REAL,
+    unidad_medida TEXT,
+    fecha_caducidad TEXT,
+    minimo_sugerido REAL,
+    conversiones_posibles TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reactivos_nombre ON reactivos(nombre);
+CREATE INDEX IF NOT EXISTS idx_reactivos_categoria ON reactivos(categoria);
+
+CREATE TABLE IF NOT EXISTS recetas (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    objetivo TEXT,
+    procedimiento TEXT,
+    valores_a_medir TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_recetas_nombre ON recetas(nombre);
+
+CREATE TABLE IF NOT EXISTS receta_reactivos (
+    receta_id INTEGER NOT NULL REFERENCES recetas(id) ON DELETE CASCADE,
+    posicion INTEGER NOT NULL,
+    reactivo_id INTEGER NOT NULL,
+    cantidad_necesaria REAL,
+    unidad_medida TEXT,
+    PRIMARY KEY (receta_id, posicion)
+);
+CREATE INDEX IF NOT EXISTS idx_receta_reactivos_reactivo ON receta_reactivos(reactivo_id);
+
+CREATE TABLE IF NOT EXISTS experimentos (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT,
+    receta_id INTEGER,
+    fecha TEXT,
+    costo_asociado REAL,
+    resultado TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_experimentos_receta ON experimentos(receta_id);
+CREATE INDEX IF NOT EXISTS idx_experimentos_fecha ON experimentos(fecha);
+CREATE INDEX IF NOT EXISTS idx_experimentos_nombre ON experimentos(nombre);
+
+CREATE TABLE IF NOT EXISTS experimento_responsables (
+    experimento_id INTEGER NOT NULL REFERENCES experimentos(id) ON DELETE CASCADE,
+    posicion INTEGER NOT NULL,
+    persona TEXT NOT NULL,
+    PRIMARY KEY (experimento_id, posicion)
+);
+CREATE INDEX IF NOT EXISTS idx_responsables_persona ON experimento_responsables(persona);
+"""
+
+"""experimento va sin tipo para que se guarde tal cual: es el nombre del experimento o, si no tiene, su id.
+las bases de datos anteriores tenían solo (experimento TEXT, evaluacion) y se convierten al abrirlas"""
+TABLA_RESULTADOS = """
+CREATE TABLE IF NOT EXISTS resultados (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    experimento_id INTEGER,
+    experimento,
+    evaluacion TEXT,
+    valores TEXT
+)
+"""
+INDICES_RESULTADOS = """
+CREATE INDEX IF NOT EXISTS idx_resultados_experimento_id ON resultados(experimento_id);
+CREATE INDEX IF NOT EXISTS idx_resultados_experimento ON resultados(experimento);
+"""
+
+COLECCIONES = ("reactivos", "recetas", "experimentos", "resultados")
+
+
+class AlmacenamientoSQLite:
+    """guarda reactivos, recetas, experimentos y resultados en tablas indexadas de sqlite"""
+
+    def __init__(self, ruta_bd="laboratorio.db"):
+        self.ruta_bd = ruta_bd
+        self.conexion = sqlite3.connect(ruta_bd)
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.execute("PRAGMA foreign_keys=ON")
+        self.conexion.executescript(ESQUEMA)
+        self._preparar_resultados()
+        self._recetas_sincronizadas = None  # lista de recetas copiada por última vez a la base de datos
+
+    def _preparar_resultados(self):
+        """crea la tabla de resultados o convierte la de una base de datos anterior, conservando sus filas"""
+        columnas = {f["name"] for f in self.conexion.execute("PRAGMA table_info(resultados)")}
+        with self.conexion:
+            if columnas and "experimento_id" not in columnas:
+                self.conexion.execute("ALTER TABLE resultados RENAME TO resultados_anteriores")
+                self.conexion.execute(TABLA_RESULTADOS)
+                self.conexion.execute("INSERT INTO resultados (id, experimento, evaluacion) "
+                                      "SELECT id, experimento, evaluacion FROM resultados_anteriores")
+                self.conexion.execute("DROP TABLE resultados_anteriores")
+            else:
+                self.conexion.execute(TABLA_RESULTADOS)
+        self.conexion.executescript(INDICES_RESULTADOS)
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def _coleccion(self, ruta):
+        """traduce la ruta del archivo json (p. ej. "reactivos.json") al nombre de la tabla"""
+        coleccion = os.path.splitext(os.path.basename(ruta))[0]
+        if coleccion not in COLECCIONES:
+            raise ValueError(f"colección desconocida: {ruta}")
+        return coleccion
+
+    """interfaz común de almacenamiento (cargar, guardar, guardar_cambios)"""
+
+    def cargar(self, ruta):
+        """devuelve la colección como lista de diccionarios con el mismo formato que el json"""
+        coleccion = self._coleccion(ruta)
+        if coleccion == "reactivos":
+            return [self._fila_a_reactivo(f) for f in self.conexion.execute("SELECT * FROM reactivos ORDER BY id")]
+        if coleccion == "recetas":
+            return [self._fila_a_receta(f) for f in self.conexion.execute("SELECT * FROM recetas ORDER BY id")]
+        if coleccion == "experimentos":
+            responsables = {}
+            for fila in self.conexion.execute("SELECT experimento_id, persona FROM experimento_responsables ORDER BY experimento_id, posicion"):
+                responsables.setdefault(fila["experimento_id"], []).append(fila["persona"])
+            return [self._fila_a_experimento(f, responsables.get(f["id"], [])) for f in self.conexion.execute("SELECT * FROM experimentos ORDER BY id")]
+        return [self._fila_a_resultado(f) for f in self.conexion.execute("SELECT * FROM resultados ORDER BY id")]
+
+    def iterar(self, ruta, campos_requeridos=()):
+        """recorre la colección validando cada registro, igual que el almacenamiento json"""
+        return validar_registros(self.cargar(ruta), campos_requeridos, ruta)
+
+    def guardar(self, ruta, registros):
+        """reemplaza la colección completa dentro de una transacción"""
+        coleccion = self._coleccion(ruta)
+        with self.conexion:
+            if coleccion == "recetas":
+                self.conexion.execute("DELETE FROM receta_reactivos")
+            if coleccion == "experimentos":
+                self.conexion.execute("DELETE FROM experimento_responsables")
+            self.conexion.execute(f"DELETE FROM {coleccion}")
+            for registro in registros:
+                self._insertar(coleccion, registro)
+
+    def guardar_cambios(self, ruta, cambios, obtener_todos):
+        """aplica solo los cambios (upsert, borrado o inserción) en una transacción"""
+        coleccion = self._coleccion(ruta)
+        with self.conexion:
+            for cambio in cambios:
+                if cambio["op"] == "del":
+                    self._eliminar(coleccion, cambio["id"])
+                else:
+                    self._insertar(coleccion, cambio["registro"])
+
+    def importar_json(self, directorio="."):
+        """importa de una sola vez los archivos json (o json lines) existentes a la base de datos"""
+        for coleccion in COLECCIONES:
+            ruta = os.path.join(directorio, f"{coleccion}.json")
+            try:
+                registros = iterar_registros(ruta)  # se insertan a medida que se leen
+            except FileNotFoundError:
+                print(f"no se encontró {ruta}, se omite")
+                continue
+            self.guardar(ruta, registros)
+            total = self.conexion.execute(f"SELECT COUNT(*) FROM {coleccion}").fetchone()[0]
+            print(f"{total} registros importados de {ruta}")
+
+    def sincronizar_recetas(self, recetas):
+        """copia las recetas (las de recetas.json, que el almacén de recetas lee) a sus tablas, que usa
+        contar_uso_reactivos; solo si la lista cambió desde la última vez, es decir si se releyó el archivo"""
+        if recetas is not self._recetas_sincronizadas:
+            self.guardar("recetas.json", recetas)
+            self._recetas_sincronizadas = recetas
+
+    """consultas indexadas para las estadísticas; las búsquedas de un reactivo o una receta las resuelven los
+    índices en memoria del contexto, y un descuento de inventario se guarda como el reemplazo de una sola
+    fila por su id (guardar_cambios)"""
+
+    def contar_por_investigador(self):
+        """{persona: número de experimentos}"""
+        return {f["persona"]: f["n"] for f in self.conexion.execute(
+            "SELECT persona, COUNT(*) AS n FROM experimento_responsables GROUP BY persona")}
+
+    def contar_por_receta(self):
+        """{receta_id: número de experimentos}"""
+        return {f["receta_id"]: f["n"] for f in self.conexion.execute(
+            "SELECT receta_id, COUNT(*) AS n FROM experimentos GROUP BY receta_id")}
+
+    def contar_uso_reactivos(self):
+        """{reactivo_id: veces que aparece en las recetas de los experimentos realizados}"""
+        return {f["reactivo_id"]: f["n"] for f in self.conexion.execute(
+            "SELECT rr.reactivo_id, COUNT(*) AS n FROM experimentos e "
+            "JOIN receta_reactivos rr ON rr.receta_id = e.receta_id GROUP BY rr.reactivo_id")}
+
+    """conversión entre filas y registros"""
+
+    def _insertar(self, coleccion, r):
+        if coleccion == "reactivos":
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO reactivos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (r["id"], r["nombre"], r["descripcion"], r["costo"], r["categoria"],
+                 r["inventario_disponible"], r["unidad_medida"], r["fecha_caducidad"],
+                 r["minimo_sugerido"], json.dumps(r["conversiones_posibles"]))
+            )
+        elif coleccion == "recetas":
+            self.conexion.execute("DELETE FROM receta_reactivos WHERE receta_id = ?", (r["id"],))
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO recetas VALUES (?, ?, ?, ?, ?)",
+                (r["id"], r["nombre"], r.get("objetivo"), json.dumps(r.get("procedimiento", []), ensure_ascii=False),
+                 json.dumps(r.get("valores_a_medir", []), ensure_ascii=False))
+            )
+            self.conexion.executemany(
+                "INSERT INTO receta_reactivos VALUES (?, ?, ?, ?, ?)",
+                [(r["id"], i, u["reactivo_id"], u["cantidad_necesaria"], u["unidad_medida"])
+                 for i, u in enumerate(r.get("reactivos_utilizados", []))]
+            )
+        elif coleccion == "experimentos":
+            self.conexion.execute("DELETE FROM experimento_responsables WHERE experimento_id = ?", (r["id"],))
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO experimentos VALUES (?, ?, ?, ?, ?, ?)",
+                (r["id"], r.get("nombre"), r["receta_id"], r["fecha"], r["costo_asociado"],
+                 json.dumps(r["resultado"], ensure_ascii=False))
+            )
+            self.conexion.executemany(
+                "INSERT INTO experimento_responsables VALUES (?, ?, ?)",
+                [(r["id"], i, persona) for i, persona in enumerate(r["personas_responsables"])]
+            )
+        else:
+            self.conexion.execute(
+                "INSERT INTO resultados (experimento_id, experimento, evaluacion, valores) VALUES (?, ?, ?, ?)",
+                (r.get("experimento_id"), r["experimento"], json.dumps(r["evaluacion"], ensure_ascii=False),
+                 json.dumps(r["valores"], ensure_ascii=False) if "valores" in r else None)
+            )
+
+    def _eliminar(self, coleccion, registro_id):
+        if coleccion == "recetas":
+            self.conexion.execute("DELETE FROM receta_reactivos WHERE receta_id = ?", (registro_id,))
+        elif coleccion == "experimentos":
+            self.conexion.execute("DELETE FROM experimento_responsables WHERE experimento_id = ?", (registro_id,))
+        self.conexion.execute(f"DELETE FROM {coleccion} WHERE id = ?", (registro_id,))
+
+    def _fila_a_reactivo(self, f):
+        return {
+            "id": f["id"], "nombre": f["nombre"], "descripcion": f["descripcion"], "costo": f["costo"],
+            "categoria": f["categoria"], "inventario_disponible": f["inventario_disponible"],
+            "unidad_medida": f["unidad_medida"], "fecha_caducidad": f["fecha_caducidad"],
+            "minimo_sugerido": f["minimo_sugerido"], "conversiones_posibles": json.loads(f["conversiones_posibles"])
+        }
+
+    def _fila_a_receta(self, f):
+        reactivos = [
+            {"reactivo_id": u["reactivo_id"], "cantidad_necesaria": u["cantidad_necesaria"], "unidad_medida": u["unidad_medida"]}
+            for u in self.conexion.execute("SELECT * FROM receta_reactivos WHERE receta_id = ? ORDER BY posicion", (f["id"],))
+        ]
+        return {
+            "id": f["id"], "nombre": f["nombre"], "objetivo": f["objetivo"], "reactivos_utilizados": reactivos,
+            "procedimiento": json.loads(f["procedimiento"]), "valores_a_medir": json.loads(f["valores_a_medir"])
+        }
+
+    def _fila_a_experimento(self, f, responsables):
+        experimento = {
+            "id": f["id"], "receta_id": f["receta_id"], "personas_responsables": responsables,
+            "fecha": f["fecha"], "costo_asociado": f["costo_asociado"], "resultado": json.loads(f["resultado"])
+        }
+        if f["nombre"] is not None:
+            experimento["nombre"] = f["nombre"]
+        return experimento
+
+    def _fila_a_resultado(self, f):
+        """mismo formato que resultados.json; experimento_id y valores solo si se guardaron"""
+        resultado = {"experimento": f["experimento"]}
+        if f["experimento_id"] is not None:
+            resultado["experimento_id"] = f["experimento_id"]
+        resultado["evaluacion"] = json.loads(f["evaluacion"])
+        if f["valores"] is not None:
+            resultado["valores"] = json.loads(f["valores"])
+        return resultado
+
+
+if __name__ == "__main__":
+    """importa los json del directorio actual: python almacenamiento_sqlite.py [ruta_bd]"""
+    import sys
+    almacenamiento = AlmacenamientoSQLite(sys.argv[1] if len(sys.argv) > 1 else "laboratorio.db")
+    almacenamiento.importar_json()
+    almacenamiento.cerrar()
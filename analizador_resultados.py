@@ -0,0 +1,141 @@
+import re
+import numpy as np
+from texto import plegar
+
+"""lectura de resultados escritos en texto libre, por ejemplo "pH final: 7.0, rendimiento: 92%. Dentro de parámetros."
+para cada receta se compilan una sola vez las expresiones que buscan sus valores_a_medir en el texto: el nombre
+del valor (pH_final) se busca como etiqueta (pH ... final) y se toma el primer número que la sigue en la misma frase.
+si el nombre completo no aparece se prueba con cada palabra por separado (Normalidad KMnO4 = 0.15 para
+normalidad_permanganato). las palabras se comparan sin tildes ni mayúsculas y por su raíz (sulfato → Sulfatos)"""
+
+NUMERO = r"(?<![\w.])(?P<valor>[-+]?\d+(?:\.\d+)?(?:e[-+]?\d+)?)"
+RELLENO = r"(?:[^,;.]|\.(?=\S))*?"  # lo que hay entre la etiqueta y el número, sin pasar a otra frase
+ENTRE_PALABRAS = r"\W+(?:\w+\W+){0,2}?"  # hasta dos palabras intercaladas (Masa de precipitado)
+
+
+def _raiz(palabra):
+    """quita las dos últimas letras a las palabras largas para aceptar plurales y variantes (lactica → láctico)"""
+    return palabra if len(palabra) <= 4 else palabra[:max(4, len(palabra) - 2)]
+
+
+def compilar_patrones(nombre):
+    """expresiones para un valor a medir, de la más a la menos específica"""
+    palabras = [re.escape(_raiz(p)) + r"\w*" for p in plegar(nombre).split("_") if p]
+    etiquetas = [ENTRE_PALABRAS.join(palabras)] if len(palabras) > 1 else []
+    etiquetas += palabras
+    return [re.compile(r"\b" + etiqueta + RELLENO + NUMERO) for etiqueta in etiquetas]
+
+
+def compilar_extractores(valores_a_medir):
+    """[(nombre, minimo, maximo, patrones)] en el orden de la receta"""
+    return [(v["nombre"], v.get("minimo"), v.get("maximo"), compilar_patrones(v["nombre"])) for v in valores_a_medir]
+
+
+def extraer(texto, extractores):
+    """tupla con el valor medido de cada extractor (None si no aparece en el texto)"""
+    texto = plegar(texto)
+    valores = []
+    for _, _, _, patrones in extractores:
+        valor = None
+        for patron in patrones:
+            encontrado = patron.search(texto)
+            if encontrado:
+                valor = float(encontrado.group("valor"))
+                break
+        valores.append(valor)
+    return tuple(valores)
+
+
+def valores_de_dict(resultado, extractores):
+    """lo mismo que extraer para un resultado que ya viene como diccionario {parámetro: valor}"""
+    valores = []
+    for nombre, _, _, _ in extractores:
+        valor = resultado.get(nombre)
+        valores.append(float(valor) if isinstance(valor, (int, float)) and not isinstance(valor, bool) else None)
+    return tuple(valores)
+
+
+def medir(resultado, extractores):
+    """valores medidos de un resultado en texto o en diccionario; de cualquier otra cosa no se mide nada"""
+    if isinstance(resultado, str):
+        return extraer(resultado, extractores)
+    if isinstance(resultado, dict):
+        return valores_de_dict(resultado, extractores)
+    return (None,) * len(extractores)
+
+
+class AnalizadorResultados:
+    """extrae las mediciones de los experimentos con los extractores de cada receta (compilados la primera vez
+    que se usan) y las guarda por ID de experimento; mientras el resultado y la receta no cambien, volver a
+    evaluar o calcular estadísticas no vuelve a leer el texto. si el almacén relee recetas.json las recetas son
+    diccionarios nuevos, y con eso se recompilan sus extractores y se vuelven a medir sus experimentos"""
+
+    def __init__(self, almacen_recetas):
+        self.almacen_recetas = almacen_recetas
+        self._extractores = {}  # receta_id: (receta con la que se compilaron, extractores)
+        self._mediciones = {}  # experimento_id: (resultado, receta_id, extractores, valores)
+
+    def extractores(self, receta_id):
+        """extractores de la receta; se compilan la primera vez que se piden y otra vez si la receta cambió"""
+        receta = self.almacen_recetas.obtener_por_id(receta_id)
+        compilados = self._extractores.get(receta_id)
+        if compilados is None or compilados[0] is not receta:
+            compilados = (receta, compilar_extractores(receta.get("valores_a_medir", []) if receta else []))
+            self._extractores[receta_id] = compilados
+        return compilados[1]
+
+    def medido(self, experimento):
+        """True si las mediciones guardadas del experimento siguen valiendo: mismo resultado, misma receta y
+        medidas con los extractores actuales de esa receta"""
+        guardado = self._mediciones.get(experimento["id"])
+        return (guardado is not None and guardado[:2] == (experimento.get("resultado"), experimento["receta_id"])
+                and guardado[2] is self.extractores(experimento["receta_id"]))
+
+    def medir(self, experimento):
+        """tupla con los valores medidos del experimento, en el orden de los valores a medir de su receta"""
+        if self.medido(experimento):
+            return self._mediciones[experimento["id"]][3]
+        valores = medir(experimento.get("resultado"), self.extractores(experimento["receta_id"]))
+        self.guardar_medicion(experimento, valores)
+        return valores
+
+    def guardar_medicion(self, experimento, valores):
+        """agrega al caché mediciones calculadas en otro lado (por ejemplo en los procesos de la evaluación en lote)"""
+        receta_id = experimento["receta_id"]
+        self._mediciones[experimento["id"]] = (experimento.get("resultado"), receta_id, self.extractores(receta_id),
+                                               tuple(valores))
+
+    def mediciones(self, experimento):
+        """{nombre: valor} de lo que se pudo medir"""
+        return {
+            nombre: valor for (nombre, _, _, _), valor in zip(self.extractores(experimento["receta_id"]), self.medir(experimento))
+            if valor is not None
+        }
+
+    def estadisticas(self, experimentos):
+        """por receta y por valor a medir: cuántos se midieron, media, desviación estándar y proporción fuera de rango"""
+        por_receta = {}
+        for experimento in experimentos:
+            por_receta.setdefault(experimento["receta_id"], []).append(self.medir(experimento))
+        estadisticas = {}
+        for receta_id, filas in por_receta.items():
+            extractores = self.extractores(receta_id)
+            if not extractores:
+                continue
+            tabla = np.array(filas, dtype=np.float64)  # los None quedan como nan
+            estadisticas[receta_id] = {}
+            for columna, (nombre, minimo, maximo, _) in enumerate(extractores):
+                medidos = tabla[:, columna][~np.isnan(tabla[:, columna])]
+                fuera = np.zeros(len(medidos), dtype=bool)
+                if minimo is not None:
+                    fuera |= medidos < minimo
+                if maximo is not None:
+                    fuera |= medidos > maximo
+                estadisticas[receta_id][nombre] = {
+                    "medidos": int(len(medidos)),
+                    "sin_medir": int(len(filas) - len(medidos)),
+                    "media": float(medidos.mean()) if len(medidos) else None,
+                    "desviacion": float(medidos.std()) if len(medidos) else None,
+                    "fuera_de_rango": float(fuera.mean()) if len(medidos) else None
+                }
+        return estadisticas
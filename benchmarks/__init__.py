@@ -0,0 +1 @@
+"""pruebas de rendimiento del laboratorio; cada módulo se ejecuta con python -m benchmarks.<nombre>"""
@@ -0,0 +1,76 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+"""mide cuánto tarda el menú principal en aparecer: lanza main.py, cronometra hasta que imprime el primer
+"seleccione una opción" y lo cierra con la opción de salir. repite varias veces y compara la mediana con un
+presupuesto; también informa qué módulos pesados (numpy, matplotlib) se importaron antes del menú.
+uso: python -m benchmarks.arranque [--veces 10] [--presupuesto-ms 50] (desde el directorio con los json)"""
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROMPT = b"seleccione una opci"
+PESADOS = ("numpy", "matplotlib")
+PRESUPUESTO_MS = 50
+
+
+def medir_una_vez(python=sys.executable):
+    """milisegundos hasta el primer menú"""
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen([python, "-u", os.path.join(RAIZ, "main.py")], stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    leido = b""
+    while PROMPT not in leido:
+        parte = proceso.stdout.read1(4096)
+        if not parte:
+            raise RuntimeError("main.py terminó sin mostrar el menú")
+        leido += parte
+    milisegundos = (time.perf_counter() - inicio) * 1000
+    proceso.communicate(b"5\n")
+    return milisegundos
+
+
+def base_interprete(python=sys.executable):
+    """milisegundos que tarda el intérprete solo, para separar lo que es del programa"""
+    inicio = time.perf_counter()
+    subprocess.run([python, "-c", "pass"], check=True)
+    return (time.perf_counter() - inicio) * 1000
+
+
+def modulos_pesados(python=sys.executable, opciones=()):
+    """los módulos pesados que ya están importados cuando aparece el menú o, si se indican opciones, cuando
+    se pide la siguiente respuesta después de contestar con ellas (por ejemplo ("1", "9") entra y sale de reactivos)"""
+    codigo = ("import builtins, sys; sys.argv = ['main.py']; sys.path.insert(0, %r)\n"
+              "opciones = iter(%r)\n"
+              "def responder(*args):\n"
+              "    for opcion in opciones:\n"
+              "        return opcion\n"
+              "    raise SystemExit([m for m in %r if m in sys.modules])\n"
+              "builtins.input = responder\nimport main; main.main()") % (RAIZ, list(opciones), PESADOS)
+    proceso = subprocess.run([python, "-c", codigo], capture_output=True, text=True)
+    return proceso.stderr.strip().splitlines()[-1] if proceso.stderr.strip() else "[]"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.arranque")
+    parser.add_argument("--veces", type=int, default=10)
+    parser.add_argument("--presupuesto-ms", type=float, default=PRESUPUESTO_MS)
+    args = parser.parse_args(argv)
+
+    tiempos = [medir_una_vez() for _ in range(args.veces)]
+    interprete = statistics.median(base_interprete() for _ in range(args.veces))
+    mediana = statistics.median(tiempos)
+    print(f"hasta el menú: mediana {mediana:.1f} ms (mín {min(tiempos):.1f}, máx {max(tiempos):.1f}), "
+          f"de los cuales el intérprete solo tarda {interprete:.1f} ms")
+    print(f"módulos pesados importados antes del menú: {modulos_pesados()}")
+    if mediana > args.presupuesto_ms:
+        print(f"fuera del presupuesto de {args.presupuesto_ms:.0f} ms")
+        return 1
+    print(f"dentro del presupuesto de {args.presupuesto_ms:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
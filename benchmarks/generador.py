@@ -0,0 +1,127 @@
+import json
+import os
+import random
+import sys
+from unidades import BASES, CONVERSIONES
+
+"""genera datos sintéticos del laboratorio con los mismos esquemas que reactivos.json, recetas.json y
+experimentos.json, a cualquier escala y siempre iguales para la misma semilla. los experimentos se
+escriben a medida que se generan, así que 10⁷ no necesita tenerlos en memoria.
+uso: python -m benchmarks.generador DIRECTORIO EXPERIMENTOS [SEMILLA]"""
+
+CATEGORIAS = ["Ácidos", "Bases", "Sales", "Solventes", "Indicadores", "Oxidantes", "Tampones"]
+UNIDADES = {"volumen": ["mL", "L", "uL"], "masa": ["g", "kg", "mg"]}
+VALORES = [
+    ("pH_final", "pH = -log[H+]", 0, 14), ("rendimiento", "rend = real / teorico * 100", 0, 100),
+    ("masa_precipitado", "m = m_final - m_papel", 0, 5), ("absorbancia", "A = -log(T)", 0, 2),
+    ("volumen_O2", "V = nRT / P", 0, 500), ("temperatura_final", "T", 0, 100),
+    ("concentracion_final", "C = n / V", 0, 2), ("dureza", "ppm CaCO3", 0, 300),
+]
+PERSONAS = [f"{nombre} {apellido}" for nombre in ("Ana", "Luis", "Marta", "Carlos", "Sofía", "Jorge", "Elena", "Pedro",
+                                                  "Lucía", "Diego", "Valeria", "Andrés", "Paula", "Raúl", "Inés")
+            for apellido in ("Morales", "Pérez", "Jiménez", "Contreras", "Rojas", "Díaz", "Torres", "Silva")]
+
+
+def tamanos(experimentos):
+    """(reactivos, recetas) que acompañan a esa cantidad de experimentos"""
+    return min(max(experimentos // 100, 50), 100_000), min(max(experimentos // 1000, 30), 10_000)
+
+
+def familia_reactivo(reactivo_id):
+    """la familia depende solo del ID, así las recetas pueden elegir unidades compatibles sin ver los reactivos"""
+    return "volumen" if reactivo_id % 3 else "masa"
+
+
+def reactivos(n, semilla=0):
+    rng = random.Random(semilla)
+    for i in range(1, n + 1):
+        familia = familia_reactivo(i)
+        unidad = rng.choice(UNIDADES[familia][:2])  # el inventario en mL/g o en L/kg
+        escala = 1 if unidad in BASES.values() else 0.001
+        yield {
+            "id": i,
+            "nombre": f"Reactivo {i}",
+            "descripcion": f"Reactivo sintético {i}",
+            "costo": round(rng.uniform(0.01, 2.0), 2),
+            "categoria": rng.choice(CATEGORIAS),
+            "inventario_disponible": round(rng.uniform(500, 50_000) * escala, 3),
+            "unidad_medida": unidad,
+            "fecha_caducidad": f"20{rng.randint(25, 32)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "minimo_sugerido": round(rng.uniform(50, 500) * escala, 3),
+            "conversiones_posibles": CONVERSIONES[familia]
+        }
+
+
+def recetas(n, n_reactivos, semilla=0):
+    rng = random.Random(semilla + 1)
+    for i in range(1, n + 1):
+        utilizados = []
+        for reactivo_id in rng.sample(range(1, n_reactivos + 1), rng.randint(1, min(6, n_reactivos))):
+            unidad = rng.choice(UNIDADES[familia_reactivo(reactivo_id)])
+            cantidad = rng.uniform(1, 50) * {"L": 0.001, "kg": 0.001, "uL": 1000, "mg": 1000}.get(unidad, 1)
+            utilizados.append({"reactivo_id": reactivo_id, "cantidad_necesaria": round(cantidad, 4), "unidad_medida": unidad})
+        valores = []
+        for nombre, formula, minimo, maximo in rng.sample(VALORES, rng.randint(1, 3)):
+            desde = round(rng.uniform(minimo, (minimo + maximo) / 2), 2)
+            valores.append({"nombre": nombre, "formula": formula, "minimo": desde,
+                            "maximo": round(rng.uniform(desde, maximo), 2)})
+        yield {
+            "id": i,
+            "nombre": f"Receta {i}",
+            "objetivo": f"Objetivo de la receta sintética {i}",
+            "reactivos_utilizados": utilizados,
+            "procedimiento": [f"Paso {p}" for p in range(1, rng.randint(2, 6))],
+            "valores_a_medir": valores
+        }
+
+
+def experimentos(n, lista_recetas, semilla=0):
+    """el resultado es texto libre con los valores a medir de la receta (a veces falta alguno o sale de rango)"""
+    rng = random.Random(semilla + 2)
+    for i in range(1, n + 1):
+        if rng.random() < 0.5:
+            indice = min(int(rng.paretovariate(1.2)) - 1, len(lista_recetas) - 1)  # unas pocas recetas muy usadas
+        else:
+            indice = rng.randrange(len(lista_recetas))
+        receta = lista_recetas[indice]
+        partes = []
+        for valor in receta["valores_a_medir"]:
+            if rng.random() < 0.9:
+                ancho = valor["maximo"] - valor["minimo"]
+                medido = rng.uniform(valor["minimo"] - ancho * 0.2, valor["maximo"] + ancho * 0.2)
+                partes.append(f"{valor['nombre'].replace('_', ' ')}: {medido:.2f}")
+        yield {
+            "id": i,
+            "nombre": f"Experimento {i}",
+            "receta_id": receta["id"],
+            "personas_responsables": rng.sample(PERSONAS, rng.randint(1, 3)),
+            "fecha": f"20{rng.randint(20, 25)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "costo_asociado": round(rng.uniform(0.5, 200), 2),
+            "resultado": ", ".join(partes) + ". Resultado sintético."
+        }
+
+
+def escribir(ruta, registros):
+    """escribe un arreglo json con un registro por línea, sin armar el texto completo en memoria"""
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i, registro in enumerate(registros):
+            f.write(",\n" if i else "\n")
+            f.write(json.dumps(registro, ensure_ascii=False))
+        f.write("\n]\n")
+
+
+def generar(directorio, n_experimentos, semilla=0):
+    """escribe los cuatro archivos del laboratorio en el directorio; devuelve cuántos registros tiene cada uno"""
+    os.makedirs(directorio, exist_ok=True)
+    n_reactivos, n_recetas = tamanos(n_experimentos)
+    lista_recetas = list(recetas(n_recetas, n_reactivos, semilla))
+    escribir(os.path.join(directorio, "reactivos.json"), reactivos(n_reactivos, semilla))
+    escribir(os.path.join(directorio, "recetas.json"), lista_recetas)
+    escribir(os.path.join(directorio, "experimentos.json"), experimentos(n_experimentos, lista_recetas, semilla))
+    escribir(os.path.join(directorio, "resultados.json"), [])
+    return {"reactivos": n_reactivos, "recetas": n_recetas, "experimentos": n_experimentos}
+
+
+if __name__ == "__main__":
+    print(generar(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]) if len(sys.argv) > 3 else 0))
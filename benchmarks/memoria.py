@@ -0,0 +1,79 @@
+import json
+import random
+import sys
+import tracemalloc
+from reactivo import Reactivo
+from tabla_reactivos import TablaReactivos
+
+"""compara la memoria de los reactivos como diccionarios del json, como objetos con __dict__ (la representación
+anterior) y como objetos con __slots__ y tablas compartidas; también la tabla columnar con solo los campos numéricos"""
+
+CATEGORIAS = ["Ácidos", "Bases", "Sales", "Solventes", "Indicadores"]
+UNIDADES = {"mL": "volumen", "g": "masa"}
+
+
+class ReactivoConDict:
+    """misma forma que Reactivo pero sin __slots__, sin internar y con su propia copia de las conversiones"""
+    def __init__(self, datos):
+        for campo, valor in datos.items():
+            setattr(self, campo, valor)
+
+
+def generar_json(n, semilla=0):
+    """texto json con n reactivos; se decodifica en cada medición para que las cadenas no se compartan"""
+    from reactivo import CONVERSIONES
+    rng = random.Random(semilla)
+    reactivos = []
+    for i in range(1, n + 1):
+        unidad = rng.choice(list(UNIDADES))
+        reactivos.append({
+            "id": i,
+            "nombre": f"Reactivo {i}",
+            "descripcion": f"Descripción del reactivo {i}",
+            "costo": round(rng.uniform(1, 200), 2),
+            "categoria": rng.choice(CATEGORIAS),
+            "inventario_disponible": rng.randint(0, 5000),
+            "unidad_medida": unidad,
+            "fecha_caducidad": f"202{rng.randint(5, 9)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "minimo_sugerido": rng.randint(10, 500),
+            "conversiones_posibles": CONVERSIONES[UNIDADES[unidad]]
+        })
+    return json.dumps(reactivos)
+
+
+def medir(construir, texto):
+    """bytes que quedan asignados después de construir la colección (sin contar el texto json)"""
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    coleccion = construir(json.loads(texto))
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del coleccion
+    return despues - antes
+
+
+def ejecutar(n=50_000):
+    texto = generar_json(n)
+    resultados = {
+        "dicts json": medir(lambda datos: datos, texto),
+        "objetos con __dict__": medir(lambda datos: [ReactivoConDict(d) for d in datos], texto),
+        "objetos con __slots__": medir(lambda datos: [Reactivo.desde_dict(d) for d in datos], texto),
+    }
+    """la tabla se arma desde los objetos, así que se mide aparte: solo lo que ocupan sus columnas"""
+    reactivos = [Reactivo.desde_dict(d) for d in json.loads(texto)]
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    tabla = TablaReactivos.desde_reactivos(reactivos)
+    resultados["tabla columnar (numéricos)"] = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+
+    base = resultados["objetos con __dict__"]
+    print(f"memoria para {n} reactivos (reducción respecto a los objetos con __dict__):")
+    for nombre, tamano in resultados.items():
+        print(f"  - {nombre}: {tamano / 1e6:.1f} MB ({base / tamano:.1f}x)")
+    print(f"  (las columnas numéricas de la tabla ocupan {tabla.memoria_bytes() / 1e6:.1f} MB de datos)")
+    return resultados
+
+
+if __name__ == "__main__":
+    ejecutar(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
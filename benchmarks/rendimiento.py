@@ -0,0 +1,236 @@
+import argparse
+import builtins
+import contextlib
+import datetime
+import io
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+"""mide los puntos de entrada reales del laboratorio sobre datos sintéticos (benchmarks.generador) a varias
+escalas, sin menús ni ventanas: input() lanza un error y matplotlib usa el backend Agg. cada escala corre en
+su propio proceso, así la memoria máxima (RSS) de una no se mezcla con la de otra. el informe json tiene el
+tiempo y la RSS de cada operación por escala y las curvas de escalado (con el exponente de la recta log-log),
+y con --comparar se marcan las operaciones que empeoraron respecto a un informe anterior.
+uso: python -m benchmarks.rendimiento --escalas 1000 10000 100000 --salida informe.json [--comparar anterior.json]"""
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ESCALAS = [1_000, 10_000, 100_000]
+MUESTRAS = 50  # llamadas para las operaciones que se miden de a una
+
+
+def rss_max_mb():
+    """memoria máxima del proceso hasta ahora (None donde no se puede medir)"""
+    if resource is None:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo / 2**20 if sys.platform == "darwin" else maximo / 2**10
+
+
+def _sin_entrada(*args, **kwargs):
+    raise RuntimeError("el benchmark no puede responder input()")
+
+
+class Cronometro:
+    def __init__(self):
+        self.operaciones = {}
+
+    def medir(self, nombre, funcion, llamadas=1):
+        """ejecuta la función (con la salida descartada) y anota el tiempo total, por llamada y la RSS máxima"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            resultado = funcion()
+            segundos = time.perf_counter() - inicio
+        self.operaciones[nombre] = {
+            "segundos": segundos, "llamadas": llamadas, "por_llamada": segundos / max(llamadas, 1), "rss_max_mb": rss_max_mb()
+        }
+        return resultado
+
+
+def medir_escala(n, semilla=0, muestras=MUESTRAS):
+    """genera los datos en el directorio actual y mide todo; se ejecuta en un proceso aparte por escala"""
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    os.environ["LAB_ALMACENAMIENTO"] = "json"
+    os.environ["LAB_AUTOGUARDADO_MS"] = "0"
+    builtins.input = _sin_entrada
+    warnings.simplefilter("ignore")
+    from benchmarks import generador
+    from contexto_laboratorio import ContextoLaboratorio
+    from gestion_reactivos import GestionReactivos
+    from gestion_experimentos import GestionExperimentos
+    from gestion_resultados import GestionResultados
+    from gestion_estadisticas import GestionEstadisticas
+    import matplotlib.pyplot as plt
+
+    cronometro = Cronometro()
+    tamanos = cronometro.medir("generar_datos", lambda: generador.generar(".", n, semilla))
+    rng = random.Random(semilla)
+
+    """carga: json (que además deja escrita la instantánea) y después desde la instantánea"""
+    contexto = ContextoLaboratorio()
+    cronometro.medir("cargar_reactivos", contexto.cargar_reactivos)
+    cronometro.medir("cargar_experimentos_json", contexto.cargar_experimentos)
+    frio = ContextoLaboratorio()
+    cronometro.medir("cargar_experimentos_instantanea", lambda: len(frio.experimentos))
+    del frio
+    cronometro.medir("cargar_resultados", lambda: len(contexto.resultados))
+
+    gestion_reactivos = GestionReactivos(contexto)
+    gestion_experimentos = GestionExperimentos(contexto, gestion_reactivos)
+    gestion_resultados = GestionResultados(contexto)
+    gestion_estadisticas = cronometro.medir(
+        "estadisticas_contadores", lambda: GestionEstadisticas(contexto, gestion_experimentos))
+
+    """agregados de estadísticas"""
+    for nombre in ("investigador_mas_activo", "experimento_mas_menos_frecuente", "reactivos_mas_usados",
+                   "costo_por_receta", "costo_por_mes", "resumen"):
+        cronometro.medir(f"estadisticas.{nombre}", getattr(gestion_estadisticas, nombre))
+    cronometro.medir("estadisticas.graficar", lambda: (gestion_estadisticas.graficar_estadisticas(), plt.close("all")))
+
+    """operaciones de a una, dentro de un lote para medirlas sin el guardado (que se mide aparte)"""
+    recetas = [contexto.almacen_recetas.obtener_receta(r["id"])
+               for r in rng.sample(contexto.almacen_recetas.recetas(), min(muestras, tamanos["recetas"]))]
+    cronometro.medir("verificar_reactivos_disponibles",
+                     lambda: [r.verificar_reactivos_disponibles(gestion_reactivos) for r in recetas], len(recetas))
+    ids = rng.sample(range(1, n + 1), min(muestras, n))
+    with contexto.lote():
+        random.seed(semilla)
+        cronometro.medir("realizar_experimento", lambda: [gestion_experimentos.realizar_experimento(i) for i in ids], len(ids))
+        cronometro.medir("evaluar_experimento",
+                         lambda: [gestion_resultados.evaluar_experimento(f"Experimento {i}") for i in ids], len(ids))
+        cronometro.medir("evaluar_experimentos", gestion_resultados.evaluar_experimentos, n)
+        cronometro.medir("estadisticas_mediciones", gestion_resultados.estadisticas_mediciones, n)
+        contexto.descartar_pendientes()  # los guardados se miden aparte, abajo
+
+    """guardados completos de cada colección"""
+    cronometro.medir("guardar_reactivos", contexto.escribir_reactivos)
+    cronometro.medir("guardar_experimentos", contexto.escribir_experimentos)
+    cronometro.medir("guardar_resultados", contexto.escribir_resultados)
+    cronometro.medir("guardar_instantanea", contexto.guardar_instantanea)
+    cronometro.medir("guardar_contadores", gestion_estadisticas.guardar_contadores)
+    return {"tamanos": tamanos, "operaciones": cronometro.operaciones, "rss_max_mb": rss_max_mb()}
+
+
+def exponente(escalas, segundos):
+    """pendiente de log(segundos) contra log(escala): ~1 lineal, ~0 constante, ~2 cuadrático"""
+    puntos = [(math.log(e), math.log(s)) for e, s in zip(escalas, segundos) if s > 0]
+    if len(puntos) < 2:
+        return None
+    mx = sum(x for x, _ in puntos) / len(puntos)
+    my = sum(y for _, y in puntos) / len(puntos)
+    varianza = sum((x - mx) ** 2 for x, _ in puntos)
+    return sum((x - mx) * (y - my) for x, y in puntos) / varianza if varianza else None
+
+
+def ejecutar(escalas=ESCALAS, semilla=0, muestras=MUESTRAS):
+    """corre cada escala en un proceso nuevo dentro de un directorio temporal y arma el informe"""
+    informe = {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "version": _version(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semilla": semilla,
+        "escalas": {}
+    }
+    entorno = dict(os.environ, PYTHONPATH=RAIZ + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    for n in escalas:
+        with tempfile.TemporaryDirectory(prefix=f"lab_{n}_") as directorio:
+            print(f"escala {n}...", file=sys.stderr)
+            proceso = subprocess.run(
+                [sys.executable, "-m", "benchmarks.rendimiento", "--escala-interna", str(n),
+                 "--semilla", str(semilla), "--muestras", str(muestras)],
+                cwd=directorio, env=entorno, capture_output=True, text=True
+            )
+            if proceso.returncode != 0:
+                raise RuntimeError(f"falló la escala {n}:\n{proceso.stderr}")
+            informe["escalas"][str(n)] = json.loads(proceso.stdout)
+
+    curvas = {}
+    for nombre in next(iter(informe["escalas"].values()))["operaciones"] if informe["escalas"] else []:
+        puntos = [(int(n), datos["operaciones"][nombre]["segundos"]) for n, datos in informe["escalas"].items()
+                  if nombre in datos["operaciones"]]
+        curvas[nombre] = {
+            "escalas": [n for n, _ in puntos],
+            "segundos": [s for _, s in puntos],
+            "exponente": exponente(*zip(*puntos)) if puntos else None
+        }
+    informe["curvas"] = curvas
+    return informe
+
+
+def _version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(informe, anterior, umbral=1.25):
+    """[(escala, operación, segundos antes, segundos ahora)] de lo que tardó más de umbral veces que antes"""
+    regresiones = []
+    for n, datos in informe["escalas"].items():
+        previos = anterior.get("escalas", {}).get(n, {}).get("operaciones", {})
+        for nombre, medicion in datos["operaciones"].items():
+            antes = previos.get(nombre, {}).get("por_llamada")
+            if antes and medicion["por_llamada"] > antes * umbral:
+                regresiones.append((int(n), nombre, antes, medicion["por_llamada"]))
+    return regresiones
+
+
+def mostrar(informe):
+    escalas = list(informe["escalas"])
+    print(f"{'operación':<46}" + "".join(f"{n:>14}" for n in escalas) + f"{'exponente':>11}")
+    for nombre, curva in informe["curvas"].items():
+        tiempos = {str(n): s for n, s in zip(curva["escalas"], curva["segundos"])}
+        celdas = "".join(f"{tiempos[n]:>13.4f}s" if n in tiempos else f"{'-':>14}" for n in escalas)
+        pendiente = f"{curva['exponente']:>11.2f}" if curva["exponente"] is not None else f"{'-':>11}"
+        print(f"{nombre:<46}{celdas}{pendiente}")
+    print("RSS máxima (MB): " + ", ".join(f"{n}: {d['rss_max_mb']:.0f}" for n, d in informe["escalas"].items()
+                                          if d["rss_max_mb"] is not None))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.rendimiento")
+    parser.add_argument("--escalas", nargs="+", type=int, default=ESCALAS, help="cantidades de experimentos (10³ a 10⁷)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--muestras", type=int, default=MUESTRAS, help="llamadas para las operaciones de a una")
+    parser.add_argument("--salida", default="informe_rendimiento.json")
+    parser.add_argument("--comparar", metavar="INFORME", help="informe anterior para buscar regresiones")
+    parser.add_argument("--umbral", type=float, default=1.25, help="cuántas veces más lento cuenta como regresión")
+    parser.add_argument("--escala-interna", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.escala_interna is not None:
+        resultado = medir_escala(args.escala_interna, args.semilla, args.muestras)
+        sys.stdout.write(json.dumps(resultado))
+        return 0
+
+    informe = ejecutar(args.escalas, args.semilla, args.muestras)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(informe, f, indent=4)
+    mostrar(informe)
+    print(f"informe guardado en {args.salida}")
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            regresiones = comparar(informe, json.load(f), args.umbral)
+        for n, nombre, antes, ahora in regresiones:
+            print(f"regresión en {nombre} ({n}): {antes:.4f}s → {ahora:.4f}s por llamada")
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
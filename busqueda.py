@@ -0,0 +1,183 @@
+import bisect
+import heapq
+import re
+from collections import Counter
+from texto import plegar
+
+"""búsqueda aproximada por nombre: índice invertido de trigramas sobre el texto sin tildes ni mayúsculas, así
+"acido clorhidrico" o "clorhidirco" encuentran "HCl (Ácido Clorhídrico) 0.1N". el nombre se indexa aparte de
+los demás textos (descripción, categoría, objetivo) y pesa más en el puntaje. para no recorrer las listas de
+los trigramas muy comunes, los candidatos salen solo de los más raros: un documento que comparte al menos
+k de los trigramas de la consulta tiene que estar en alguna de las |consulta| - k + 1 listas más cortas, y a
+esos candidatos se les cuentan los demás con una consulta al conjunto de cada trigrama"""
+
+PALABRA = re.compile(r"[a-z0-9]+")
+SIMILITUD_MINIMA = 0.4  # proporción de los trigramas de la consulta que tiene que compartir un documento
+PESO_OTROS = 0.5  # lo que vale coincidir en la descripción, categoría u objetivo frente al nombre
+FRECUENTE = 0.02  # trigramas presentes en más de esta proporción de las claves ("rio ", " de") no generan candidatos
+
+
+def palabras(texto):
+    return PALABRA.findall(plegar(texto or ""))
+
+
+def trigramas(texto):
+    """trigramas de cada palabra con un espacio de relleno a los lados (" hcl " → " hc", "hcl", "cl ")"""
+    resultado = set()
+    for palabra in palabras(texto):
+        relleno = f" {palabra} "
+        resultado.update(relleno[i:i + 3] for i in range(len(relleno) - 2))
+    return resultado
+
+
+class _Trigramas:
+    """trigrama → conjunto de claves, con los trigramas de cada clave para poder quitarla"""
+
+    def __init__(self):
+        self.listas = {}
+        self.por_clave = {}
+
+    def agregar(self, clave, trigramas_clave):
+        self.por_clave[clave] = trigramas_clave
+        for trigrama in trigramas_clave:
+            self.listas.setdefault(trigrama, set()).add(clave)
+
+    def quitar(self, clave):
+        for trigrama in self.por_clave.pop(clave, ()):
+            lista = self.listas[trigrama]
+            lista.discard(clave)
+            if not lista:
+                del self.listas[trigrama]
+
+    def coincidencias(self, consulta, minimo):
+        """{clave: trigramas compartidos} de las claves que comparten al menos minimo trigramas de la consulta"""
+        listas = sorted((self.listas.get(t, set()) for t in consulta), key=len)
+        corte = len(listas) - minimo + 1
+        """las listas de los trigramas muy comunes solo se usan para contar, no para buscar candidatos: lo que
+        comparte únicamente trigramas comunes no es un buen resultado. Counter.update y la intersección de
+        conjuntos recorren en C, no en un for de python"""
+        limite = max(1000, FRECUENTE * len(self.por_clave))
+        corte = max(1, sum(1 for lista in listas[:corte] if len(lista) <= limite))
+        comunes = Counter()
+        for lista in listas[:corte]:
+            comunes.update(lista)
+        for lista in listas[corte:]:
+            comunes.update(comunes.keys() & lista)
+        return {clave: n for clave, n in comunes.items() if n >= minimo}
+
+
+class IndiceBusqueda:
+    def __init__(self):
+        self._nombres = {}  # clave: nombre original
+        self._nombre = _Trigramas()
+        self._otros = _Trigramas()
+        self._palabras = []  # lista ordenada de (palabra del nombre, clave) para autocompletar
+
+    def __len__(self):
+        return len(self._nombres)
+
+    def cargar(self, entradas):
+        """indexa de una vez muchas (clave, nombre, textos); la lista de palabras se ordena una sola vez al final"""
+        palabras_nuevas = []
+        for clave, nombre, textos in entradas:
+            if clave in self._nombres:
+                self.quitar(clave)
+            self._indexar(clave, nombre, textos)
+            palabras_nuevas.extend((palabra, clave) for palabra in set(palabras(nombre)))
+        self._palabras.extend(palabras_nuevas)
+        self._palabras.sort()
+
+    def agregar(self, clave, nombre, textos=()):
+        """indexa (o reindexa) una clave con su nombre y otros textos en los que también se busca"""
+        if clave in self._nombres:
+            self.quitar(clave)
+        self._indexar(clave, nombre, textos)
+        for palabra in set(palabras(nombre)):
+            bisect.insort(self._palabras, (palabra, clave))
+
+    def _indexar(self, clave, nombre, textos):
+        self._nombres[clave] = nombre
+        self._nombre.agregar(clave, trigramas(nombre))
+        self._otros.agregar(clave, set().union(*(trigramas(t) for t in textos)))
+
+    def quitar(self, clave):
+        nombre = self._nombres.pop(clave, None)
+        if nombre is None:
+            return
+        self._nombre.quitar(clave)
+        self._otros.quitar(clave)
+        for palabra in set(palabras(nombre)):
+            i = bisect.bisect_left(self._palabras, (palabra, clave))
+            if i < len(self._palabras) and self._palabras[i] == (palabra, clave):
+                del self._palabras[i]
+
+    def nombre(self, clave):
+        return self._nombres.get(clave)
+
+    def buscar(self, consulta, cantidad=10, similitud=SIMILITUD_MINIMA):
+        """[(clave, puntaje entre 0 y 1)] de mejor a peor. en el nombre el puntaje promedia la proporción de
+        la consulta que aparece en él y el coeficiente de Dice (que premia los nombres del largo de la
+        consulta); en los demás textos es la proporción de la consulta que aparece, por PESO_OTROS"""
+        consulta = trigramas(consulta)
+        if not consulta:
+            return []
+        minimo = max(1, round(len(consulta) * similitud))
+        puntajes = {}
+        for clave, comunes in self._nombre.coincidencias(consulta, minimo).items():
+            dice = 2 * comunes / (len(consulta) + len(self._nombre.por_clave[clave]))
+            puntajes[clave] = (comunes / len(consulta) + dice) / 2
+        for clave, comunes in self._otros.coincidencias(consulta, minimo).items():
+            puntaje = PESO_OTROS * comunes / len(consulta)
+            if puntaje > puntajes.get(clave, 0):
+                puntajes[clave] = puntaje
+        return heapq.nsmallest(cantidad, puntajes.items(), key=lambda x: (-x[1], self._nombres[x[0]]))
+
+    def autocompletar(self, prefijo, cantidad=10):
+        """claves cuyo nombre tiene palabras que empiezan con cada palabra escrita ("aci clo" → Ácido
+        Clorhídrico), en orden alfabético de la palabra que completa la última"""
+        escritas = palabras(prefijo)
+        if not escritas:
+            return []
+        *completas, ultima = escritas
+        requeridas = None
+        for palabra in completas:
+            claves = self._con_prefijo(palabra)
+            requeridas = claves if requeridas is None else requeridas & claves
+            if not requeridas:
+                return []
+        resultado = []
+        vistas = set()
+        i = bisect.bisect_left(self._palabras, (ultima,))
+        while i < len(self._palabras) and len(resultado) < cantidad:
+            palabra, clave = self._palabras[i]
+            if not palabra.startswith(ultima):
+                break
+            if clave not in vistas and (requeridas is None or clave in requeridas):
+                vistas.add(clave)
+                resultado.append(clave)
+            i += 1
+        return resultado
+
+    def _con_prefijo(self, prefijo):
+        inicio = bisect.bisect_left(self._palabras, (prefijo,))
+        fin = bisect.bisect_left(self._palabras, (prefijo + "\x7f",))
+        return {clave for _, clave in self._palabras[inicio:fin]}
+
+
+def elegir(texto, exacto, sugerir, cantidad=5):
+    """para los menús: devuelve exacto si existe; si no, muestra las sugerencias [(objeto, nombre)] que
+    devuelve sugerir(texto, cantidad) y devuelve la que se elija por número (None si no hay o se deja vacío).
+    sugerir solo se llama sin coincidencia exacta, así el índice de búsqueda no se arma si no hace falta"""
+    if exacto is not None:
+        return exacto
+    sugerencias = sugerir(texto, cantidad)[:cantidad]
+    if not sugerencias:
+        print(f"no se encontró nada parecido a '{texto}'.")
+        return None
+    print(f"'{texto}' no existe. ¿quiso decir?")
+    for i, (_, nombre) in enumerate(sugerencias, 1):
+        print(f"  {i}. {nombre}")
+    opcion = input("número de la opción (Enter para cancelar): ").strip()
+    if opcion.isdigit() and 1 <= int(opcion) <= len(sugerencias):
+        return sugerencias[int(opcion) - 1][0]
+    return None
@@ -0,0 +1,244 @@
+import argparse
+import contextlib
+import json
+import sys
+from contexto_laboratorio import ContextoLaboratorio
+from gestion_reactivos import GestionReactivos
+from gestion_experimentos import GestionExperimentos, fecha_valida
+from gestion_resultados import GestionResultados
+from gestion_estadisticas import GestionEstadisticas
+from lector_json import iterar_registros
+
+"""interfaz de línea de comandos del sapulaboratorio, para usar sin los menús (por ejemplo desde scripts).
+cada subcomando imprime su resultado como json en la salida estándar; los mensajes de las gestiones van a
+la salida de errores. con --batch se aplica un archivo json lines de operaciones, una por línea, por ejemplo:
+
+    {"op": "agregar_reactivo", "reactivo": {"nombre": "Agua destilada", ...}}
+    {"op": "crear_experimento", "nombre": "exp 1", "receta": "Titulación", "responsables": ["Ana"], "fecha": "2024-05-01"}
+    {"op": "realizar", "ids": [1, 2, 3]}
+    {"op": "evaluar", "nombre": "exp 1"}
+    {"op": "evaluar_todos", "receta_ids": [1, 2]}
+    {"op": "mediciones", "receta_ids": [1]}
+    {"op": "factibilidad", "pesos": {"1": 3}, "limites": {"2": 10}}
+    {"op": "estadisticas"}
+
+todos los datos se leen una vez al principio y cada archivo se guarda una sola vez al final"""
+
+
+class OperacionesLaboratorio:
+    """las operaciones que se pueden pedir desde la línea de comandos, sobre un mismo contexto"""
+
+    def __init__(self, contexto=None):
+        self.contexto = contexto if contexto is not None else ContextoLaboratorio()
+        self.gestion_reactivos = GestionReactivos(self.contexto)
+        self.gestion_experimentos = GestionExperimentos(self.contexto, self.gestion_reactivos)
+        self.gestion_resultados = GestionResultados(self.contexto)
+        self.gestion_estadisticas = GestionEstadisticas(self.contexto, self.gestion_experimentos)
+
+    def agregar_reactivo(self, reactivo):
+        return {"id": self.gestion_reactivos.agregar_reactivo(reactivo).id}
+
+    def importar_reactivos(self, archivo):
+        """agrega (o reemplaza por ID) todos los reactivos de un archivo json o json lines"""
+        ids = [self.gestion_reactivos.agregar_reactivo(datos).id for datos in iterar_registros(archivo)]
+        return {"importados": len(ids), "ids": ids}
+
+    def crear_experimento(self, nombre, receta, responsables, fecha, resultado=""):
+        if isinstance(responsables, str):
+            responsables = responsables.split(", ")
+        if not fecha_valida(fecha):
+            raise ValueError(f"fecha no válida: {fecha} (use YYYY-MM-DD)")
+        experimento = self.gestion_experimentos.registrar_experimento(nombre, receta, responsables, fecha, resultado)
+        if experimento is None:
+            raise ValueError("no se puede realizar el experimento. Reactivos insuficientes o caducados")
+        return {"id": experimento["id"], "costo_asociado": experimento["costo_asociado"]}
+
+    def realizar(self, ids, todo_o_nada=True, semilla=None):
+        return self.gestion_experimentos.realizar_experimentos(ids, todo_o_nada, semilla)
+
+    def evaluar(self, nombre):
+        resultado = self.gestion_resultados.evaluar_experimento(nombre)
+        if resultado is None:
+            raise ValueError(f"no se pudo evaluar el experimento '{nombre}'")
+        return resultado
+
+    def evaluar_todos(self, experimento_ids=None, receta_ids=None, procesos=None):
+        resultados = self.gestion_resultados.evaluar_experimentos(experimento_ids, receta_ids, procesos)
+        return {"evaluados": len(resultados)}
+
+    def mediciones(self, experimento_ids=None, receta_ids=None, procesos=None):
+        estadisticas = self.gestion_resultados.estadisticas_mediciones(experimento_ids, receta_ids, procesos)
+        return {str(receta_id): valores for receta_id, valores in estadisticas.items()}
+
+    def factibilidad(self, pesos=None, limites=None, fecha=None, perdida=0.0):
+        """corridas posibles de cada receta y combinación sugerida; pesos y limites por ID de receta
+        (las claves pueden venir como texto, como en json) o pesos="costo". con fecha, no_realizables son
+        los IDs de las recetas que usan algún reactivo ya caducado en esa fecha"""
+        if isinstance(pesos, dict):
+            pesos = {int(k): v for k, v in pesos.items()}
+        limites = {int(k): v for k, v in (limites or {}).items()}
+        factibilidad = self.gestion_experimentos.factibilidad
+        corridas, costo = factibilidad.mezcla(pesos, limites, fecha, perdida)
+        informe = {"maximo_corridas": factibilidad.maximo_corridas(fecha, perdida), "mezcla": corridas, "costo_mezcla": costo}
+        if fecha:
+            informe["no_realizables"] = [r["id"] for r in self.gestion_experimentos.recetas_no_realizables(fecha)]
+        return informe
+
+    def estadisticas(self):
+        return self.gestion_estadisticas.resumen()
+
+    def buscar(self, texto, cantidad=10, autocompletar=False):
+        """reactivos y recetas parecidos al texto (o que lo completan), con su puntaje de parecido"""
+        if autocompletar:
+            return {
+                "reactivos": [{"id": r.id, "nombre": r.nombre} for r in self.gestion_reactivos.autocompletar(texto, cantidad)],
+                "recetas": [{"id": r["id"], "nombre": r["nombre"]} for r in self.contexto.almacen_recetas.autocompletar(texto, cantidad)]
+            }
+        return {
+            "reactivos": [{"id": r.id, "nombre": r.nombre, "puntaje": round(p, 3)}
+                          for r, p in self.gestion_reactivos.buscar_aproximado(texto, cantidad)],
+            "recetas": [{"id": r["id"], "nombre": r["nombre"], "puntaje": round(p, 3)}
+                        for r, p in self.contexto.almacen_recetas.buscar_aproximado(texto, cantidad)]
+        }
+
+    def impacto(self, reactivo, desde=None):
+        """recetas y experimentos (programados desde hoy o desde la fecha indicada) que dependen del reactivo"""
+        encontrado = self.gestion_reactivos.buscar_reactivo(reactivo)
+        if encontrado is None:
+            raise ValueError(f"reactivo no encontrado: {reactivo}")
+        return self.gestion_reactivos.impacto_reactivo(encontrado.id, desde)
+
+    def ejecutar(self, operacion):
+        """ejecuta una operación {"op": nombre, ...argumentos} y devuelve su resultado"""
+        argumentos = dict(operacion)
+        nombre = argumentos.pop("op", None)
+        if nombre not in OPERACIONES:
+            raise ValueError(f"operación desconocida: {nombre}")
+        return getattr(self, nombre)(**argumentos)
+
+    def ejecutar_lote(self, lineas, salida):
+        """aplica una operación por línea (json lines) y escribe en salida una línea json con el resultado
+        de cada una; una operación que falla no detiene las siguientes. al final se guarda todo junto, y si eso
+        falla se informa como una operación más ("op": "guardar"). devuelve cuántas fallaron"""
+        fallidas = 0
+        try:
+            with self.contexto.lote():
+                for numero, linea in enumerate(lineas, 1):
+                    if not linea.strip():
+                        continue
+                    informe = {"linea": numero}
+                    try:
+                        operacion = json.loads(linea)
+                        informe["op"] = operacion.get("op")
+                        informe["resultado"] = self.ejecutar(operacion)
+                        informe["ok"] = True
+                    except Exception as e:
+                        informe["ok"] = False
+                        informe["error"] = str(e)
+                        fallidas += 1
+                    print(json.dumps(informe, ensure_ascii=False), file=salida)
+            self.contexto.guardar_instantanea()
+        except Exception as e:
+            print(json.dumps({"op": "guardar", "ok": False, "error": str(e)}, ensure_ascii=False), file=salida)
+            fallidas += 1
+        return fallidas
+
+OPERACIONES = ("agregar_reactivo", "importar_reactivos", "crear_experimento", "realizar", "evaluar", "evaluar_todos",
+               "mediciones", "factibilidad", "estadisticas", "impacto", "buscar")
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="sapulaboratorio sin menús")
+    parser.add_argument("--batch", metavar="ARCHIVO",
+                        help="aplica las operaciones de un archivo json lines ('-' para la entrada estándar)")
+    subparsers = parser.add_subparsers(dest="comando")
+
+    importar = subparsers.add_parser("importar-reactivos", help="agrega los reactivos de un archivo json o json lines")
+    importar.add_argument("archivo")
+
+    crear = subparsers.add_parser("crear-experimento", help="valida, descuenta los reactivos y registra un experimento")
+    crear.add_argument("nombre")
+    crear.add_argument("receta", help="nombre de la receta base")
+    crear.add_argument("fecha", help="YYYY-MM-DD")
+    crear.add_argument("--responsables", nargs="+", default=[])
+    crear.add_argument("--resultado", default="")
+
+    realizar = subparsers.add_parser("realizar", help="realiza varios experimentos en lote")
+    realizar.add_argument("ids", nargs="+", type=int)
+    realizar.add_argument("--parcial", action="store_true", help="realiza los que alcancen en lugar de todo o nada")
+    realizar.add_argument("--semilla", type=int)
+
+    evaluar = subparsers.add_parser("evaluar", help="evalúa un experimento contra los valores esperados de su receta")
+    evaluar.add_argument("nombre", nargs="?", help="sin nombre se evalúan todos (o los filtrados) en paralelo")
+    evaluar.add_argument("--ids", nargs="+", type=int, help="solo esos experimentos")
+    evaluar.add_argument("--recetas", nargs="+", type=int, help="solo los experimentos de esas recetas")
+    evaluar.add_argument("--procesos", type=int)
+
+    mediciones = subparsers.add_parser("mediciones", help="media, desviación y proporción fuera de rango de los valores medidos")
+    mediciones.add_argument("--ids", nargs="+", type=int, help="solo esos experimentos")
+    mediciones.add_argument("--recetas", nargs="+", type=int, help="solo los experimentos de esas recetas")
+    mediciones.add_argument("--procesos", type=int)
+
+    factibilidad = subparsers.add_parser("factibilidad", help="corridas posibles por receta y combinación sugerida")
+    factibilidad.add_argument("--baratas", action="store_true", help="preferir las corridas más baratas")
+    factibilidad.add_argument("--fecha", help="no contar los reactivos caducados en esa fecha (YYYY-MM-DD)")
+    factibilidad.add_argument("--perdida", type=float, default=0.0, help="margen de pérdida por corrida (0.225 = peor caso)")
+
+    subparsers.add_parser("estadisticas", help="estadísticas del laboratorio en json")
+
+    impacto = subparsers.add_parser("impacto", help="recetas y experimentos que dependen de un reactivo")
+    impacto.add_argument("reactivo", help="nombre del reactivo")
+    impacto.add_argument("--desde", help="experimentos programados desde esa fecha (YYYY-MM-DD; hoy por defecto)")
+
+    buscar = subparsers.add_parser("buscar", help="búsqueda aproximada de reactivos y recetas (sin tildes, tolera errores)")
+    buscar.add_argument("texto")
+    buscar.add_argument("--cantidad", type=int, default=10)
+    buscar.add_argument("--autocompletar", action="store_true", help="nombres con palabras que empiezan por las escritas")
+    return parser
+
+
+def _operacion_de_argumentos(args):
+    if args.comando == "importar-reactivos":
+        return {"op": "importar_reactivos", "archivo": args.archivo}
+    if args.comando == "crear-experimento":
+        return {"op": "crear_experimento", "nombre": args.nombre, "receta": args.receta,
+                "responsables": args.responsables, "fecha": args.fecha, "resultado": args.resultado}
+    if args.comando == "realizar":
+        return {"op": "realizar", "ids": args.ids, "todo_o_nada": not args.parcial, "semilla": args.semilla}
+    if args.comando == "evaluar" and args.nombre is not None:
+        return {"op": "evaluar", "nombre": args.nombre}
+    if args.comando == "evaluar":
+        return {"op": "evaluar_todos", "experimento_ids": args.ids, "receta_ids": args.recetas, "procesos": args.procesos}
+    if args.comando == "factibilidad":
+        return {"op": "factibilidad", "pesos": "costo" if args.baratas else None, "fecha": args.fecha, "perdida": args.perdida}
+    if args.comando == "mediciones":
+        return {"op": "mediciones", "experimento_ids": args.ids, "receta_ids": args.recetas, "procesos": args.procesos}
+    if args.comando == "impacto":
+        return {"op": "impacto", "reactivo": args.reactivo, "desde": args.desde}
+    if args.comando == "buscar":
+        return {"op": "buscar", "texto": args.texto, "cantidad": args.cantidad, "autocompletar": args.autocompletar}
+    return {"op": "estadisticas"}
+
+
+def ejecutar(argv=None):
+    """punto de entrada de la línea de comandos; devuelve el código de salida"""
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    if not args.batch and not args.comando:
+        parser.error("indique un subcomando o --batch ARCHIVO")
+
+    salida = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        operaciones = OperacionesLaboratorio()
+        if args.batch:
+            with (sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")) as lineas:
+                return 1 if operaciones.ejecutar_lote(lineas, salida) else 0
+        try:
+            with operaciones.contexto.lote():
+                resultado = operaciones.ejecutar(_operacion_de_argumentos(args))
+            operaciones.contexto.guardar_instantanea()
+        except (ValueError, FileNotFoundError) as e:
+            print(f"error: {e}")
+            return 1
+    print(json.dumps(resultado, ensure_ascii=False, indent=2), file=salida)
+    return 0
@@ -0,0 +1,224 @@
+import functools
+import hashlib
+import heapq
+import json
+import struct
+from almacenamiento import escribir_atomico
+
+MASCARA = (1 << 64) - 1
+
+
+"""conteo por clave que responde el máximo y el mínimo en O(log n) usando dos heaps con borrado perezoso"""
+class ConteoOrdenado:
+    def __init__(self):
+        self.conteos = {}
+        self._orden = {}  # orden de primera aparición, para desempatar igual que max()/min() sobre un dict
+        self._heap_max = []
+        self._heap_min = []
+
+    def __len__(self):
+        return len(self.conteos)
+
+    def sumar(self, clave, delta=1):
+        orden = self._orden.setdefault(clave, len(self._orden))
+        veces = self.conteos.get(clave, 0) + delta
+        if veces > 0:
+            self.conteos[clave] = veces
+            heapq.heappush(self._heap_max, (-veces, orden, clave))
+            heapq.heappush(self._heap_min, (veces, orden, clave))
+        else:
+            self.conteos.pop(clave, None)
+        if len(self._heap_max) > 4 * len(self.conteos) + 64:
+            self._reconstruir_heaps()
+
+    def _reconstruir_heaps(self):
+        """descarta las entradas viejas de los heaps"""
+        self._heap_max = [(-v, self._orden[c], c) for c, v in self.conteos.items()]
+        self._heap_min = [(v, self._orden[c], c) for c, v in self.conteos.items()]
+        heapq.heapify(self._heap_max)
+        heapq.heapify(self._heap_min)
+
+    def _cima(self, heap, signo):
+        while heap:
+            veces, _, clave = heap[0]
+            if self.conteos.get(clave) == signo * veces:
+                return clave
+            heapq.heappop(heap)
+        return None
+
+    def maximo(self):
+        return self._cima(self._heap_max, -1)
+
+    def minimo(self):
+        return self._cima(self._heap_min, 1)
+
+    def a_lista(self):
+        return [[c, v, self._orden[c]] for c, v in self.conteos.items()]
+
+    def desde_lista(self, datos):
+        self.__init__()
+        for clave, veces, orden in datos:
+            self.conteos[clave] = veces
+            self._orden[clave] = orden
+        self._reconstruir_heaps()
+
+
+"""agregados de estadísticas que se mantienen al día con cada experimento creado, eliminado o realizado"""
+class ContadoresEstadisticas:
+    def __init__(self):
+        self.investigadores = ConteoOrdenado()
+        self.recetas = ConteoOrdenado()
+        self.uso_reactivos = {}
+        self.consumo_reactivos = {}  # cantidad real descontada por reactivo al realizar experimentos
+        self.costo_por_receta = {}
+        self.costo_total = 0.0
+        self.firma = (0, 0)  # firma_experimentos de los experimentos contados
+        self.firma_recetas = None  # firma_recetas de las recetas con las que se contó el uso de reactivos
+
+    def reconstruir(self, experimentos, obtener_receta, firma_recetas=None):
+        """recalcula todo desde cero recorriendo los experimentos"""
+        self.__init__()
+        self.firma_recetas = firma_recetas
+        for experimento in experimentos:
+            self.registrar_experimento(experimento, obtener_receta(experimento["receta_id"]))
+
+    def registrar_experimento(self, experimento, receta):
+        """suma un experimento nuevo a los contadores"""
+        self._sumar(experimento, receta, 1)
+
+    def quitar_experimento(self, experimento, receta):
+        """resta un experimento eliminado de los contadores"""
+        self._sumar(experimento, receta, -1)
+
+    def registrar_consumo(self, consumo):
+        """acumula lo descontado del inventario al realizar un experimento ({reactivo_id: cantidad})"""
+        for reactivo_id, cantidad in consumo.items():
+            self.consumo_reactivos[reactivo_id] = self.consumo_reactivos.get(reactivo_id, 0) + cantidad
+
+    def _sumar(self, experimento, receta, delta):
+        for persona in experimento["personas_responsables"]:
+            self.investigadores.sumar(persona, delta)
+        receta_id = experimento["receta_id"]
+        self.recetas.sumar(receta_id, delta)
+        costo = delta * experimento["costo_asociado"]
+        self.costo_total += costo
+        if receta_id in self.recetas.conteos:
+            self.costo_por_receta[receta_id] = self.costo_por_receta.get(receta_id, 0) + costo
+        else:
+            self.costo_por_receta.pop(receta_id, None)
+        if receta:
+            for reactivo in receta.get("reactivos_utilizados", []):
+                reactivo_id = reactivo["reactivo_id"]
+                usos = self.uso_reactivos.get(reactivo_id, 0) + delta
+                if usos > 0:
+                    self.uso_reactivos[reactivo_id] = usos
+                else:
+                    self.uso_reactivos.pop(reactivo_id, None)
+        cantidad, suma = self.firma
+        self.firma = (cantidad + delta, (suma + delta * huella_experimento(experimento)) & MASCARA)
+
+    def a_dict(self):
+        """los contadores en un formato serializable (json solo admite claves de texto, por eso van como listas)"""
+        return {
+            "firma": list(self.firma),
+            "firma_recetas": self.firma_recetas,
+            "investigadores": self.investigadores.a_lista(),
+            "recetas": self.recetas.a_lista(),
+            "uso_reactivos": list(self.uso_reactivos.items()),
+            "consumo_reactivos": list(self.consumo_reactivos.items()),
+            "costo_por_receta": list(self.costo_por_receta.items()),
+            "costo_total": self.costo_total
+        }
+
+    def desde_dict(self, datos):
+        self.__init__()
+        self.firma = tuple(datos["firma"])
+        self.firma_recetas = datos["firma_recetas"]
+        self.investigadores.desde_lista(datos["investigadores"])
+        self.recetas.desde_lista(datos["recetas"])
+        self.uso_reactivos = dict(datos["uso_reactivos"])
+        self.consumo_reactivos = dict(datos["consumo_reactivos"])
+        self.costo_por_receta = dict(datos["costo_por_receta"])
+        self.costo_total = datos["costo_total"]
+
+    def guardar(self, ruta="estadisticas.json"):
+        escribir_atomico(ruta, self.a_dict())
+
+    def cargar(self, ruta, firma, firma_recetas, obtener_experimentos, obtener_receta):
+        """usa los contadores guardados si sus firmas coinciden con las de los experimentos y las recetas
+        actuales; si no, los recalcula (obtener_experimentos solo se llama en ese caso). lo consumido no se
+        puede recalcular desde los experimentos, así que se conserva. devuelve True si hubo que recalcular"""
+        consumo = {}
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                self.desde_dict(json.load(f))
+            if self.firma == tuple(firma) and self.firma_recetas == firma_recetas:
+                return False
+            consumo = self.consumo_reactivos
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            pass
+        self.reconstruir(obtener_experimentos(), obtener_receta, firma_recetas)
+        self.consumo_reactivos = consumo
+        return True
+
+
+def sumar_consumo(ruta, consumo):
+    """suma lo consumido a los contadores guardados sin armar las estadísticas (para cuando todavía no se
+    abrieron). las firmas no cambian: si los contadores ya no corresponden a los experimentos se recalculan
+    al cargarlos, conservando el consumo"""
+    contadores = ContadoresEstadisticas()
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            contadores.desde_dict(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+        contadores = ContadoresEstadisticas()
+    contadores.registrar_consumo(consumo)
+    contadores.guardar(ruta)
+
+
+"""firmas para saber si los contadores guardados siguen valiendo. la de los experimentos es la cantidad y la
+suma (módulo 2^64) de una huella de cada uno que depende de los campos que se cuentan: al ser una suma se
+actualiza con cada alta o baja sin recorrer la lista, y no depende del orden. Instantanea.firma calcula lo
+mismo sobre las columnas del archivo"""
+
+
+def mezclar(x):
+    """splitmix64: reparte los bits de un entero de 64 bits"""
+    x = (x + 0x9E3779B97F4A7C15) & MASCARA
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASCARA
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASCARA
+    return x ^ (x >> 31)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def huella_persona(persona):
+    return int.from_bytes(hashlib.blake2b(persona.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def bits_costo(costo):
+    return struct.unpack("<Q", struct.pack("<d", float(costo)))[0]
+
+
+def huella_experimento(experimento):
+    """entero de 64 bits que cambia si cambia el id, la receta, el costo o los responsables (y su orden)"""
+    personas = 0
+    for posicion, persona in enumerate(experimento["personas_responsables"]):
+        personas = (personas + mezclar(huella_persona(persona) ^ posicion)) & MASCARA
+    huella = mezclar(experimento["id"] & MASCARA)
+    huella = mezclar(huella ^ (experimento["receta_id"] & MASCARA))
+    huella = mezclar(huella ^ bits_costo(experimento["costo_asociado"]))
+    return mezclar(huella ^ personas)
+
+
+def firma_experimentos(experimentos):
+    """(cantidad de experimentos, suma de sus huellas): detecta si los contadores guardados quedaron desactualizados"""
+    suma = 0
+    for experimento in experimentos:
+        suma += huella_experimento(experimento)
+    return (len(experimentos), suma & MASCARA)
+
+
+def firma_recetas(recetas):
+    """resumen de qué reactivos usa cada receta, lo único de recetas.json que entra en los contadores"""
+    usos = [[r["id"], [u["reactivo_id"] for u in r.get("reactivos_utilizados", [])]] for r in recetas]
+    return hashlib.blake2b(json.dumps(usos).encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,226 @@
+import os
+import sys
+from contextlib import contextmanager
+from reactivo import Reactivo
+from repositorio_reactivos import RepositorioReactivos
+from almacen_recetas import obtener_almacen_recetas
+from almacenamiento import AlmacenamientoJSON, crear_almacenamiento
+from contadores_estadisticas import firma_experimentos
+from instantanea import abrir_instantanea, escribir_instantanea, ruta_instantanea
+from guardado_automatico import GuardadoAutomatico
+from indice_reactivos import IndiceReactivos
+from instrumentacion import medido
+
+"""única copia en memoria de los datos del laboratorio (reactivos, recetas, experimentos y resultados).
+todas las gestiones reciben el mismo contexto, así cada archivo se lee una sola vez (la primera vez que
+se necesita) y lo que cambia una gestion, por ejemplo el inventario, lo ven todas sin releer nada"""
+class ContextoLaboratorio:
+    CAMPOS_REACTIVO = ("id", "nombre", "descripcion", "costo", "categoria", "inventario_disponible", "unidad_medida",
+                       "fecha_caducidad", "minimo_sugerido", "conversiones_posibles")
+    CAMPOS_EXPERIMENTO = ("id", "receta_id", "personas_responsables", "fecha", "costo_asociado", "resultado")
+    CAMPOS_RESULTADO = ("experimento", "evaluacion")
+
+    def __init__(self, almacenamiento=None, ruta_recetas="recetas.json"):
+        self.almacenamiento = almacenamiento if almacenamiento is not None else crear_almacenamiento()
+        self.almacen_recetas = obtener_almacen_recetas(ruta_recetas)
+        self._repositorio = RepositorioReactivos()  # siempre el mismo objeto, aunque se recargue
+        self._reactivos_cargados = False
+        self._experimentos = None
+        self._instantanea = None
+        self._experimentos_cargados = False
+        self._resultados = None
+        self._en_lote = 0
+        self._pendientes = {}
+        self.guardado_automatico = None
+        self.indice_reactivos = IndiceReactivos(self)  # reactivo → recetas → experimentos, se arma al usarlo
+
+    @contextmanager
+    def lote(self):
+        """agrupa los guardados: dentro del bloque solo se anotan las colecciones modificadas
+        y al salir se guarda cada una completa, una sola vez"""
+        self._en_lote += 1
+        try:
+            yield self
+        finally:
+            self._en_lote -= 1
+            if not self._en_lote:
+                self.guardar_pendientes()
+
+    def diferir(self, coleccion, guardar):
+        """dentro de un lote anota cómo guardar la colección al final, y con el guardado automático activo se
+        la pasa al hilo que guarda en segundo plano; en esos casos devuelve True. si no, devuelve False y quien
+        llama guarda en el momento. guardar escribe la colección completa"""
+        if self._en_lote:
+            self._pendientes[coleccion] = guardar
+            return True
+        if self.guardado_automatico is not None:
+            self.guardado_automatico.marcar(coleccion, guardar)
+            return True
+        return False
+
+    def activar_guardado_automatico(self, intervalo_ms=None):
+        """guarda en segundo plano como mucho cada intervalo_ms (o LAB_AUTOGUARDADO_MS, 500 por defecto; 0 lo
+        desactiva). solo con almacenamientos que reescriben el archivo completo: el diario ya guarda cada cambio
+        barato y sqlite no se puede usar desde otro hilo"""
+        if intervalo_ms is None:
+            intervalo_ms = int(os.environ.get("LAB_AUTOGUARDADO_MS", 500))
+        if intervalo_ms > 0 and getattr(self.almacenamiento, "GUARDADO_EN_SEGUNDO_PLANO", False):
+            self.guardado_automatico = GuardadoAutomatico(intervalo_ms)
+        return self.guardado_automatico
+
+    def cerrar(self):
+        """escribe lo que el guardado automático tenga pendiente y la instantánea de los experimentos"""
+        if self.guardado_automatico is not None:
+            self.guardado_automatico.cerrar()
+            self.guardado_automatico = None
+        self.guardar_instantanea()
+
+    def guardar_pendientes(self):
+        pendientes, self._pendientes = self._pendientes, {}
+        for guardar in pendientes.values():
+            guardar()
+
+    def descartar_pendientes(self):
+        """olvida los guardados anotados en el lote actual sin escribirlos; devuelve las colecciones descartadas"""
+        pendientes, self._pendientes = self._pendientes, {}
+        return list(pendientes)
+
+    """reactivos"""
+
+    @property
+    def repositorio(self):
+        if not self._reactivos_cargados:
+            self.cargar_reactivos()
+        return self._repositorio
+
+    @medido
+    def cargar_reactivos(self, ruta="reactivos.json"):
+        """(re)carga los reactivos; cada registro se valida a medida que se lee y pasa directo a los índices"""
+        self._reactivos_cargados = True
+        try:
+            datos = self.almacenamiento.iterar(ruta, self.CAMPOS_REACTIVO)
+            self._repositorio.cargar(Reactivo.desde_dict(r) for r in datos)
+            print("datos de reactivos cargados correctamente")
+        except FileNotFoundError:
+            print("archivo de reactivos no encontrado. Se creará uno nuevo al guardar")
+
+    def guardar_reactivos(self, cambios=None):
+        """guarda los reactivos; si se indican los cambios solo se persisten esos (según el almacenamiento)"""
+        if self.diferir("reactivos", self.escribir_reactivos):
+            return
+        obtener_todos = lambda: [r.a_dict() for r in self.repositorio]
+        if cambios is None:
+            self.escribir_reactivos()
+        else:
+            self.almacenamiento.guardar_cambios("reactivos.json", cambios, obtener_todos)
+
+    @medido
+    def escribir_reactivos(self):
+        """reescribe reactivos.json completo a partir de una copia de la lista (puede correr en otro hilo)"""
+        self.almacenamiento.guardar("reactivos.json", [r.a_dict() for r in list(self.repositorio)])
+
+    """experimentos"""
+
+    @property
+    def experimentos(self):
+        """lista de experimentos; si se cargaron de la instantánea, los diccionarios se crean en el primer acceso"""
+        if not self._experimentos_cargados:
+            self.cargar_experimentos()
+        if self._experimentos is None:
+            self._experimentos = self._instantanea.registros()
+            self._instantanea = None
+        return self._experimentos
+
+    @experimentos.setter
+    def experimentos(self, experimentos):
+        self._experimentos = experimentos
+        self._instantanea = None
+        self._experimentos_cargados = True
+
+    def _usa_archivos(self):
+        return isinstance(self.almacenamiento, AlmacenamientoJSON)
+
+    @medido
+    def cargar_experimentos(self, ruta="experimentos.json"):
+        """carga los experimentos desde la instantánea binaria si está al día, o si no desde el archivo json
+        (y en ese caso deja escrita la instantánea para el próximo arranque)"""
+        self._experimentos_cargados = True
+        instantanea = abrir_instantanea(ruta) if self._usa_archivos() else None
+        if instantanea is not None:
+            self._experimentos = None
+            self._instantanea = instantanea
+            return
+        try:
+            experimentos = []
+            for experimento in self.almacenamiento.iterar(ruta, self.CAMPOS_EXPERIMENTO):
+                """las fechas y los nombres se repiten mucho: se internan para no guardar copias"""
+                experimento["fecha"] = sys.intern(experimento["fecha"])
+                experimento["personas_responsables"] = [sys.intern(p) for p in experimento["personas_responsables"]]
+                experimentos.append(experimento)
+            self.experimentos = experimentos
+        except FileNotFoundError:
+            print("Archivo de experimentos no encontrado. Se creará uno nuevo al guardar.")
+            self.experimentos = []
+            return
+        self.guardar_instantanea(ruta)
+
+    def instantanea_vigente(self):
+        """la instantánea abierta, mientras los experimentos sigan sin materializarse (y por lo tanto sin cambios)"""
+        if not self._experimentos_cargados:
+            self.cargar_experimentos()
+        return self._instantanea
+
+    def firma_experimentos(self):
+        """(cantidad, suma de ids) de los experimentos, sin materializarlos si vienen de la instantánea"""
+        instantanea = self.instantanea_vigente()
+        if instantanea is not None:
+            return instantanea.firma()
+        return firma_experimentos(self.experimentos)
+
+    def guardar_experimentos(self, cambios=None):
+        """guarda los experimentos; si se indican los cambios solo se persisten esos (según el almacenamiento)"""
+        if self.diferir("experimentos", self.escribir_experimentos):
+            return
+        if cambios is None:
+            self.escribir_experimentos()
+        else:
+            self.almacenamiento.guardar_cambios("experimentos.json", cambios, lambda: self.experimentos)
+
+    @medido
+    def escribir_experimentos(self):
+        """reescribe experimentos.json completo a partir de una copia (puede correr en otro hilo: list y dict
+        copian en C, sin soltar el GIL, así la copia no ve cambios a medias)"""
+        self.almacenamiento.guardar("experimentos.json", list(map(dict, self.experimentos)))
+
+    @medido
+    def guardar_instantanea(self, ruta="experimentos.json"):
+        """escribe la instantánea binaria junto al json; si los experimentos siguen siendo los de la
+        instantánea abierta (o nunca se cargaron) no hace falta"""
+        if self._experimentos is not None and self._usa_archivos():
+            escribir_instantanea(ruta_instantanea(ruta), self._experimentos)
+
+    """resultados"""
+
+    @property
+    def resultados(self):
+        if self._resultados is None:
+            try:
+                self._resultados = list(self.almacenamiento.iterar("resultados.json", self.CAMPOS_RESULTADO))
+            except FileNotFoundError:
+                print("archivo de resultados no encontrado. Se creará uno nuevo al guardar")
+                self._resultados = []
+        return self._resultados
+
+    def guardar_resultados(self, cambios=None):
+        """guarda los resultados; si se indican los cambios solo se persisten esos (según el almacenamiento)"""
+        if self.diferir("resultados", self.escribir_resultados):
+            return
+        if cambios is None:
+            self.escribir_resultados()
+        else:
+            self.almacenamiento.guardar_cambios("resultados.json", cambios, lambda: self.resultados)
+
+    @medido
+    def escribir_resultados(self):
+        """reescribe resultados.json completo a partir de una copia de la lista (puede correr en otro hilo)"""
+        self.almacenamiento.guardar("resultados.json", list(self.resultados))
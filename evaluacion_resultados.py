@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from analizador_resultados import compilar_extractores, medir
+
+"""evaluación de resultados contra los rangos (minimo, maximo) de los valores_a_medir de cada receta.
+las funciones no dependen de las gestiones, así se pueden ejecutar en otros procesos: para medir
+muchos experimentos se reparten en bloques entre un ProcessPoolExecutor y cada proceso recibe los
+valores a medir de las recetas una sola vez, al iniciarse, y compila ahí sus extractores"""
+
+TAMANO_BLOQUE = 20_000  # experimentos por tarea como máximo
+MINIMO_PARALELO = 50_000  # por debajo de esto arrancar los procesos cuesta más de lo que se gana
+
+
+def en_rango(valor, minimo, maximo):
+    return (minimo is None or valor >= minimo) and (maximo is None or valor <= maximo)
+
+
+def evaluar_valores(valores, extractores):
+    """{parámetro: True/False} para cada valor a medir de la receta; "no registrado" si no se pudo medir"""
+    return {
+        nombre: en_rango(valor, minimo, maximo) if valor is not None else "no registrado"
+        for (nombre, minimo, maximo, _), valor in zip(extractores, valores)
+    }
+
+
+def evaluar(experimento_id, nombre, valores, extractores):
+    """evaluación de un experimento con el formato de resultados.json, junto con los valores medidos"""
+    return {
+        "experimento": nombre if nombre is not None else experimento_id,
+        "experimento_id": experimento_id,
+        "evaluacion": evaluar_valores(valores, extractores),
+        "valores": {n: v for (n, _, _, _), v in zip(extractores, valores) if v is not None}
+    }
+
+
+_extractores_proceso = {}
+
+
+def _iniciar_proceso(valores_a_medir):
+    global _extractores_proceso
+    _extractores_proceso = {receta_id: compilar_extractores(valores) for receta_id, valores in valores_a_medir.items()}
+
+
+def _medir_bloque(bloque):
+    """mide filas (receta_id, resultado) con los extractores compilados al iniciar el proceso"""
+    return [medir(resultado, _extractores_proceso.get(receta_id, [])) for receta_id, resultado in bloque]
+
+
+def medir_experimentos(experimentos, recetas, procesos=None):
+    """tupla de valores medidos de cada experimento, en el mismo orden. a los procesos solo se mandan
+    (receta_id, resultado) en bloques de hasta TAMANO_BLOQUE, y solo vuelven tuplas de números"""
+    valores_a_medir = {receta["id"]: receta.get("valores_a_medir", []) for receta in recetas}
+    filas = [(e["receta_id"], e.get("resultado")) for e in experimentos]
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1 or len(filas) < MINIMO_PARALELO:
+        _iniciar_proceso(valores_a_medir)
+        return _medir_bloque(filas)
+
+    """al menos unos cuantos bloques por proceso, para que ninguno quede esperando al más lento"""
+    tamano = max(1, min(TAMANO_BLOQUE, -(-len(filas) // (procesos * 4))))
+    bloques = [filas[i:i + tamano] for i in range(0, len(filas), tamano)]
+    medidos = []
+    with ProcessPoolExecutor(procesos, initializer=_iniciar_proceso, initargs=(valores_a_medir,)) as executor:
+        for parcial in executor.map(_medir_bloque, bloques):
+            medidos.extend(parcial)
+    return medidos
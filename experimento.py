@@ -3,6 +3,8 @@ import random
 """clase de experimento, en la que ticen que de un experimento se conoce lo siguiente: 
 receta del experimento, personas responsables, fecha, costo asociado y el resultado"""
 class Experimento: 
+    __slots__ = ("id", "receta", "personas_responsables", "fecha", "costo_asociado", "resultado", "error_simulado")
+
     def __init__(self, id, receta, personas_responsables, fecha, costo_asociado, resultado):
         self.id = id
         self.receta = receta 
@@ -29,12 +31,12 @@ class Experimento:
         self.simular_error()
 
         """aqui descuenta los reactivos del inventario"""
-        for reactivo in self.receta.reactivos:
-            reactivo_en_inventario = next((r for r in gestion_reactivos.reactivos if r.nombre == reactivo['nombre']), None)
+        for reactivo_id, cantidad_base in self.receta.requerimientos:
+            reactivo_en_inventario = gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
             if reactivo_en_inventario:
-                reactivo_en_inventario.inventario_disponible -= reactivo['cantidad']
+                reactivo_en_inventario.inventario_base -= cantidad_base
                 """ajuste del inventario por error simulado"""
-                reactivo_en_inventario.inventario_disponible -= (reactivo['cantidad'] * self.error_simulado / 100)
+                reactivo_en_inventario.inventario_base -= (cantidad_base * self.error_simulado / 100)
 
         """aqui se guardan los resultados"""
         return f"experimento realizado con éxito. Costo: ${self.calcular_costo()}"
@@ -0,0 +1,131 @@
+import numpy as np
+
+"""factibilidad de recetas: cuántas corridas de cada receta alcanzan con el inventario actual, y qué combinación
+de corridas conviene cuando varias recetas comparten reactivos. la demanda receta × reactivo se guarda como
+matriz dispersa (formato CSR: indptr, indices y datos en arreglos numpy) y se arma una sola vez por versión
+del archivo de recetas"""
+
+EPSILON = 1e-9  # tolerancia al redondear corridas (0.3 / 0.1 = 2.9999...)
+
+
+class FactibilidadRecetas:
+    def __init__(self, gestion_reactivos, almacen_recetas):
+        self.gestion_reactivos = gestion_reactivos
+        self.almacen_recetas = almacen_recetas
+        self._recetas = None  # lista de recetas con la que se armó la matriz
+
+    def _armar_matriz(self):
+        """fila por receta y columna por reactivo, con la cantidad por corrida en unidades base"""
+        recetas = self.almacen_recetas.recetas()
+        if recetas is self._recetas:
+            return
+        columnas = {}
+        indptr, indices, datos = [0], [], []
+        for receta in recetas:
+            demanda = {}
+            for reactivo_id, cantidad_base in self.almacen_recetas.requerimientos_base(receta["id"]):
+                if cantidad_base > 0:
+                    demanda[reactivo_id] = demanda.get(reactivo_id, 0) + cantidad_base
+            for reactivo_id, cantidad_base in demanda.items():
+                indices.append(columnas.setdefault(reactivo_id, len(columnas)))
+                datos.append(cantidad_base)
+            indptr.append(len(indices))
+        self.receta_ids = np.array([r["id"] for r in recetas], dtype=np.int64)
+        self.reactivo_ids = np.fromiter(columnas, dtype=np.int64, count=len(columnas))
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+        self.datos = np.array(datos, dtype=np.float64)
+        self.filas = np.repeat(np.arange(len(recetas)), np.diff(self.indptr))  # fila de cada entrada
+        self._recetas = recetas
+
+    def inventario(self, fecha=None):
+        """(inventario, costo) por columna en unidades base; los reactivos que no existen o que ya caducaron
+        en esa fecha cuentan como inventario 0"""
+        self._armar_matriz()
+        caducados = self.gestion_reactivos.ids_caducados(fecha) if fecha else set()
+        inventario = np.zeros(len(self.reactivo_ids))
+        costo = np.zeros(len(self.reactivo_ids))
+        for j, reactivo_id in enumerate(self.reactivo_ids.tolist()):
+            reactivo = self.gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
+            if reactivo is not None and reactivo_id not in caducados:
+                inventario[j] = max(reactivo.inventario_base, 0.0)
+                costo[j] = reactivo.costo
+        return inventario, costo
+
+    def maximo_corridas(self, fecha=None, perdida=0.0):
+        """{receta_id: corridas} que permite el inventario para cada receta por separado: el mínimo, entre sus
+        reactivos, de inventario / cantidad por corrida, calculado para todas las recetas en una operación.
+        perdida agrega un margen por corrida (por ejemplo 0.225 para el peor caso de realizar_experimento).
+        una receta sin reactivos no tiene límite (None)"""
+        inventario, _ = self.inventario(fecha)
+        maximos = self._maximos(inventario, self.datos * (1 + perdida))
+        return {
+            receta_id: int(maximo) if np.isfinite(maximo) else None
+            for receta_id, maximo in zip(self.receta_ids.tolist(), maximos.tolist())
+        }
+
+    def _maximos(self, inventario, demanda):
+        cocientes = np.floor(inventario[self.indices] / demanda + EPSILON)
+        maximos = np.full(len(self.receta_ids), np.inf)
+        con_reactivos = np.diff(self.indptr) > 0
+        if con_reactivos.any():
+            maximos[con_reactivos] = np.minimum.reduceat(cocientes, self.indptr[:-1][con_reactivos])
+        return maximos
+
+    def mezcla(self, pesos=None, limites=None, fecha=None, perdida=0.0):
+        """combinación de corridas que reparte el inventario compartido entre las recetas, buscando maximizar
+        la suma de peso × corridas sin pasarse de ningún reactivo. es una heurística voraz para el problema
+        entero: cada reactivo tiene un precio (1 / inventario, así los escasos cuestan más), las recetas se
+        ordenan por peso / precio de una corrida y cada una se lleva todas las corridas que todavía alcancen.
+        pesos: {receta_id: prioridad} (1 por defecto; 0 la excluye) o "costo" para preferir las corridas
+        baratas. limites: {receta_id: corridas como máximo}. devuelve ({receta_id: corridas}, costo total)"""
+        inventario, costo = self.inventario(fecha)
+        demanda = self.datos * (1 + perdida)
+        n = len(self.receta_ids)
+        costo_corrida = np.bincount(self.filas, weights=demanda * costo[self.indices], minlength=n)
+        if pesos == "costo":
+            peso = 1 / np.maximum(costo_corrida, EPSILON)
+        else:
+            pesos = pesos or {}
+            peso = np.array([pesos.get(receta_id, 1.0) for receta_id in self.receta_ids.tolist()], dtype=np.float64)
+
+        precio = np.full(len(inventario), np.inf)
+        precio[inventario > 0] = 1 / inventario[inventario > 0]
+        uso = np.bincount(self.filas, weights=demanda * precio[self.indices], minlength=n)  # parte del inventario por corrida
+        with np.errstate(divide="ignore", invalid="ignore"):
+            eficiencia = np.where((uso > 0) & np.isfinite(uso) & (peso > 0), peso / uso, -np.inf)
+
+        limites = limites or {}
+        restante = inventario.copy()
+        corridas = {}
+        total = 0.0
+        for i in np.argsort(-eficiencia, kind="stable").tolist():
+            if eficiencia[i] == -np.inf:
+                break
+            inicio, fin = self.indptr[i], self.indptr[i + 1]
+            columnas = self.indices[inicio:fin]
+            posibles = np.floor(np.min(restante[columnas] / demanda[inicio:fin]) + EPSILON)
+            posibles = min(posibles, limites.get(int(self.receta_ids[i]), np.inf))
+            if posibles >= 1:
+                restante[columnas] = np.maximum(restante[columnas] - posibles * demanda[inicio:fin], 0.0)
+                corridas[int(self.receta_ids[i])] = int(posibles)
+                total += posibles * costo_corrida[i]
+        return corridas, float(total)
+
+    def mostrar(self, pesos=None, fecha=None, cantidad=20):
+        """muestra las recetas con más corridas posibles y la combinación sugerida"""
+        maximos = self.maximo_corridas(fecha)
+        corridas, costo = self.mezcla(pesos, fecha=fecha)
+        nombres = {r["id"]: r["nombre"] for r in self.almacen_recetas.recetas()}
+        print("\ncorridas posibles por receta (cada una por separado):")
+        ordenados = sorted(maximos.items(), key=lambda x: -1 if x[1] is None else x[1], reverse=True)
+        for receta_id, maximo in ordenados[:cantidad]:
+            print(f"  - {nombres[receta_id]}: {'sin límite' if maximo is None else maximo}")
+        if len(ordenados) > cantidad:
+            print(f"  ... y {len(ordenados) - cantidad} recetas más")
+        print("combinación sugerida compartiendo el inventario:")
+        if not corridas:
+            print("  el inventario no alcanza para ninguna corrida")
+        for receta_id, n in sorted(corridas.items(), key=lambda x: x[1], reverse=True):
+            print(f"  - {nombres[receta_id]}: {n} corridas")
+        print(f"costo total de la combinación: ${costo:.2f}")
@@ -1,107 +1,165 @@
 import json
-import matplotlib.pyplot as plt
+import os
+import sys
+from almacenamiento_sqlite import AlmacenamientoSQLite
+from contadores_estadisticas import ContadoresEstadisticas, firma_recetas
+from lector_json import iterar_registros
+from contexto_laboratorio import ContextoLaboratorio
+from gestion_experimentos import GestionExperimentos
+from instrumentacion import medido
+
+ARCHIVO_GRAFICO = "estadisticas.png"
+BACKENDS_SIN_VENTANA = ("agg", "pdf", "ps", "svg", "cairo", "template")
+
+
+def pyplot():
+    """importa matplotlib recién al graficar (tarda más que todo el resto del arranque). sin pantalla (ssh,
+    servidores, contenedores) y sin un MPLBACKEND elegido se usa Agg, que dibuja sin abrir ventanas"""
+    import matplotlib
+    sin_pantalla = sys.platform.startswith("linux") and not (os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    if sin_pantalla and "MPLBACKEND" not in os.environ:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
 
 """gestiona la generación y visualización de estadísticas del sapulaboratorio"""
 class GestionEstadisticas:
-    def __init__(self, gestion_experimentos):
-        self.gestion_experimentos = gestion_experimentos
-        self.experimentos = []
-        self.reactivos = []
-        self.resultados = []
+    def __init__(self, contexto=None, gestion_experimentos=None):
+        self.contexto = contexto if contexto is not None else ContextoLaboratorio()
+        self.gestion_experimentos = gestion_experimentos if gestion_experimentos is not None else GestionExperimentos(self.contexto)
+        self.almacenamiento = self.contexto.almacenamiento
+        self.almacen_recetas = self.contexto.almacen_recetas
+        self._motor = None
+        self._firma_motor = None
+        self.contadores = ContadoresEstadisticas()
+        self._recetas = None  # lista de recetas con la que se armaron los contadores
         self.cargar_datos_json()
+        self.gestion_experimentos.suscribir(self.al_cambiar_experimento)
 
-    def cargar_resultados_json(self):
-        """carga los datos de resultados desde el archivo json"""
-        try:
-            with open("resultados.json", "r", encoding="utf-8") as f:
-                resultados = json.load(f)
-                if not isinstance(resultados, list) or not all("experimento" in r and "resultado" in r for r in resultados):
-                    raise ValueError("el formato de los datos en resultados.json es incorrecto.")
-                return resultados
-        except FileNotFoundError:
-            print("archivo de resultados no encontrado.")
-            return []
+    @property
+    def repositorio_reactivos(self):
+        return self.contexto.repositorio
+
+    @property
+    def resultados(self):
+        return self.contexto.resultados
 
+    @medido
     def cargar_datos_json(self):
-        """carga experimentos, reactivos y resultados desde archivos json"""
-        try:
-            self.resultados = self.cargar_resultados_json()  # cargar y valida los resultados
+        """prepara los contadores a partir de los experimentos del contexto: los guardados solo se
+        recalculan si no corresponden a los experimentos y las recetas actuales"""
+        self._recetas = self.almacen_recetas.recetas()
+        if self.contadores.cargar("estadisticas.json", self.contexto.firma_experimentos(), firma_recetas(self._recetas),
+                                  lambda: self.contexto.experimentos, self.almacen_recetas.obtener_por_id):
+            self.contadores.guardar("estadisticas.json")
+
+    def _contadores_al_dia(self):
+        """si recetas.json se releyó después de armar los contadores, el uso de reactivos puede haber cambiado"""
+        if self.almacen_recetas.recetas() is not self._recetas:
+            self.cargar_datos_json()
 
-            with open("experimentos.json", "r", encoding="utf-8") as f:
-                self.experimentos = json.load(f)
-                """validar que los datos contengan la estructura esperada"""
-                if not isinstance(self.experimentos, list) or not all("id" in e and "receta_id" in e and "personas_responsables" in e for e in self.experimentos):
-                    raise ValueError("el formato de los datos en experimentos.json es incorrecto")
+    def al_cambiar_experimento(self, evento, experimento, consumo=None):
+        """mantiene los contadores al día con cada experimento creado, eliminado o realizado"""
+        if evento == "creado":
+            self.contadores.registrar_experimento(experimento, self.almacen_recetas.obtener_por_id(experimento["receta_id"]))
+        elif evento == "eliminado":
+            self.contadores.quitar_experimento(experimento, self.almacen_recetas.obtener_por_id(experimento["receta_id"]))
+        elif evento in ("realizado", "realizados"):
+            self.contadores.registrar_consumo(consumo or {})
+        if not self.contexto.diferir("estadisticas", self.guardar_contadores):
+            self.guardar_contadores()
 
-            with open("reactivos.json", "r", encoding="utf-8") as f:
-                self.reactivos = json.load(f)
-                """valida que los datos contengan la estructura esperada"""
-                if not isinstance(self.reactivos, list) or not all("nombre" in r and "inventario_disponible" in r for r in self.reactivos):
-                    raise ValueError("el formato de los datos en reactivos.json es incorrecto")
+    @medido
+    def guardar_contadores(self):
+        self.contadores.guardar("estadisticas.json")
 
-            print("datos de experimentos y reactivos cargados correctamente")
+    def _usa_sqlite(self):
+        """con sqlite las estadísticas se calculan con consultas indexadas en la base de datos"""
+        return isinstance(self.almacenamiento, AlmacenamientoSQLite)
 
-        except FileNotFoundError as e:
-            print(f"error al cargar los archivos: {e}")
+    def motor_desde_archivo(self, ruta):
+        """motor de estadísticas para un historial exportado (json o json lines) de cualquier tamaño:
+        los experimentos se leen uno por uno sin guardarlos en memoria"""
+        from motor_estadisticas import MotorEstadisticas
+        return MotorEstadisticas.desde_experimentos(
+            iterar_registros(ruta, ("receta_id", "fecha", "costo_asociado", "personas_responsables")))
 
+    @medido
+    def obtener_motor(self):
+        """devuelve el motor columnar, reconstruyéndolo solo si cambió la lista de experimentos.
+        mientras los experimentos sigan en la instantánea binaria, el motor usa sus columnas directamente"""
+        from motor_estadisticas import MotorEstadisticas
+        instantanea = self.contexto.instantanea_vigente()
+        if instantanea is not None:
+            if self._firma_motor != ("instantanea", id(instantanea)):
+                self._motor = instantanea.motor()
+                self._firma_motor = ("instantanea", id(instantanea))
+            return self._motor
+        experimentos = self.contexto.experimentos
+        firma = (id(experimentos), len(experimentos))
+        if self._motor is None or firma != self._firma_motor:
+            self._motor = MotorEstadisticas.desde_experimentos(experimentos)
+            self._firma_motor = firma
+        return self._motor
+
+    @medido
     def investigador_mas_activo(self):
         """devuelve el nombre del investigador con más experimentos realizados"""
-        investigadores = {}
-        for exp in self.gestion_experimentos.experimentos:
-            for investigador in exp["personas_responsables"]:
-                investigadores[investigador] = investigadores.get(investigador, 0) + 1
-        if investigadores:
-            return max(investigadores, key=investigadores.get)
+        if self._usa_sqlite():
+            investigadores = self.almacenamiento.contar_por_investigador()
+            if investigadores:
+                return max(investigadores, key=investigadores.get)
+        elif len(self.contadores.investigadores):
+            return self.contadores.investigadores.maximo()
         return "no hay datos suficientes"
 
+    @medido
     def experimento_mas_menos_frecuente(self):
         """devuelve los experimentos más y menos realizados"""
-        frecuencia = {}
-        for exp in self.gestion_experimentos.experimentos:
-            receta_id = exp["receta_id"]
-            frecuencia[receta_id] = frecuencia.get(receta_id, 0) + 1
-        if frecuencia:
-            max_exp = max(frecuencia, key=frecuencia.get)
-            min_exp = min(frecuencia, key=frecuencia.get)
-            return max_exp, min_exp
+        if self._usa_sqlite():
+            frecuencia = self.almacenamiento.contar_por_receta()
+            if frecuencia:
+                return max(frecuencia, key=frecuencia.get), min(frecuencia, key=frecuencia.get)
+        elif len(self.contadores.recetas):
+            return self.contadores.recetas.maximo(), self.contadores.recetas.minimo()
         return "no hay datos suficientes", "no hay datos suficientes"
 
+    @medido
     def obtener_nombre_receta(self, receta_id):
         """obtiene el nombre de una receta dado su ID"""
         try:
-            with open("recetas.json", "r", encoding="utf-8") as f:
-                recetas = json.load(f)
-                receta = next((r for r in recetas if r["id"] == receta_id), None)
-                return receta["nombre"] if receta else f"receta {receta_id}"
+            receta = self.almacen_recetas.obtener_por_id(receta_id)
+            return receta["nombre"] if receta else f"receta {receta_id}"
         except (FileNotFoundError, json.JSONDecodeError):
             return f"receta {receta_id}"
 
+    @medido
     def obtener_nombre_reactivo(self, reactivo_id):
         """obtiene el nombre de un reactivo dado su ID"""
-        reactivo = next((r for r in self.reactivos if r["id"] == reactivo_id), None)
-        return reactivo["nombre"] if reactivo else f"reactivo {reactivo_id}"
+        reactivo = self.repositorio_reactivos.obtener_por_id(reactivo_id)
+        return reactivo.nombre if reactivo else f"reactivo {reactivo_id}"
 
+    @medido
     def reactivos_mas_usados(self):
         """devuelve una lista de los reactivos más utilizados en experimentos"""
         uso_reactivos = {}
-        try:
-            with open("recetas.json", "r", encoding="utf-8") as f:
-                recetas = json.load(f)
-                for exp in self.gestion_experimentos.experimentos:
-                    receta = next((r for r in recetas if r["id"] == exp["receta_id"]), None)
-                    if receta and "reactivos_utilizados" in receta:
-                        for reactivo in receta["reactivos_utilizados"]:
-                            if "reactivo_id" in reactivo:
-                                nombre_reactivo = self.obtener_nombre_reactivo(reactivo["reactivo_id"])
-                                uso_reactivos[nombre_reactivo] = uso_reactivos.get(nombre_reactivo, 0) + 1
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"error al procesar recetas: {e}")
-            return []
+        if self._usa_sqlite():
+            self.almacenamiento.sincronizar_recetas(self.almacen_recetas.recetas())
+            for reactivo_id, usos in self.almacenamiento.contar_uso_reactivos().items():
+                nombre_reactivo = self.obtener_nombre_reactivo(reactivo_id)
+                uso_reactivos[nombre_reactivo] = uso_reactivos.get(nombre_reactivo, 0) + usos
+        else:
+            self._contadores_al_dia()
+            for reactivo_id, usos in self.contadores.uso_reactivos.items():
+                nombre_reactivo = self.obtener_nombre_reactivo(reactivo_id)
+                uso_reactivos[nombre_reactivo] = uso_reactivos.get(nombre_reactivo, 0) + usos
 
         """ordenar por frecuencia de uso y obtener los 5 más usados"""
         reactivos_ordenados = sorted(uso_reactivos.items(), key=lambda x: x[1], reverse=True)[:5]
         return [f"{nombre} ({usos} usos)" for nombre, usos in reactivos_ordenados]
 
+    @medido
     def mostrar_estadisticas(self):
         """muestra estadísticas generales del laboratorio en consola"""
         print("\nestadísticas del laboratorio")
@@ -112,14 +170,64 @@ class GestionEstadisticas:
         print("reactivos más usados:")
         for reactivo in self.reactivos_mas_usados():
             print(f"  - {reactivo}")
+        print("recetas con mayor costo acumulado (total / promedio):")
+        costos = sorted(self.costo_por_receta().items(), key=lambda x: x[1][0], reverse=True)[:5]
+        for receta_id, (total, promedio) in costos:
+            print(f"  - {self.obtener_nombre_receta(receta_id)}: ${total:.2f} / ${promedio:.2f}")
+        print("costo por mes:")
+        experimentos_por_mes = self.experimentos_por_mes()
+        for mes, total in self.costo_por_mes().items():
+            print(f"  - {mes}: ${total:.2f} ({experimentos_por_mes[mes]} experimentos)")
+
+    @medido
+    def resumen(self):
+        """las mismas estadísticas que mostrar_estadisticas, como diccionario listo para pasar a json"""
+        max_exp, min_exp = self.experimento_mas_menos_frecuente()
+        return {
+            "investigador_mas_activo": self.investigador_mas_activo(),
+            "experimento_mas_realizado": {"id": max_exp, "nombre": self.obtener_nombre_receta(max_exp)},
+            "experimento_menos_realizado": {"id": min_exp, "nombre": self.obtener_nombre_receta(min_exp)},
+            "reactivos_mas_usados": self.reactivos_mas_usados(),
+            "costo_por_receta": {
+                str(receta_id): {"nombre": self.obtener_nombre_receta(receta_id), "total": total, "promedio": promedio}
+                for receta_id, (total, promedio) in self.costo_por_receta().items()
+            },
+            "costo_por_mes": self.costo_por_mes(),
+            "experimentos_por_mes": self.experimentos_por_mes()
+        }
+
+    @medido
+    def costo_por_receta(self):
+        """devuelve {receta_id: (costo total, costo promedio)} de los experimentos"""
+        return {
+            receta_id: (total, total / self.contadores.recetas.conteos[receta_id])
+            for receta_id, total in self.contadores.costo_por_receta.items()
+        }
+
+    @medido
+    def costo_por_mes(self):
+        """devuelve {"YYYY-MM": costo total} de los experimentos"""
+        return self.obtener_motor().costo_por_mes()
+
+    @medido
+    def experimentos_por_mes(self):
+        """devuelve {"YYYY-MM": número de experimentos}"""
+        return self.obtener_motor().experimentos_por_mes()
 
+    @medido
     def graficar_estadisticas(self):
         """genera gráficos de los experimentos más y menos frecuentes"""
         exp_max, min_exp = self.experimento_mas_menos_frecuente()
         nombres = [self.obtener_nombre_receta(exp_max), self.obtener_nombre_receta(min_exp)]
+        plt = pyplot()
         plt.figure(figsize=(10, 6))
         plt.bar(nombres, [1, 0])
         plt.title("experimentos más y menos frecuentes")
         plt.xticks(rotation=45, ha='right')
         plt.tight_layout()
-        plt.show()
+        if plt.get_backend().lower() in BACKENDS_SIN_VENTANA:
+            plt.savefig(ARCHIVO_GRAFICO)
+            plt.close()
+            print(f"no hay pantalla: el gráfico se guardó en {ARCHIVO_GRAFICO}")
+        else:
+            plt.show()
@@ -1,15 +1,63 @@
-import json
+import datetime
 import random
-import os
-from receta import Receta
 from gestion_reactivos import GestionReactivos
+from almacenamiento import cambio_guardar, cambio_eliminar
+from contexto_laboratorio import ContextoLaboratorio
+from busqueda import elegir
+from instrumentacion import medido
+
+def fecha_valida(fecha):
+    """True si la fecha es un texto YYYY-MM-DD; las estadísticas, la instantánea y los pronósticos la leen así"""
+    try:
+        return datetime.date.fromisoformat(fecha).isoformat() == fecha
+    except (TypeError, ValueError):
+        return False
+
 
 class GestionExperimentos:
     """gestiona la creación, modificación y ejecución de experimentos químicos"""
-    def __init__(self):
-        self.experimentos = []
-        self.gestion_reactivos = GestionReactivos()
-        self.cargar_experimentos_json("experimentos.json")
+    def __init__(self, contexto=None, gestion_reactivos=None):
+        self.contexto = contexto if contexto is not None else ContextoLaboratorio()
+        self.gestion_reactivos = gestion_reactivos if gestion_reactivos is not None else GestionReactivos(self.contexto)
+        self.almacen_recetas = self.contexto.almacen_recetas
+        self.almacenamiento = self.contexto.almacenamiento
+        self.observadores = []
+        self.pronostico = None
+        self._factibilidad = None
+        self._ultimo_id = (None, 0, 0)  # (lista de experimentos, su largo, ID máximo) para no recorrerla en cada alta
+        self.suscribir(self.contexto.indice_reactivos.al_cambiar_experimento)
+
+    @property
+    def factibilidad(self):
+        """corridas posibles por receta; el módulo (y su matriz) se cargan la primera vez que se usa"""
+        if self._factibilidad is None:
+            from factibilidad import FactibilidadRecetas
+            self._factibilidad = FactibilidadRecetas(self.gestion_reactivos, self.almacen_recetas)
+        return self._factibilidad
+
+    @property
+    def experimentos(self):
+        """los experimentos del contexto compartido"""
+        return self.contexto.experimentos
+
+    @experimentos.setter
+    def experimentos(self, experimentos):
+        self.contexto.experimentos = experimentos
+
+    def instantanea_vigente(self):
+        return self.contexto.instantanea_vigente()
+
+    def firma_experimentos(self):
+        return self.contexto.firma_experimentos()
+
+    def suscribir(self, observador):
+        """registra una función observador(evento, experimento, **datos) que se llama con
+        "creado", "eliminado", "realizado" o "realizados" (lote) después de cada cambio"""
+        self.observadores.append(observador)
+
+    def notificar(self, evento, experimento, **datos):
+        for observador in self.observadores:
+            observador(evento, experimento, **datos)
     
     def menu(self):
         """muestra el menú de opciones para gestionar experimentos"""
@@ -19,7 +67,11 @@ class GestionExperimentos:
             print("2. modificar experimento")
             print("3. eliminar experimento")
             print("4. listar experimentos")
-            print("5. volver al menú principal")
+            print("5. realizar experimentos (por lote)")
+            print("6. simular plan de experimentos")
+            print("7. pronóstico de inventario y lista de compras")
+            print("8. corridas posibles por receta")
+            print("9. volver al menú principal")
             
             opcion = input("seleccione una opción: ")
             
@@ -34,6 +86,32 @@ class GestionExperimentos:
             elif opcion == "4":
                 self.listar_experimentos()
             elif opcion == "5":
+                ids = [int(i) for i in input("IDs de los experimentos (separados por coma): ").split(",") if i.strip()]
+                todo_o_nada = input("¿todo o nada? (s/n): ").lower() == "s"
+                self.realizar_experimentos(ids, todo_o_nada)
+            elif opcion == "6":
+                plan = {}
+                for parte in input("plan (receta_id:corridas, separados por coma): ").split(","):
+                    if parte.strip():
+                        receta_id, corridas = parte.split(":")
+                        plan[int(receta_id)] = plan.get(int(receta_id), 0) + int(corridas)
+                ensayos = int(input("número de ensayos (10000): ") or 10000)
+                self.simular_plan(plan, ensayos)
+            elif opcion == "7":
+                horizonte = int(input("días a cubrir con la compra (30): ") or 30)
+                self.mostrar_pronostico(horizonte)
+            elif opcion == "8":
+                criterio = input("preferir (1) más corridas o (2) corridas más baratas: ")
+                fecha = input("fecha en que se harán (YYYY-MM-DD, vacío para no descontar caducados): ").strip()
+                if fecha and not fecha_valida(fecha):
+                    print("fecha no válida, use el formato YYYY-MM-DD.")
+                    continue
+                self.factibilidad.mostrar("costo" if criterio == "2" else None, fecha or None)
+                if fecha:
+                    no_realizables = self.recetas_no_realizables(fecha)
+                    print(f"recetas con reactivos caducados el {fecha}: "
+                          f"{', '.join(r['nombre'] for r in no_realizables) or 'ninguna'}")
+            elif opcion == "9":
                 break
             else:
                 print("Opción no válida. Intente nuevamente.")
@@ -41,91 +119,131 @@ class GestionExperimentos:
     def crear_experimento(self):
         """solicita datos y registra un nuevo experimento"""
         nombre = input("nombre del experimento: ")
-        receta = input("nombre de la receta base: ")
+        receta = self.elegir_receta(input("nombre de la receta base: "))
+        if receta is None:
+            return
+        receta = receta["nombre"]
         responsables = input("personas responsables: ").split(', ')
         fecha = input("fecha del experimento (YYYY-MM-DD): ")
+        if not fecha_valida(fecha):
+            print("fecha no válida, use el formato YYYY-MM-DD.")
+            return
         
-        if not self.validar_reactivos(receta):
+        if not self.validar_reactivos(receta, fecha):
             print("no se puede realizar el experimento. Reactivos insuficientes o caducados.")
             return
         
-        costo = self.calcular_costo_experimento(receta)
         resultado = input("resultado del experimento: ")
-        
+        self.agregar_experimento(nombre, receta, responsables, fecha, resultado)
+        print("experimento registrado exitosamente!")
+
+    def elegir_receta(self, texto):
+        """la receta con ese nombre exacto o, si no existe, una de las más parecidas elegida en el menú"""
+        sugerir = lambda texto, cantidad: [(r, r["nombre"]) for r, _ in self.almacen_recetas.buscar_aproximado(texto, cantidad)]
+        return elegir(texto, self.almacen_recetas.obtener_por_nombre(texto), sugerir)
+
+    def registrar_experimento(self, nombre, receta, responsables, fecha, resultado=""):
+        """lo mismo que crear_experimento pero con los datos como argumentos: valida y descuenta los
+        reactivos y registra el experimento. devuelve el experimento, o None si no se pudo realizar"""
+        if not fecha_valida(fecha):
+            print("fecha no válida, use el formato YYYY-MM-DD.")
+            return None
+        if not self.validar_reactivos(receta, fecha):
+            print("no se puede realizar el experimento. Reactivos insuficientes o caducados.")
+            return None
+        return self.agregar_experimento(nombre, receta, responsables, fecha, resultado)
+
+    @medido
+    def agregar_experimento(self, nombre, receta, responsables, fecha, resultado):
+        """registra un experimento cuyos reactivos ya se validaron y descontaron"""
+        experimentos = self.experimentos
+        lista, largo, maximo = self._ultimo_id
+        if lista is not experimentos or largo != len(experimentos):
+            maximo = max((e["id"] for e in experimentos), default=0)
         experimento = {
+            "id": maximo + 1,
             "nombre": nombre,
-            "receta": receta,
-            "responsables": responsables,
+            "receta_id": self.almacen_recetas.obtener_por_nombre(receta)["id"],
+            "personas_responsables": responsables,
             "fecha": fecha,
-            "costo": costo,
+            "costo_asociado": self.calcular_costo_experimento(receta),
             "resultado": resultado
         }
         
-        self.experimentos.append(experimento)
-        self.guardar_experimentos_json()
-        print("experimento registrado exitosamente!")
+        experimentos.append(experimento)
+        self._ultimo_id = (experimentos, len(experimentos), experimento["id"])
+        self.guardar_experimentos_json([cambio_guardar(experimento)])
+        self.notificar("creado", experimento)
+        return experimento
     
-    def validar_reactivos(self, receta_nombre):
-        """verifica si hay suficientes reactivos disponibles para un experimento"""
-        with open(os.path.join("data", "recetas.json"), "r", encoding="utf-8") as f:
-            recetas = json.load(f)
-            receta = next((r for r in recetas if r["nombre"] == receta_nombre), None)
+    @medido
+    def validar_reactivos(self, receta_nombre, fecha=None):
+        """verifica si hay suficientes reactivos disponibles (y sin caducar en la fecha indicada) para un experimento"""
+        receta = self.almacen_recetas.obtener_por_nombre(receta_nombre)
         
         if not receta:
             print("receta no encontrada.")
             return False
         
-        for reactivo in receta["reactivos"]:
-            nombre = reactivo["nombre"]
-            cantidad_necesaria = reactivo["cantidad"]
-            reactivo_lab = next((r for r in self.gestion_reactivos.reactivos if r.nombre == nombre), None)
+        caducados = self.gestion_reactivos.ids_caducados(fecha) if fecha else set()
+        requerimientos = self.almacen_recetas.requerimientos_base(receta["id"])
+        for reactivo_id, cantidad_base in requerimientos:
+            reactivo_lab = self.gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
             
-            if not reactivo_lab or reactivo_lab.cantidad < cantidad_necesaria:
+            if not reactivo_lab or reactivo_lab.inventario_base < cantidad_base or reactivo_lab.id in caducados:
                 return False
         
-        self.restar_inventario(receta["reactivos"])
+        self.restar_inventario(requerimientos)
         return True
     
-    def restar_inventario(self, reactivos):
-        """descuenta del inventario los reactivos usados en un experimento"""
-        for reactivo in reactivos:
-            nombre = reactivo["nombre"]
-            cantidad_necesaria = reactivo["cantidad"]
-            reactivo_lab = next((r for r in self.gestion_reactivos.reactivos if r.nombre == nombre), None)
+    def restar_inventario(self, requerimientos):
+        """descuenta del inventario los reactivos usados en un experimento; requerimientos es una lista de
+        (reactivo_id, cantidad en unidades base)"""
+        cambios = []
+        for reactivo_id, cantidad_base in requerimientos:
+            reactivo_lab = self.gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
             
             if reactivo_lab:
-                error = random.uniform(0.001, 0.225) * cantidad_necesaria
-                reactivo_lab.cantidad -= (cantidad_necesaria + error)
-                print(f"descontado {cantidad_necesaria + error:.2f} de {nombre} (incluyendo error aleatorio de {error:.2f})")
+                error = random.uniform(0.001, 0.225) * cantidad_base
+                reactivo_lab.inventario_base -= (cantidad_base + error)
+                print(f"descontado {(cantidad_base + error) / reactivo_lab.factor:.2f} {reactivo_lab.unidad_medida} de {reactivo_lab.nombre} "
+                      f"(incluyendo error aleatorio de {error / reactivo_lab.factor:.2f})")
+                cambios.append(cambio_guardar(reactivo_lab.a_dict()))
         
-        self.gestion_reactivos.guardar_reactivos_json()
+        self.gestion_reactivos.guardar_reactivos_json(cambios)
     
+    @medido
     def calcular_costo_experimento(self, receta_nombre):
         """calcula el costo total de un experimento según los reactivos requeridos"""
-        with open(os.path.join("data", "recetas.json"), "r", encoding="utf-8") as f:
-            recetas = json.load(f)
-            receta = next((r for r in recetas if r["nombre"] == receta_nombre), None)
+        receta = self.almacen_recetas.obtener_por_nombre(receta_nombre)
         
         if not receta:
             return 0
         
-        costo_total = sum(reactivo["costo"] * reactivo["cantidad"] for reactivo in receta["reactivos"])
+        costo_total = 0
+        for reactivo_id, cantidad_base in self.almacen_recetas.requerimientos_base(receta["id"]):
+            reactivo_lab = self.gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
+            if reactivo_lab:
+                costo_total += reactivo_lab.costo * cantidad_base
         return costo_total
     
     def modificar_experimento(self, nombre):
         """modifica el resultado de un experimento existente"""
-        experimento = next((e for e in self.experimentos if e["nombre"] == nombre), None)
+        experimento = next((e for e in self.experimentos if e.get("nombre") == nombre), None)
         if experimento:
             experimento["resultado"] = input(f"Nuevo resultado ({experimento['resultado']}): ") or experimento["resultado"]
-            self.guardar_experimentos_json()
+            self.guardar_experimentos_json([cambio_guardar(experimento)])
             print("experimento modificado correctamente")
         else:
             print("experimento no encontrado")
     
     def eliminar_experimento(self, nombre):
         """elimina un experimento del registro"""
-        self.experimentos = [e for e in self.experimentos if e["nombre"] != nombre]
-        self.guardar_experimentos_json()
+        eliminados = [e for e in self.experimentos if e.get("nombre") == nombre]
+        self.experimentos = [e for e in self.experimentos if e.get("nombre") != nombre]
+        self.guardar_experimentos_json([cambio_eliminar(e["id"]) for e in eliminados])
+        for experimento in eliminados:
+            self.notificar("eliminado", experimento)
         print("experimento eliminado correctamente")
     
     def listar_experimentos(self):
@@ -135,22 +253,21 @@ class GestionExperimentos:
         for experimento in self.experimentos:
             print(experimento)
     
+    @medido
     def cargar_experimentos_json(self, file_path="experimentos.json"):
-        """carga los experimentos desde un archivo json"""
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                self.experimentos = json.load(f)
-                # Validar que los datos contengan la estructura esperada
-                if not isinstance(self.experimentos, list) or not all("id" in e and "receta_id" in e and "personas_responsables" in e and "fecha" in e and "costo_asociado" in e and "resultado" in e for e in self.experimentos):
-                    raise ValueError("El formato de los datos en experimento.json es incorrecto.")
-        except FileNotFoundError:
-            print("Archivo de experimentos no encontrado. Se creará uno nuevo al guardar.")
+        """vuelve a cargar los experimentos (normalmente se cargan solos la primera vez que se usan)"""
+        self.contexto.cargar_experimentos(file_path)
+
+    @medido
+    def guardar_instantanea(self, file_path="experimentos.json"):
+        self.contexto.guardar_instantanea(file_path)
     
-    def guardar_experimentos_json(self):
-        """guarda los experimentos en un archivo json"""
-        with open(os.path.join("data", "experimentos.json"), "w", encoding="utf-8") as f:
-            json.dump(self.experimentos, f, indent=4)
+    @medido
+    def guardar_experimentos_json(self, cambios=None):
+        """guarda los experimentos; si se indican los cambios solo se persisten esos (según el almacenamiento)"""
+        self.contexto.guardar_experimentos(cambios)
 
+    @medido
     def realizar_experimento(self, experimento_id):
         """ejecuta un experimento verificando reactivos y actualizando el inventario"""
         experimento = next((exp for exp in self.experimentos if exp["id"] == experimento_id), None)
@@ -163,31 +280,177 @@ class GestionExperimentos:
             print(f"no se encontró la receta con ID {experimento['receta_id']}")
             return
 
-        for reactivo in receta.reactivos:
-            if not self.gestion_reactivos.verificar_disponibilidad(reactivo["nombre"], reactivo["cantidad"]):
-                print(f"No hay suficiente {reactivo['nombre']} en inventario o está vencido.")
-                return
+        validacion, mensaje = receta.verificar_reactivos_disponibles(self.gestion_reactivos, experimento["fecha"])
+        if not validacion:
+            print(mensaje)
+            return
 
             # resta del inventario y simula error de pérdida
-        for reactivo in receta.reactivos:
-            perdida = reactivo["cantidad"] * random.uniform(0.001, 0.225)  # Entre 0.1% y 22.5%
-            cantidad_final = reactivo["cantidad"] + perdida
-            self.gestion_reactivos.reducir_inventario(reactivo["nombre"], cantidad_final)
+        cambios_reactivos = []
+        consumo = {}
+        for reactivo_id, cantidad_base in receta.requerimientos:
+            reactivo_lab = self.gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
+            perdida = cantidad_base * random.uniform(0.001, 0.225)  # Entre 0.1% y 22.5%
+            cantidad_final = cantidad_base + perdida
+            reactivo_lab.inventario_base -= cantidad_final
+            self.gestion_reactivos.verificar_minimo(reactivo_lab)
+            cambios_reactivos.append(cambio_guardar(reactivo_lab.a_dict()))
+            consumo[reactivo_lab.id] = consumo.get(reactivo_lab.id, 0) + cantidad_final
 
             # actualiza el resultado del experimento (pendiente por el momento)
         experimento["resultado"] = "pendiente"
             
-        self.guardar_experimentos_json()
+        self.gestion_reactivos.guardar_reactivos_json(cambios_reactivos)
+        self.guardar_experimentos_json([cambio_guardar(experimento)])
+        self.notificar("realizado", experimento, consumo=consumo)
         print(f"experimento ID {experimento_id} realizado usando la fecha {experimento['fecha']}.")
 
+    @medido
+    def realizar_experimentos(self, experimento_ids, todo_o_nada=True, semilla=None):
+        """ejecuta varios experimentos de una vez: suma la demanda de reactivos de todas las recetas,
+        la valida contra el inventario en una sola pasada, reserva y descuenta (con la pérdida aleatoria
+        calculada en bloque) y guarda una única vez al final.
+        con todo_o_nada=False se aceptan, en orden, los experimentos que todavía alcanzan y se informa el resto.
+        faltantes y consumo se expresan en unidades base"""
+        por_id = {e["id"]: e for e in self.experimentos}
+        informe = {"realizados": [], "rechazados": {}, "faltantes": {}}
+
+        corridas = []
+        for experimento_id in experimento_ids:
+            experimento = por_id.get(experimento_id)
+            receta = self.almacen_recetas.obtener_por_id(experimento["receta_id"]) if experimento else None
+            if not experimento:
+                informe["rechazados"][experimento_id] = "experimento no encontrado"
+            elif not receta:
+                informe["rechazados"][experimento_id] = f"receta {experimento['receta_id']} no encontrada"
+            else:
+                corridas.append((experimento, receta))
+
+        """reserva: la demanda nominal de cada corrida se descuenta de lo que queda disponible"""
+        disponible = {}
+        aceptadas = []
+        caducados_por_fecha = {}
+        for experimento, receta in corridas:
+            if experimento["fecha"] not in caducados_por_fecha:
+                caducados_por_fecha[experimento["fecha"]] = self.gestion_reactivos.ids_caducados(experimento["fecha"])
+            requerimientos = self.almacen_recetas.requerimientos_base(receta["id"])
+            if any(reactivo_id in caducados_por_fecha[experimento["fecha"]] for reactivo_id, _ in requerimientos):
+                informe["rechazados"][experimento["id"]] = "reactivos caducados"
+                continue
+            demanda = {}
+            for reactivo_id, cantidad_base in requerimientos:
+                demanda[reactivo_id] = demanda.get(reactivo_id, 0) + cantidad_base
+            for reactivo_id in demanda:
+                if reactivo_id not in disponible:
+                    reactivo_lab = self.gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
+                    disponible[reactivo_id] = reactivo_lab.inventario_base if reactivo_lab else 0
+            if todo_o_nada or all(disponible[r] >= c for r, c in demanda.items()):
+                for reactivo_id, cantidad in demanda.items():
+                    disponible[reactivo_id] -= cantidad
+                aceptadas.append((experimento, receta))
+            else:
+                informe["rechazados"][experimento["id"]] = "reactivos insuficientes"
+
+        if todo_o_nada:
+            informe["faltantes"] = {r: -restante for r, restante in disponible.items() if restante < 0}
+            if informe["faltantes"] or informe["rechazados"]:
+                print("no se realizó ningún experimento del lote:")
+                for reactivo_id, cantidad in informe["faltantes"].items():
+                    reactivo_lab = self.gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
+                    if reactivo_lab:
+                        print(f"  - faltan {cantidad / reactivo_lab.factor:.2f} {reactivo_lab.unidad_medida} de {reactivo_lab.nombre}")
+                    else:
+                        print(f"  - faltan {cantidad:.2f} de reactivo {reactivo_id}")
+                for experimento_id, motivo in informe["rechazados"].items():
+                    print(f"  - experimento {experimento_id}: {motivo}")
+                return informe
+
+        if not aceptadas:
+            print("ningún experimento del lote se pudo realizar")
+            return informe
+
+        """pérdida aleatoria entre 0.1% y 22.5% para todas las cantidades a la vez (numpy se importa recién aquí)"""
+        import numpy as np
+        posicion = {}
+        indices, cantidades = [], []
+        for experimento, receta in aceptadas:
+            for reactivo_id, cantidad_base in self.almacen_recetas.requerimientos_base(receta["id"]):
+                indices.append(posicion.setdefault(reactivo_id, len(posicion)))
+                cantidades.append(cantidad_base)
+        cantidades = np.array(cantidades, dtype=np.float64)
+        perdidas = np.random.default_rng(semilla).uniform(0.001, 0.225, size=len(cantidades))
+        consumo_total = np.bincount(np.array(indices), weights=cantidades * (1 + perdidas), minlength=len(posicion))
+
+        cambios_reactivos = []
+        consumo = {}
+        for reactivo_id, i in posicion.items():
+            reactivo_lab = self.gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
+            reactivo_lab.inventario_base -= float(consumo_total[i])
+            self.gestion_reactivos.verificar_minimo(reactivo_lab)
+            cambios_reactivos.append(cambio_guardar(reactivo_lab.a_dict()))
+            consumo[reactivo_id] = float(consumo_total[i])
+
+        realizados = []
+        for experimento, _ in aceptadas:
+            experimento["resultado"] = "pendiente"
+            realizados.append(experimento)
+        informe["realizados"] = [e["id"] for e in realizados]
+
+        self.gestion_reactivos.guardar_reactivos_json(cambios_reactivos)
+        self.guardar_experimentos_json([cambio_guardar(e) for e in realizados])
+        self.notificar("realizados", realizados, consumo=consumo)
+        print(f"{len(realizados)} experimentos realizados, {len(informe['rechazados'])} rechazados.")
+        return informe
+
+    @medido
+    def simular_plan(self, plan, ensayos=10_000, semilla=None):
+        """estima con monte carlo el consumo de reactivos y el costo de un plan {receta_id: corridas}"""
+        from simulador import SimuladorExperimentos
+        simulador = SimuladorExperimentos(self.gestion_reactivos, self.almacen_recetas)
+        try:
+            informe = simulador.simular(plan, ensayos, semilla)
+        except ValueError as e:
+            print(e)
+            return None
+        simulador.mostrar_simulacion(informe)
+        return informe
+
+    def obtener_pronostico(self):
+        """crea el pronóstico de inventario la primera vez; después se mantiene con los eventos de experimentos"""
+        if self.pronostico is None:
+            from pronostico_inventario import PronosticoInventario
+            self.pronostico = PronosticoInventario(self.gestion_reactivos, self.almacen_recetas, lambda: self.experimentos)
+            self.suscribir(self.pronostico.al_cambiar_experimento)
+        return self.pronostico
+
+    def mostrar_pronostico(self, horizonte_dias=30):
+        """muestra cuándo llegará cada reactivo a su mínimo y la lista de compras para el horizonte indicado"""
+        pronostico = self.obtener_pronostico()
+        print("\nreactivos que llegarán primero a su mínimo sugerido:")
+        for p in pronostico.pronosticar(horizonte_dias)[:10]:
+            if p["fecha_minimo"] is None:
+                break
+            print(f"  - {p['nombre']}: {p['consumo_diario']:.2f} {p['unidad_medida']}/día, mínimo el {p['fecha_minimo']}, agotado el {p['fecha_agotado']}")
+        compras, total = pronostico.lista_de_compras(horizonte_dias)
+        print(f"lista de compras para {horizonte_dias} días:")
+        for p in compras:
+            print(f"  - {p['nombre']}: {p['comprar']:.2f} {p['unidad_medida']} (${p['costo_compra']:.2f})")
+        print(f"total: ${total:.2f}")
+
+    @medido
+    def recetas_no_realizables(self, fecha):
+        """recetas que no se podrán realizar en esa fecha porque alguno de sus reactivos ya habrá caducado"""
+        recetas = {}
+        for reactivo in self.gestion_reactivos.repositorio.caducan_antes(fecha):
+            for receta in self.almacen_recetas.recetas_con_reactivo(reactivo.id):
+                recetas.setdefault(receta["id"], receta)
+        return list(recetas.values())
+
+    @medido
     def obtener_receta_por_id(self, receta_id):
         """obtiene una receta a partir de su ID"""
         try:
-            with open(os.path.join("data", "recetas.json"), "r", encoding="utf-8") as f:
-                recetas = json.load(f)
-            for receta in recetas:
-                if receta["id"] == receta_id:
-                    return Receta(receta["id"], receta["nombre"], receta["objetivo"], receta["reactivos"], receta["procedimiento"])
+            return self.almacen_recetas.obtener_receta(receta_id)
         except FileNotFoundError:
             print("no se encontró el archivo de recetas")
         return None
\ No newline at end of file
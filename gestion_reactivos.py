@@ -1,11 +1,91 @@
-import json
+import datetime
 from reactivo import Reactivo
+from unidades import CONVERSIONES, convertir, familia, unidad_base
+from almacenamiento import cambio_guardar, cambio_eliminar
+from contexto_laboratorio import ContextoLaboratorio
+from busqueda import elegir
+from instrumentacion import medido
 
 """gestiona el inventario de reactivos, permitiendo agregar, modificar y eliminar reactivos"""
 class GestionReactivos:
-    def __init__(self):
-        self.reactivos = []
-        self.ultimo_id = 0
+    def __init__(self, contexto=None):
+        self.contexto = contexto if contexto is not None else ContextoLaboratorio()
+        self.almacenamiento = self.contexto.almacenamiento
+
+    @property
+    def repositorio(self):
+        """el repositorio compartido del contexto (se carga la primera vez que se usa)"""
+        return self.contexto.repositorio
+
+    @property
+    def reactivos(self):
+        """lista de los reactivos registrados (en el orden del repositorio)"""
+        return list(self.repositorio)
+
+    @reactivos.setter
+    def reactivos(self, reactivos):
+        self.repositorio.cargar(reactivos)
+
+    @medido
+    def buscar_reactivo(self, nombre):
+        """devuelve el reactivo con ese nombre o None"""
+        return self.repositorio.obtener_por_nombre(nombre)
+
+    @medido
+    def buscar_aproximado(self, texto, cantidad=10):
+        """[(reactivo, puntaje)] ordenados por parecido, sin importar tildes, mayúsculas ni errores de tipeo"""
+        return self.repositorio.buscar_aproximado(texto, cantidad)
+
+    @medido
+    def autocompletar(self, prefijo, cantidad=10):
+        """reactivos con palabras del nombre que empiezan por las palabras escritas"""
+        return self.repositorio.autocompletar(prefijo, cantidad)
+
+    def elegir_reactivo(self, texto):
+        """el reactivo con ese nombre exacto o, si no existe, uno de los más parecidos elegido en el menú"""
+        sugerir = lambda texto, cantidad: [(r, r.nombre) for r, _ in self.buscar_aproximado(texto, cantidad)]
+        return elegir(texto, self.buscar_reactivo(texto), sugerir)
+
+    @medido
+    def obtener_reactivo_por_id(self, reactivo_id):
+        """devuelve el reactivo con ese ID o None"""
+        return self.repositorio.obtener_por_id(reactivo_id)
+
+    @medido
+    def verificar_disponibilidad(self, nombre, cantidad, unidad=None):
+        """devuelve True si hay al menos la cantidad indicada del reactivo (en su unidad actual o en la indicada)"""
+        reactivo = self.buscar_reactivo(nombre)
+        if reactivo is None:
+            return False
+        return reactivo.inventario_base >= convertir(cantidad, unidad or reactivo.unidad_medida, unidad_base(reactivo.unidad_medida))
+
+    def ids_caducados(self, fecha):
+        """IDs de los reactivos que ya están caducados en esa fecha (YYYY-MM-DD)"""
+        return {r.id for r in self.repositorio.caducan_antes(fecha)}
+
+    def reporte_por_caducar(self, dias=30, desde=None):
+        """lista los reactivos caducados y los que caducan en los próximos días"""
+        desde = desde or datetime.date.today()
+        hoy = desde.isoformat()
+        hasta = (desde + datetime.timedelta(days=dias)).isoformat()
+        caducados = self.repositorio.caducan_antes(hoy)
+        por_caducar = self.repositorio.caducan_entre(hoy, hasta)
+        print(f"\nreactivos caducados: {len(caducados)}")
+        for reactivo in caducados:
+            print(f"  - {reactivo.nombre} (caducó el {reactivo.fecha_caducidad})")
+        print(f"reactivos que caducan en los próximos {dias} días: {len(por_caducar)}")
+        for reactivo in por_caducar:
+            print(f"  - {reactivo.nombre} (caduca el {reactivo.fecha_caducidad})")
+        return caducados, por_caducar
+
+    @medido
+    def reducir_inventario(self, nombre, cantidad, unidad=None):
+        """descuenta una cantidad (en la unidad actual del reactivo o en la indicada) de su inventario"""
+        reactivo = self.buscar_reactivo(nombre)
+        if reactivo:
+            reactivo.inventario_base -= convertir(cantidad, unidad or reactivo.unidad_medida, unidad_base(reactivo.unidad_medida))
+            self.verificar_minimo(reactivo)
+        return reactivo
     
     def menu(self):
         """muestra el menú de gestión de reactivos y ejecuta la opción seleccionada"""
@@ -16,32 +96,47 @@ class GestionReactivos:
             print("3. eliminar reactivo")
             print("4. listar reactivos")
             print("5. cambiar unidad de reactivo")
-            print("6. volver al menú principal")
+            print("6. reactivos por caducar")
+            print("7. impacto de un reactivo (recetas y experimentos que lo usan)")
+            print("8. buscar reactivos")
+            print("9. volver al menú principal")
             
             opcion = input("seleccione una opción: ")
             
             if opcion == "1":
                 self.solicitar_datos_reactivo()
             elif opcion == "2":
-                nombre = input("nombre del reactivo a modificar: ")
-                self.modificar_reactivo(nombre)
+                reactivo = self.elegir_reactivo(input("nombre del reactivo a modificar: "))
+                if reactivo:
+                    self.modificar_reactivo(reactivo.nombre)
             elif opcion == "3":
-                nombre = input("nombre del reactivo a eliminar: ")
-                self.eliminar_reactivo(nombre)
+                reactivo = self.elegir_reactivo(input("nombre del reactivo a eliminar: "))
+                if reactivo and not self.eliminar_reactivo(reactivo.nombre):
+                    if input("¿eliminarlo de todas formas? (s/n): ").strip().lower() == "s":
+                        self.eliminar_reactivo(reactivo.nombre, forzar=True)
             elif opcion == "4":
                 self.listar_reactivos()
             elif opcion == "5":
-                nombre = input("nombre del reactivo a cambiar unidad: ")
-                nueva_unidad = input("nueva unidad: ")
-                self.cambiar_unidad_reactivo(nombre, nueva_unidad)
+                reactivo = self.elegir_reactivo(input("nombre del reactivo a cambiar unidad: "))
+                if reactivo:
+                    nueva_unidad = input("nueva unidad: ")
+                    self.cambiar_unidad_reactivo(reactivo.nombre, nueva_unidad)
             elif opcion == "6":
+                dias = int(input("días hacia adelante (30): ") or 30)
+                self.reporte_por_caducar(dias)
+            elif opcion == "7":
+                reactivo = self.elegir_reactivo(input("nombre del reactivo: "))
+                if reactivo:
+                    self.mostrar_impacto(self.impacto_reactivo(reactivo.id))
+            elif opcion == "8":
+                self.mostrar_busqueda(input("buscar (nombre, descripción o categoría; termine en * para autocompletar): "))
+            elif opcion == "9":
                 break
             else:
                 print("opción no válida. Intente nuevamente.")
     
     def solicitar_datos_reactivo(self):
         """solicita y registra un nuevo reactivo en el inventario"""
-        self.ultimo_id += 1
         nombre = input("nombre: ")
         descripcion = input("descripción: ")
         costo = float(input("costo: "))
@@ -51,39 +146,41 @@ class GestionReactivos:
         fecha_caducidad = input("fecha de caducidad (YYYY-MM-DD): ")
         minimo_sugerido = float(input("mínimo sugerido: "))
         
-        conversiones_posibles = []
-        if unidad_medida in ["mL", "L", "uL"]:
-            conversiones_posibles = [
-                {"unidad": "L", "factor": 0.001},
-                {"unidad": "uL", "factor": 1000}
-            ]
-        elif unidad_medida in ["g", "kg", "mg"]:
-            conversiones_posibles = [
-                {"unidad": "kg", "factor": 0.001},
-                {"unidad": "mg", "factor": 1000}
-            ]
-        
-        reactivo = Reactivo(
-            self.ultimo_id, nombre, descripcion, costo, categoria,
-            inventario_disponible, unidad_medida, fecha_caducidad,
-            minimo_sugerido, conversiones_posibles
-        )
-        self.reactivos.append(reactivo)
-        self.verificar_minimo(reactivo)
-        self.guardar_reactivos_json()
+        self.agregar_reactivo({
+            "nombre": nombre, "descripcion": descripcion, "costo": costo, "categoria": categoria,
+            "inventario_disponible": inventario_disponible, "unidad_medida": unidad_medida,
+            "fecha_caducidad": fecha_caducidad, "minimo_sugerido": minimo_sugerido
+        })
         print("Reactivo agregado exitosamente.")
+
+    @medido
+    def agregar_reactivo(self, datos):
+        """registra un reactivo a partir de un diccionario con el formato de reactivos.json. sin ID (o con
+        ID nulo) se le asigna el siguiente; con un ID que ya existe reemplaza a ese reactivo"""
+        datos = dict(datos)
+        if datos.get("id") is None:
+            datos["id"] = self.repositorio.siguiente_id()
+        if "conversiones_posibles" not in datos and "unidad_medida" in datos:
+            datos["conversiones_posibles"] = CONVERSIONES.get(familia(datos["unidad_medida"]), [])
+        faltantes = [campo for campo in ContextoLaboratorio.CAMPOS_REACTIVO if campo not in datos]
+        if faltantes:
+            raise ValueError(f"faltan campos del reactivo: {', '.join(faltantes)}")
+        reactivo = Reactivo.desde_dict(datos)
+        self.repositorio.agregar(reactivo)
+        self.verificar_minimo(reactivo)
+        self.guardar_reactivos_json([cambio_guardar(reactivo.a_dict())])
+        return reactivo
     
     def obtener_minimo_sugerido(self, nombre):
-        with open("reactivos.json", "r", encoding="utf-8") as f:
-            datos = json.load(f)
-            for r in datos:
-                if r["nombre"] == nombre:
-                    return r["minimo_sugerido"]
+        reactivo = self.buscar_reactivo(nombre)
+        if reactivo:
+            return reactivo.minimo_sugerido
         return 0  # valor por defecto si no se encuentra
     
+    @medido
     def modificar_reactivo(self, nombre):
         """modifica los datos de un reactivo existente"""
-        reactivo = next((r for r in self.reactivos if r.nombre == nombre), None)
+        reactivo = self.buscar_reactivo(nombre)
         if reactivo:
             print("Ingrese los nuevos valores, o presione Enter para mantener los actuales:")
             
@@ -96,100 +193,113 @@ class GestionReactivos:
             nueva_fecha = input(f"Nueva fecha de caducidad ({reactivo.fecha_caducidad}): ") or reactivo.fecha_caducidad
             nuevo_minimo = float(input(f"Nuevo mínimo sugerido ({reactivo.minimo_sugerido}): ") or reactivo.minimo_sugerido)
             
-            reactivo.nombre = nuevo_nombre
-            reactivo.descripcion = nueva_descripcion
-            reactivo.costo = nuevo_costo
-            reactivo.categoria = nueva_categoria
-            reactivo.inventario_disponible = nuevo_inventario
-            reactivo.unidad_medida = nueva_unidad
-            reactivo.fecha_caducidad = nueva_fecha
-            reactivo.minimo_sugerido = nuevo_minimo
+            self.repositorio.actualizar(
+                reactivo,
+                nombre=nuevo_nombre,
+                descripcion=nueva_descripcion,
+                costo=nuevo_costo,
+                categoria=nueva_categoria,
+                unidad_medida=nueva_unidad,  # antes que las cantidades, que se leen en la unidad nueva
+                inventario_disponible=nuevo_inventario,
+                fecha_caducidad=nueva_fecha,
+                minimo_sugerido=nuevo_minimo
+            )
             
             self.verificar_minimo(reactivo)
-            self.guardar_reactivos_json()
+            self.guardar_reactivos_json([cambio_guardar(reactivo.a_dict())])
             print("Reactivo modificado exitosamente.")
         else:
             print("Error: Reactivo no encontrado.")
     
-    def eliminar_reactivo(self, nombre):
-        """elimina un reactivo del inventario"""
-        self.reactivos = [r for r in self.reactivos if r.nombre != nombre]
-        self.guardar_reactivos_json()
+    @medido
+    def eliminar_reactivo(self, nombre, forzar=False):
+        """elimina un reactivo del inventario. si alguna receta lo usa no se elimina (se muestra qué depende
+        de él), salvo con forzar=True; devuelve True si se eliminó"""
+        reactivo = self.buscar_reactivo(nombre)
+        if not reactivo:
+            print("reactivo no encontrado.")
+            return False
+        impacto = self.impacto_reactivo(reactivo.id)
+        if impacto["recetas"] and not forzar:
+            print(f"no se puede eliminar {nombre}: lo usan {len(impacto['recetas'])} recetas.")
+            self.mostrar_impacto(impacto)
+            return False
+        self.repositorio.eliminar(nombre)
+        self.guardar_reactivos_json([cambio_eliminar(reactivo.id)])
         print("reactivo eliminado exitosamente!")
+        return True
+
+    @medido
+    def impacto_reactivo(self, reactivo_id, desde=None):
+        """recetas y experimentos que dependen del reactivo (ver IndiceReactivos.impacto)"""
+        return self.contexto.indice_reactivos.impacto(reactivo_id, desde)
+
+    def mostrar_impacto(self, impacto, cantidad=10):
+        """muestra las recetas que usan el reactivo y los experimentos programados que quedarían bloqueados"""
+        if not impacto["recetas"]:
+            print("ninguna receta usa este reactivo.")
+            return
+        print(f"recetas que lo usan ({len(impacto['recetas'])}), con {impacto['experimentos']} experimentos en total:")
+        for receta in impacto["recetas"][:cantidad]:
+            print(f"  - {receta['nombre']} ({receta['experimentos']} experimentos)")
+        if len(impacto["recetas"]) > cantidad:
+            print(f"  ... y {len(impacto['recetas']) - cantidad} recetas más")
+        programados = impacto["programados"]
+        print(f"experimentos programados que quedarían bloqueados: {len(programados)}")
+        if programados:
+            print(f"  IDs: {', '.join(map(str, programados[:cantidad]))}{' ...' if len(programados) > cantidad else ''}")
     
+    def mostrar_busqueda(self, texto):
+        if texto.endswith("*"):
+            encontrados = [(r, None) for r in self.autocompletar(texto[:-1])]
+        else:
+            encontrados = self.buscar_aproximado(texto)
+        if not encontrados:
+            print("no se encontraron reactivos.")
+        for reactivo, puntaje in encontrados:
+            parecido = f" ({puntaje:.0%})" if puntaje is not None else ""
+            print(f"  - {reactivo.nombre} [{reactivo.categoria}]{parecido}")
+
     def listar_reactivos(self):
         """lista todos los reactivos registrados"""
-        if not self.reactivos:
+        repositorio = self.repositorio
+        if not len(repositorio):
             print("no hay reactivos registrados")
-        for reactivo in self.reactivos:
+            return
+        for reactivo in repositorio:
             print(reactivo.mostrar_reactivo())
+        print(f"valor total del inventario: ${self.repositorio.tabla().valor_inventario():.2f}")
     
     def cambiar_unidad_reactivo(self, nombre, nueva_unidad):
         """cambia la unidad de medida de un reactivo si es posible"""
-        reactivo = next((r for r in self.reactivos if r.nombre == nombre), None)
+        reactivo = self.buscar_reactivo(nombre)
         if reactivo:
-            reactivo.cambiar_unidad(nueva_unidad)
-            self.guardar_reactivos_json()
+            if not reactivo.cambiar_unidad(nueva_unidad):
+                print(f"no se puede convertir {nombre} de {reactivo.unidad_medida} a {nueva_unidad}.")
+                return
+            self.guardar_reactivos_json([cambio_guardar(reactivo.a_dict())])
             print(f"unidad de {nombre} cambiada a {nueva_unidad}.")
         else:
             print("reactivo no encontrado.")
     
     def verificar_minimo(self, reactivo):
-        if reactivo.inventario_disponible <= reactivo.minimo_sugerido:
+        if reactivo.inventario_base <= reactivo.minimo_base:
             print(f"¡OJO! el reactivo {reactivo.nombre} ha alcanzado su mínimo sugerido. Es necesario reponerlo")
     
-    def cargar_reactivos_json(self, file_path):
-        """carga reactivos desde un archivo json"""
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                datos = json.load(f)
-                # Validar que los datos contengan la estructura esperada
-                campos_requeridos = ["id", "nombre", "descripcion", "costo", "categoria", 
-                                   "inventario_disponible", "unidad_medida", "fecha_caducidad", 
-                                   "minimo_sugerido", "conversiones_posibles"]
-                
-                if not isinstance(datos, list) or not all(all(campo in r for campo in campos_requeridos) for r in datos):
-                    raise ValueError("El formato de los datos en reactivos.json es incorrecto.")
-                
-                self.reactivos = [
-                    Reactivo(
-                        r["id"], r["nombre"], r["descripcion"], r["costo"], 
-                        r["categoria"], r["inventario_disponible"], r["unidad_medida"], 
-                        r["fecha_caducidad"], r["minimo_sugerido"], r["conversiones_posibles"]
-                    ) for r in datos
-                ]
-                
-                # Actualizar el último ID usado
-                if self.reactivos:
-                    self.ultimo_id = max(r.id for r in self.reactivos)
-                
-                print("datos de reactivos cargados correctamente")
-        except FileNotFoundError:
-            print("archivo de reactivos no encontrado. Se creará uno nuevo al guardar")
+    @medido
+    def cargar_reactivos_json(self, file_path="reactivos.json"):
+        """vuelve a cargar los reactivos desde el archivo (normalmente se cargan solos la primera vez que se usan)"""
+        self.contexto.cargar_reactivos(file_path)
     
+    @medido
     def verificar_inventario_bajo(self):
         """lista reactivos con inventario por debajo del mínimo sugerido"""
         print("\nreactivos con inventario bajo:")
-        for reactivo in self.reactivos:
-            if reactivo.inventario_disponible <= reactivo.minimo_sugerido:
-                print(f"{reactivo.nombre} - {reactivo.inventario_disponible} {reactivo.unidad_medida} (mínimo sugerido: {reactivo.minimo_sugerido})")
-
-    def guardar_reactivos_json(self):
-        """guarda los reactivos en un archivo json"""
-        datos = [
-            {
-                "id": r.id,
-                "nombre": r.nombre,
-                "descripcion": r.descripcion,
-                "costo": r.costo,
-                "categoria": r.categoria,
-                "inventario_disponible": r.inventario_disponible,
-                "unidad_medida": r.unidad_medida,
-                "fecha_caducidad": r.fecha_caducidad,
-                "minimo_sugerido": r.minimo_sugerido,
-                "conversiones_posibles": r.conversiones_posibles
-            }
-            for r in self.reactivos
-        ]
-        with open("reactivos.json", "w", encoding="utf-8") as f:
-            json.dump(datos, f, indent=4)
\ No newline at end of file
+        for reactivo_id in self.repositorio.tabla().bajo_minimo():
+            reactivo = self.repositorio.obtener_por_id(reactivo_id)
+            print(f"{reactivo.nombre} - {reactivo.inventario_disponible} {reactivo.unidad_medida} (mínimo sugerido: {reactivo.minimo_sugerido})")
+
+    @medido
+    def guardar_reactivos_json(self, cambios=None):
+        """guarda los reactivos; si se indican los cambios solo se persisten esos (según el almacenamiento)"""
+        self.contexto.guardar_reactivos(cambios)
\ No newline at end of file
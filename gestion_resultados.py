@@ -1,119 +1,173 @@
-import json
-import os
-from gestion_reactivos import GestionReactivos
-from gestion_experimentos import GestionExperimentos
+from almacenamiento import cambio_agregar
+from analizador_resultados import AnalizadorResultados
+from evaluacion_resultados import evaluar, medir_experimentos
+from contexto_laboratorio import ContextoLaboratorio
+from instrumentacion import medido
+from busqueda import IndiceBusqueda
 
 class GestionResultados:
-    def __init__(self):
+    def __init__(self, contexto=None):
         """gestiona la evaluación y almacenamiento de resultados de experimentos"""
-        self.resultados = []
-        self.gestion_experimentos = None 
-        self.gestion_reactivos = None 
-        self.cargar_datos()
-        self.cargar_resultados_json()
-
-    def _try_load_json(self, file_path):
-        """intenta cargar un archivo JSON con diferentes codificaciones"""
-        encodings = ['utf-8', 'utf-16', 'latin-1']
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    return json.load(f)
-            except UnicodeDecodeError:
-                continue
-        """si todas las codificaciones fallan, intentar leer como binario"""
-        try:
-            with open(file_path, 'rb') as f:
-                return json.loads(f.read().decode('utf-8', errors='replace'))
-        except Exception as e:
-            print(f"error al leer el archivo {file_path}: {str(e)}")
-            return None
-
-    def cargar_datos(self):
-        """carga los datos de experimentos y reactivos desde archivos json"""
-        try:
-            datos_experimentos = self._try_load_json(os.path.join("data", "experimentos.json"))
-            datos_reactivos = self._try_load_json(os.path.join("data", "reactivos.json"))
-
-            if datos_experimentos is None or datos_reactivos is None:
-                raise FileNotFoundError("No se pudo leer uno o más archivos")
-
-            """crear instancias de las clases con los datos cargados"""
-            self.gestion_experimentos = GestionExperimentos()
-            self.gestion_experimentos.experimentos = datos_experimentos
-            self.gestion_reactivos = GestionReactivos()
-            self.gestion_reactivos.reactivos = [Reactivo(r["nombre"], r["cantidad"], r["unidad"], r["minimo_sugerido"]) for r in datos_reactivos]
-
-        except FileNotFoundError:
-            print("error al cargar los archivos de experimentos o reactivos. Se inicializarán como vacíos")
-            self.gestion_experimentos = GestionExperimentos()
-            self.gestion_reactivos = GestionReactivos()
-
-    def cargar_resultados_json(self):
-        """carga los resultados almacenados en el archivo json"""
-        try:
-            with open(os.path.join("data", "resultados.json"), "r", encoding="utf-8") as file:
-                self.resultados = json.load(file)
-        except FileNotFoundError:
-            print("archivo de resultados no encontrado. Se creará uno nuevo al guardar")
-            self.resultados = []
-
-    def guardar_resultados_json(self):
-        """guarda los resultados actuales en un archivo json"""
-        with open(os.path.join("data", "resultados.json"), "w", encoding="utf-8") as file:
-            json.dump(self.resultados, file, indent=4)
-
+        self.contexto = contexto if contexto is not None else ContextoLaboratorio()
+        self.almacenamiento = self.contexto.almacenamiento
+        self.almacen_recetas = self.contexto.almacen_recetas
+        self.analizador = AnalizadorResultados(self.almacen_recetas)
+        self._busqueda = (None, 0, None)  # (lista de experimentos, su largo, índice de sus nombres)
+        self._por_nombre = (None, {})  # (lista de experimentos, {nombre: posición en la lista})
+
+    @property
+    def resultados(self):
+        """los resultados del contexto compartido (se cargan la primera vez que se usan)"""
+        return self.contexto.resultados
+
+    @medido
+    def guardar_resultados_json(self, cambios=None):
+        """guarda los resultados; si se indican los cambios solo se persisten esos (según el almacenamiento)"""
+        self.contexto.guardar_resultados(cambios)
+
+    @medido
     def evaluar_experimento(self, nombre_experimento):
         """Evalúa un experimento comparando sus resultados con los valores esperados."""
-        if self.gestion_experimentos is None or self.gestion_experimentos.experimentos is None:
+        if not self.contexto.experimentos:
             print("no hay experimentos cargados")
             return
         
-        experimento = next((exp for exp in self.gestion_experimentos.experimentos if exp["nombre"] == nombre_experimento), None)
+        experimento = self.experimento_por_nombre(nombre_experimento)
         
         if not experimento:
             print(f"el experimento '{nombre_experimento}' no existe")
+            parecidos = self.sugerir_experimentos(nombre_experimento)
+            if parecidos:
+                print(f"¿quiso decir: {', '.join(parecidos)}?")
             return
 
-        receta_nombre = experimento.get("receta")
+        receta_id = experimento.get("receta_id")
         print(f"evaluando experimento: {nombre_experimento}")  # para debuggear
-        print(f"nombre de la receta: {receta_nombre}")
+        print(f"ID de la receta: {receta_id}")
 
-        """cargar recetas desde un archivo JSON"""
+        """obtener la receta del almacén compartido"""
         try:
-            with open(os.path.join("data", "recetas.json"), "r", encoding="utf-8") as f:
-                recetas_data = json.load(f)
+            receta_data = self.almacen_recetas.obtener_por_id(receta_id)
         except FileNotFoundError:
             print("archivo de recetas no encontrado")
             return
-
-        print("cargando recetas desde un json...")  # para debuggear
-
-        receta_data = next((r for r in recetas_data if r["nombre"] == receta_nombre), None)
         
         if receta_data is None:
-            print(f"no se encontró la receta '{receta_nombre}'.")
+            print(f"no se encontró la receta con ID {receta_id}.")
             return
 
         valores_obtenidos = experimento.get("resultado", {})  # para obtener los resultados obtenidos
         print(f"Valores obtenidos: {valores_obtenidos}")  # para debuggear
-        valores_esperados = receta_data.get("valores_esperados", {})  # obtiene los valores esperados de la receta
 
-        """comprobacionde cada parametro"""
-        evaluacion = {}
-        if isinstance(valores_obtenidos, str):
-            evaluacion["resultado"] = valores_obtenidos
-        else:
-            evaluacion = {
-                param: valores_obtenidos.get(param, "no registrado") in valores_esperados.get(param, [])
-                for param in valores_esperados
-            }
-
-        resultado = {
-            "experimento": nombre_experimento,
-            "evaluacion": evaluacion
-        }
+        """comprobacion de cada parametro contra el rango (minimo, maximo) de los valores a medir de la receta;
+        si el resultado es texto los valores se leen del texto"""
+        resultado = evaluar(experimento["id"], nombre_experimento, self.analizador.medir(experimento),
+                            self.analizador.extractores(receta_id))
         print(f"resultado de evalucion: {resultado}")
 
-        self.resultados.append(resultado)
-        self.guardar_resultados_json()
\ No newline at end of file
+        if self.reemplazar_resultados([resultado]):
+            self.guardar_resultados_json()
+        else:
+            self.guardar_resultados_json([cambio_agregar(resultado)])
+        return resultado
+
+    def experimento_por_nombre(self, nombre):
+        """busca el experimento con un índice nombre → posición. la posición se comprueba contra la lista, así
+        un alta, una baja o un cambio de nombre posterior no devuelven otro experimento: el índice se rehace"""
+        experimentos = self.contexto.experimentos
+        lista, posiciones = self._por_nombre
+        posicion = posiciones.get(nombre) if lista is experimentos else None
+        if posicion is not None and posicion < len(experimentos) and experimentos[posicion].get("nombre") == nombre:
+            return experimentos[posicion]
+        posiciones = {}
+        for i, e in enumerate(experimentos):
+            if e.get("nombre") is not None:
+                posiciones.setdefault(e["nombre"], i)
+        self._por_nombre = (experimentos, posiciones)
+        posicion = posiciones.get(nombre)
+        return experimentos[posicion] if posicion is not None else None
+
+    def reemplazar_resultados(self, nuevos):
+        """agrega los resultados nuevos y quita las evaluaciones anteriores de los mismos experimentos; devuelve
+        cuántas se quitaron. los resultados anteriores a experimento_id solo se identifican por "experimento"
+        (el nombre)"""
+        ids = {r["experimento_id"] for r in nuevos}
+        claves = {r["experimento"] for r in nuevos}
+        antes = len(self.resultados)
+        self.resultados[:] = [
+            r for r in self.resultados
+            if not (r["experimento_id"] in ids if "experimento_id" in r else r.get("experimento") in claves)
+        ] + nuevos
+        return antes + len(nuevos) - len(self.resultados)
+
+    @medido
+    def sugerir_experimentos(self, texto, cantidad=5):
+        """nombres de experimentos parecidos al texto. el índice se arma la primera vez que hace falta (solo
+        cuando un nombre no existe) y se rehace si los experimentos cambiaron"""
+        experimentos = self.contexto.experimentos
+        lista, largo, indice = self._busqueda
+        if lista is not experimentos or largo != len(experimentos):
+            indice = IndiceBusqueda()
+            indice.cargar((e["id"], e["nombre"], ()) for e in experimentos if e.get("nombre"))
+            self._busqueda = (experimentos, len(experimentos), indice)
+        return [indice.nombre(clave) for clave, _ in indice.buscar(texto, cantidad)]
+
+    @medido
+    def evaluar_experimentos(self, experimento_ids=None, receta_ids=None, procesos=None):
+        """evalúa de una vez todos los experimentos (o solo los de esos IDs o esas recetas) repartidos entre
+        varios procesos. la evaluación nueva de un experimento reemplaza a la anterior y los resultados se
+        guardan una sola vez al final; devuelve la lista de resultados nuevos"""
+        experimentos = self.filtrar_experimentos(experimento_ids, receta_ids)
+        if not experimentos:
+            print("no hay experimentos para evaluar")
+            return []
+
+        self.medir_experimentos(experimentos, procesos)
+        nuevos = [
+            evaluar(e["id"], e.get("nombre"), self.analizador.medir(e), self.analizador.extractores(e["receta_id"]))
+            for e in experimentos
+        ]
+        self.reemplazar_resultados(nuevos)
+        self.guardar_resultados_json()
+        print(f"{len(nuevos)} experimentos evaluados")
+        return nuevos
+
+    def filtrar_experimentos(self, experimento_ids=None, receta_ids=None):
+        experimentos = self.contexto.experimentos
+        if experimento_ids is not None:
+            experimento_ids = set(experimento_ids)
+            experimentos = [e for e in experimentos if e["id"] in experimento_ids]
+        if receta_ids is not None:
+            receta_ids = set(receta_ids)
+            experimentos = [e for e in experimentos if e["receta_id"] in receta_ids]
+        return experimentos
+
+    @medido
+    def medir_experimentos(self, experimentos, procesos=None):
+        """lee los valores de los experimentos que todavía no están en el caché del analizador, en paralelo"""
+        pendientes = [e for e in experimentos if not self.analizador.medido(e)]
+        if pendientes:
+            for experimento, valores in zip(pendientes, medir_experimentos(pendientes, self.almacen_recetas.recetas(), procesos)):
+                self.analizador.guardar_medicion(experimento, valores)
+
+    @medido
+    def estadisticas_mediciones(self, experimento_ids=None, receta_ids=None, procesos=None):
+        """{receta_id: {valor: {medidos, sin_medir, media, desviacion, fuera_de_rango}}} de los valores medidos"""
+        experimentos = self.filtrar_experimentos(experimento_ids, receta_ids)
+        self.medir_experimentos(experimentos, procesos)
+        return self.analizador.estadisticas(experimentos)
+
+    def mostrar_mediciones(self):
+        """muestra por receta la media, la desviación y la proporción fuera de rango de cada valor medido"""
+        estadisticas = self.estadisticas_mediciones()
+        if not estadisticas:
+            print("no hay mediciones registradas")
+        for receta_id, valores in estadisticas.items():
+            receta = self.almacen_recetas.obtener_por_id(receta_id)
+            print(f"\n{receta['nombre'] if receta else f'receta {receta_id}'}:")
+            for nombre, e in valores.items():
+                if not e["medidos"]:
+                    print(f"  - {nombre}: sin mediciones ({e['sin_medir']} experimentos)")
+                    continue
+                print(f"  - {nombre}: media {e['media']:.4g}, desviación {e['desviacion']:.4g}, "
+                      f"fuera de rango {e['fuera_de_rango']:.0%} ({e['medidos']} medidos, {e['sin_medir']} sin medir)")
\ No newline at end of file
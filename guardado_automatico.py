@@ -0,0 +1,74 @@
+import atexit
+import threading
+import time
+
+"""guardado en segundo plano: las colecciones modificadas se anotan y un hilo las escribe juntas como mucho
+una vez por intervalo, así una ráfaga de cambios termina en una sola escritura por colección y el menú no
+espera al disco. lo pendiente se escribe también al pedirlo (vaciar) y al cerrar el programa"""
+
+
+class GuardadoAutomatico:
+    def __init__(self, intervalo_ms=500):
+        self.intervalo = intervalo_ms / 1000
+        self.escrituras = 0
+        self._pendientes = {}  # colección: función que la escribe completa
+        self._desde = None  # cuándo se anotó el primer cambio sin guardar
+        self._condicion = threading.Condition()
+        self._escribiendo = threading.Lock()  # el hilo y vaciar() nunca escriben a la vez
+        self._cerrado = False
+        self._hilo = threading.Thread(target=self._ejecutar, name="guardado-automatico", daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
+
+    def marcar(self, coleccion, escribir):
+        """anota que la colección cambió; si ya estaba anotada solo se escribe una vez"""
+        with self._condicion:
+            if not self._pendientes:
+                self._desde = time.monotonic()
+            self._pendientes[coleccion] = escribir
+            self._condicion.notify()
+
+    def pendientes(self):
+        with self._condicion:
+            return list(self._pendientes)
+
+    def _ejecutar(self):
+        while True:
+            with self._condicion:
+                while not self._pendientes and not self._cerrado:
+                    self._condicion.wait()
+                if self._cerrado:
+                    return
+                espera = self._desde + self.intervalo - time.monotonic()
+                if espera > 0:
+                    self._condicion.wait(espera)
+                    continue
+            self.vaciar()
+
+    def vaciar(self):
+        """escribe ya todo lo pendiente. las funciones de escritura toman su propia copia de los datos; si una
+        colección cambia justo mientras se copia, falla el disco o falla cualquier otra cosa al escribirla (un
+        dato que no se puede pasar a json, por ejemplo), se avisa y queda anotada para el próximo intento: un
+        error no puede detener el hilo, porque después no se guardaría nada más"""
+        with self._escribiendo:
+            with self._condicion:
+                pendientes, self._pendientes = self._pendientes, {}
+            for coleccion, escribir in pendientes.items():
+                try:
+                    escribir()
+                    self.escrituras += 1
+                except Exception as e:
+                    print(f"no se pudo guardar {coleccion}, se reintentará: {type(e).__name__}: {e}")
+                    with self._condicion:
+                        if coleccion not in self._pendientes:
+                            self.marcar(coleccion, escribir)
+
+    def cerrar(self):
+        """detiene el hilo y escribe lo que quede; se puede llamar más de una vez"""
+        with self._condicion:
+            self._cerrado = True
+            self._condicion.notify()
+        if self._hilo.is_alive() and self._hilo is not threading.current_thread():
+            self._hilo.join()
+        self.vaciar()
+        atexit.unregister(self.cerrar)
@@ -0,0 +1,84 @@
+import datetime
+
+"""índices inversos reactivo → recetas → experimentos, para saber qué se bloquea si un reactivo se agota o se
+elimina. el de reactivo → recetas ya lo mantiene el almacén de recetas; aquí se agrega receta → experimentos
+({experimento_id: fecha}), que se arma una sola vez (directo de las columnas de la instantánea si está
+abierta, sin materializar los experimentos) y después se mantiene con los avisos de GestionExperimentos"""
+
+
+class IndiceReactivos:
+    def __init__(self, contexto):
+        self.contexto = contexto
+        self.almacen_recetas = contexto.almacen_recetas
+        self._por_receta = None  # receta_id: {experimento_id: fecha}
+        self._fuente = None  # lista de experimentos (o instantánea) con la que se armó el índice
+        self._largo = 0
+
+    def _experimentos(self):
+        instantanea = self.contexto.instantanea_vigente()
+        return instantanea if instantanea is not None else self.contexto.experimentos
+
+    def _indice(self):
+        """el índice al día; se rearma si los experimentos se recargaron o cambiaron sin aviso"""
+        fuente = self._experimentos()
+        if self._por_receta is None or fuente is not self._fuente or len(fuente) != self._largo:
+            self._armar(fuente)
+        return self._por_receta
+
+    def _armar(self, fuente):
+        por_receta = {}
+        if isinstance(fuente, list):
+            for experimento in fuente:
+                por_receta.setdefault(experimento["receta_id"], {})[experimento["id"]] = experimento["fecha"]
+        else:
+            for experimento_id, receta_id, fecha in zip(fuente.valores("id"), fuente.valores("receta_id"), fuente.fechas()):
+                por_receta.setdefault(receta_id, {})[experimento_id] = fecha
+        self._por_receta = por_receta
+        self._fuente = fuente
+        self._largo = len(fuente)
+
+    def al_cambiar_experimento(self, evento, experimento, **datos):
+        """observador de GestionExperimentos: solo importan las altas y las bajas"""
+        if self._por_receta is None or evento not in ("creado", "eliminado"):
+            return
+        if evento == "creado":
+            self._por_receta.setdefault(experimento["receta_id"], {})[experimento["id"]] = experimento["fecha"]
+        else:
+            experimentos = self._por_receta.get(experimento["receta_id"], {})
+            experimentos.pop(experimento["id"], None)
+            if not experimentos:
+                self._por_receta.pop(experimento["receta_id"], None)
+        """el aviso llega con la lista ya actualizada: el índice corresponde a ella"""
+        self._fuente = self._experimentos()
+        self._largo = len(self._fuente)
+
+    def recetas_con_reactivo(self, reactivo_id):
+        return self.almacen_recetas.recetas_con_reactivo(reactivo_id)
+
+    def experimentos_de_receta(self, receta_id):
+        """{experimento_id: fecha} de los experimentos de esa receta"""
+        return self._indice().get(receta_id, {})
+
+    def experimentos_con_reactivo(self, reactivo_id, desde=None):
+        """IDs de los experimentos cuya receta usa el reactivo (solo los de fecha >= desde, si se indica)"""
+        indice = self._indice()
+        ids = []
+        for receta in self.recetas_con_reactivo(reactivo_id):
+            experimentos = indice.get(receta["id"], {})
+            ids.extend(experimentos if desde is None else (i for i, fecha in experimentos.items() if fecha >= desde))
+        return sorted(ids)
+
+    def impacto(self, reactivo_id, desde=None):
+        """qué depende del reactivo: las recetas que lo usan, cuántos experimentos tienen en total y cuáles
+        están programados (fecha desde hoy, o desde la fecha indicada)"""
+        desde = desde or datetime.date.today().isoformat()
+        indice = self._indice()
+        recetas = []
+        total = 0
+        programados = []
+        for receta in self.recetas_con_reactivo(reactivo_id):
+            experimentos = indice.get(receta["id"], {})
+            total += len(experimentos)
+            programados.extend(i for i, fecha in experimentos.items() if fecha >= desde)
+            recetas.append({"id": receta["id"], "nombre": receta["nombre"], "experimentos": len(experimentos)})
+        return {"reactivo_id": reactivo_id, "recetas": recetas, "experimentos": total, "programados": sorted(programados)}
@@ -0,0 +1,289 @@
+import datetime
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from instrumentacion import contar_bytes
+from contadores_estadisticas import huella_persona
+
+"""instantánea binaria de los experimentos: columnas numéricas de ancho fijo más dos tablas de cadenas
+(personas y textos). se abre con mmap sin parsear nada: los registros se arman copiando cada columna de una
+vez, y las estadísticas usan vistas numpy sobre el archivo, sin copiar.
+
+formato (todo little-endian, cada sección alineada a 8 bytes):
+    cabecera: MAGIA, n experimentos, m responsables, p personas, bytes de personas, t textos, bytes de textos
+    id, receta_id, fecha (días desde 1970), costo, nombre, resultado: n valores de 8 bytes cada una
+    responsables: indptr (n + 1) y códigos de persona (m), en formato CSR
+    personas: desplazamientos (p + 1) y bytes utf-8; textos: desplazamientos (t + 1) y bytes utf-8
+nombre y resultado guardan el código del texto; -1 si el campo no existe y -(código + 2) si el valor
+no es una cadena y se guardó como json"""
+
+MAGIA = b"LABSNAP1"
+CAMPOS = ("id", "nombre", "receta_id", "personas_responsables", "fecha", "costo_asociado", "resultado")
+COLUMNAS = (("id", "<i8"), ("receta_id", "<i8"), ("fecha", "<i8"), ("costo", "<f8"), ("nombre", "<i8"), ("resultado", "<i8"))
+_CABECERA = struct.Struct("<8s6Q")  # magia, n, m, p, bytes de personas, t, bytes de textos
+_TIPOS = {"<i8": "q", "<f8": "d"}  # tipo de cada columna en el módulo array
+_EPOCA = datetime.date(1970, 1, 1)
+
+
+def ruta_instantanea(ruta_json):
+    return os.path.splitext(ruta_json)[0] + ".snap"
+
+
+def _mezclar(x):
+    """contadores_estadisticas.mezclar sobre un arreglo uint64 (las operaciones dan la vuelta módulo 2^64)"""
+    import numpy as np
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _alinear(tamano):
+    return (tamano + 7) // 8 * 8
+
+
+def _a_bytes(valores):
+    """bytes little-endian de un array, sin importar el orden de la máquina"""
+    if sys.byteorder == "big":
+        valores = array(valores.typecode, valores)
+        valores.byteswap()
+    return valores.tobytes()
+
+
+def _tabla_cadenas(cadenas):
+    datos = [c.encode("utf-8") for c in cadenas]
+    desplazamientos = array("q", [0])
+    desplazamientos.extend(itertools.accumulate(len(d) for d in datos))
+    return desplazamientos, b"".join(datos)
+
+
+def escribir_instantanea(ruta, experimentos):
+    """escribe la instantánea de forma atómica; devuelve False (y no escribe nada) si algún experimento
+    tiene campos, valores o fechas que el formato no guarda, para no perder datos al reabrirla"""
+    codigos_persona, codigos_texto, codigos_fecha = {}, {}, {}
+
+    def codigo_texto(registro, campo):
+        if campo not in registro:
+            return -1
+        valor = registro[campo]
+        if isinstance(valor, str):
+            return codigos_texto.setdefault(valor, len(codigos_texto))
+        return -(codigos_texto.setdefault(json.dumps(valor, ensure_ascii=False), len(codigos_texto)) + 2)
+
+    columnas = {nombre: array(_TIPOS[tipo]) for nombre, tipo in COLUMNAS}
+    fechas = []
+    indptr = array("q", [0])
+    codigos = array("q")
+    try:
+        for e in experimentos:
+            if not set(e) <= set(CAMPOS):
+                return False
+            columnas["id"].append(e["id"])
+            columnas["receta_id"].append(e["receta_id"])
+            columnas["costo"].append(e["costo_asociado"])
+            columnas["nombre"].append(codigo_texto(e, "nombre"))
+            columnas["resultado"].append(codigo_texto(e, "resultado"))
+            fechas.append(codigos_fecha.setdefault(e["fecha"], len(codigos_fecha)))
+            for persona in e["personas_responsables"]:
+                codigos.append(codigos_persona.setdefault(persona, len(codigos_persona)))
+            indptr.append(len(codigos))
+        """cada fecha distinta se convierte una sola vez; una fecha que no es YYYY-MM-DD no se puede guardar como
+        día sin cambiar su texto, así que esos experimentos se quedan solo en el json"""
+        dias = []
+        for texto in codigos_fecha:
+            dia = datetime.date.fromisoformat(texto)
+            if dia.isoformat() != texto:
+                return False
+            dias.append((dia - _EPOCA).days)
+    except (TypeError, ValueError, OverflowError):
+        return False
+    columnas["fecha"].extend(dias[c] for c in fechas)
+    personas = _tabla_cadenas(codigos_persona)
+    textos = _tabla_cadenas(codigos_texto)
+
+    cabecera = _CABECERA.pack(MAGIA, len(fechas), len(codigos), len(codigos_persona), len(personas[1]),
+                              len(codigos_texto), len(textos[1]))
+    secciones = [cabecera] + [_a_bytes(columnas[nombre]) for nombre, _ in COLUMNAS]
+    secciones += [_a_bytes(indptr), _a_bytes(codigos)]
+    secciones += [_a_bytes(personas[0]), personas[1], _a_bytes(textos[0]), textos[1]]
+
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as f:
+        for seccion in secciones:
+            f.write(seccion)
+            f.write(b"\0" * (_alinear(len(seccion)) - len(seccion)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+    contar_bytes("escritos", ruta)
+    return True
+
+
+class Instantanea:
+    """vista de solo lectura sobre un archivo de instantánea. abrirla y pasar a registros no usa numpy;
+    las vistas numpy de las columnas (firma y motor de estadísticas) se crean la primera vez que se piden"""
+
+    def __init__(self, ruta):
+        with open(ruta, "rb") as f:
+            self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        contar_bytes("leidos", ruta, len(self._mapa))
+        if len(self._mapa) < _CABECERA.size:
+            raise ValueError(f"{ruta} no es una instantánea de experimentos")
+        magia, n, m, p, bytes_p, t, bytes_t = _CABECERA.unpack_from(self._mapa)
+        if magia != MAGIA:
+            raise ValueError(f"{ruta} no es una instantánea de experimentos")
+        self._n = n
+        self._posicion = _alinear(_CABECERA.size)
+        self._secciones = {}  # nombre: (tipo, inicio, cantidad)
+        for nombre, tipo in COLUMNAS:
+            self._seccion(nombre, tipo, n)
+        self._seccion("indptr", "<i8", n + 1)
+        self._seccion("codigos", "<i8", m)
+        self._bytes_personas = (self._seccion("personas", "<i8", p + 1), self._bytes(bytes_p))
+        self._bytes_textos = (self._seccion("textos", "<i8", t + 1), self._bytes(bytes_t))
+        if self._posicion > len(self._mapa):
+            raise ValueError(f"la instantánea {ruta} está incompleta")
+        self._columnas = None
+        self._desplazamientos = {}
+
+    def _seccion(self, nombre, tipo, cantidad):
+        self._secciones[nombre] = (tipo, self._posicion, cantidad)
+        self._posicion += _alinear(8 * cantidad)
+        return nombre
+
+    def _bytes(self, tamano):
+        inicio = self._posicion
+        self._posicion += _alinear(tamano)
+        return inicio
+
+    def valores(self, nombre):
+        """una sección ("id", "receta_id", "fecha", "costo", "nombre", "resultado", "indptr" o "codigos")
+        como lista de python, copiada del archivo de una vez"""
+        tipo, inicio, cantidad = self._secciones[nombre]
+        valores = array(_TIPOS[tipo])
+        valores.frombytes(self._mapa[inicio:inicio + 8 * cantidad])
+        if sys.byteorder == "big":
+            valores.byteswap()
+        return valores.tolist()
+
+    def _vista(self, nombre):
+        import numpy as np
+        tipo, inicio, cantidad = self._secciones[nombre]
+        return np.frombuffer(self._mapa, dtype=tipo, count=cantidad, offset=inicio)
+
+    @property
+    def columnas(self):
+        """vistas numpy (sin copia) de las columnas numéricas; la fecha como datetime64[D]"""
+        if self._columnas is None:
+            columnas = {nombre: self._vista(nombre) for nombre, _ in COLUMNAS}
+            columnas["fecha"] = columnas["fecha"].view("datetime64[D]")
+            self._columnas = columnas
+        return self._columnas
+
+    @property
+    def responsables_indptr(self):
+        return self._vista("indptr")
+
+    @property
+    def responsables_codigos(self):
+        return self._vista("codigos")
+
+    def _cadena(self, tabla, codigo):
+        nombre, inicio = tabla
+        if nombre not in self._desplazamientos:
+            self._desplazamientos[nombre] = self.valores(nombre)
+        desplazamientos = self._desplazamientos[nombre]
+        return self._mapa[inicio + desplazamientos[codigo]:inicio + desplazamientos[codigo + 1]].decode("utf-8")
+
+    def __len__(self):
+        return self._n
+
+    def personas(self):
+        return [self._cadena(self._bytes_personas, i) for i in range(self._secciones["personas"][2] - 1)]
+
+    def fechas(self):
+        """la fecha de cada experimento como texto YYYY-MM-DD; cada fecha distinta se convierte una sola vez
+        y los experimentos comparten la cadena"""
+        dias = self.valores("fecha")
+        textos = {dia: (_EPOCA + datetime.timedelta(days=dia)).isoformat() for dia in set(dias)}
+        return [textos[dia] for dia in dias]
+
+    def firma(self):
+        """la misma firma que contadores_estadisticas.firma_experimentos, calculada sobre las columnas"""
+        import numpy as np
+        indptr = self.responsables_indptr
+        personas = np.array([huella_persona(p) for p in self.personas()], dtype=np.uint64)
+        inicios = np.repeat(indptr[:-1], np.diff(indptr))
+        posiciones = (np.arange(len(self.responsables_codigos)) - inicios).astype(np.uint64)
+        """suma de las huellas de los responsables de cada experimento: diferencia de la suma acumulada"""
+        acumulado = np.zeros(len(posiciones) + 1, dtype=np.uint64)
+        np.cumsum(_mezclar(personas[self.responsables_codigos] ^ posiciones), out=acumulado[1:])
+        suma_personas = acumulado[indptr[1:]] - acumulado[indptr[:-1]]
+        huella = _mezclar(self.columnas["id"].view(np.uint64))
+        huella = _mezclar(huella ^ self.columnas["receta_id"].view(np.uint64))
+        huella = _mezclar(huella ^ self.columnas["costo"].view(np.uint64))
+        huella = _mezclar(huella ^ suma_personas)
+        return len(self), int(huella.sum(dtype=np.uint64))
+
+    def motor(self):
+        """motor de estadísticas directamente sobre las columnas del archivo"""
+        from motor_estadisticas import MotorEstadisticas
+        return MotorEstadisticas(
+            self.columnas["receta_id"], self.columnas["fecha"], self.columnas["costo"],
+            self.responsables_indptr, self.responsables_codigos, self.personas()
+        )
+
+    def registros(self):
+        """los experimentos como diccionarios con el formato del json"""
+        personas = self.personas()
+        textos = {}
+
+        def texto(codigo):
+            if codigo == -1:
+                return None
+            if codigo not in textos:
+                textos[codigo] = self._cadena(self._bytes_textos, codigo) if codigo >= 0 else json.loads(self._cadena(self._bytes_textos, -codigo - 2))
+            return textos[codigo]
+
+        columnas = {nombre: self.valores(nombre) for nombre, _ in COLUMNAS if nombre != "fecha"}
+        fechas = self.fechas()
+        indptr = self.valores("indptr")
+        codigos = self.valores("codigos")
+        registros = []
+        for i in range(len(self)):
+            registro = {"id": columnas["id"][i]}
+            if columnas["nombre"][i] != -1:
+                registro["nombre"] = texto(columnas["nombre"][i])
+            registro["receta_id"] = columnas["receta_id"][i]
+            registro["personas_responsables"] = [personas[c] for c in codigos[indptr[i]:indptr[i + 1]]]
+            registro["fecha"] = fechas[i]
+            registro["costo_asociado"] = columnas["costo"][i]
+            if columnas["resultado"][i] != -1:
+                registro["resultado"] = texto(columnas["resultado"][i])
+            registros.append(registro)
+        return registros
+
+
+def abrir_instantanea(ruta_json):
+    """abre la instantánea de esa colección solo si es más nueva que el json (y que su diario, si lo hay);
+    devuelve None si no existe, está desactualizada o no se puede leer"""
+    ruta = ruta_instantanea(ruta_json)
+    try:
+        modificada = os.stat(ruta).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    for fuente in (ruta_json, ruta_json + ".log"):
+        try:
+            estado = os.stat(fuente)
+        except FileNotFoundError:
+            continue
+        if estado.st_size and estado.st_mtime_ns > modificada:
+            return None
+    try:
+        return Instantanea(ruta)
+    except (ValueError, OSError):
+        return None
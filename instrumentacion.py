@@ -0,0 +1,168 @@
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+"""métricas de rendimiento del laboratorio: cuántas veces se llama cada carga, guardado, búsqueda, corrida
+de experimentos y estadística, cuánto tarda (histograma de latencias) y cuántos bytes se leen y escriben por
+archivo. se activa con la variable de entorno LAB_PERFIL=1; apagada, @medido devuelve la misma función sin
+envolver y contar_bytes no hace nada, así no cuesta nada. con LAB_PERFIL_ARCHIVO las métricas se vuelcan a
+ese archivo al terminar (json, o texto de Prometheus si termina en .prom o .txt)"""
+
+ACTIVA = os.environ.get("LAB_PERFIL", "") not in ("", "0")
+LIMITES = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)  # segundos, como los "le" de Prometheus
+
+
+class Metricas:
+    def __init__(self):
+        self._bloqueo = threading.Lock()  # el guardado automático registra desde su propio hilo
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._bloqueo:
+            self.operaciones = {}  # nombre: [llamadas, errores, segundos, conteo por intervalo del histograma]
+            self.bytes = {"leidos": {}, "escritos": {}}  # archivo: bytes
+
+    def registrar(self, nombre, segundos, error=False):
+        with self._bloqueo:
+            operacion = self.operaciones.get(nombre)
+            if operacion is None:
+                operacion = self.operaciones[nombre] = [0, 0, 0.0, [0] * (len(LIMITES) + 1)]
+            operacion[0] += 1
+            operacion[1] += error
+            operacion[2] += segundos
+            operacion[3][bisect.bisect_left(LIMITES, segundos)] += 1
+
+    def contar_bytes(self, sentido, ruta, cantidad):
+        archivo = os.path.basename(ruta)
+        with self._bloqueo:
+            self.bytes[sentido][archivo] = self.bytes[sentido].get(archivo, 0) + cantidad
+
+    def a_dict(self):
+        with self._bloqueo:
+            return {
+                "operaciones": {
+                    nombre: {
+                        "llamadas": llamadas, "errores": errores, "segundos": segundos,
+                        "promedio": segundos / llamadas,
+                        "histograma": dict(zip([str(l) for l in LIMITES] + ["+Inf"], conteos))
+                    }
+                    for nombre, (llamadas, errores, segundos, conteos) in sorted(self.operaciones.items())
+                },
+                "bytes": {sentido: dict(sorted(archivos.items())) for sentido, archivos in self.bytes.items()}
+            }
+
+    def a_prometheus(self):
+        """formato de texto de Prometheus; los histogramas son acumulados, como lo espera"""
+        datos = self.a_dict()
+        lineas = ["# TYPE lab_llamadas_total counter"]
+        lineas += [f'lab_llamadas_total{{operacion="{n}"}} {o["llamadas"]}' for n, o in datos["operaciones"].items()]
+        lineas.append("# TYPE lab_errores_total counter")
+        lineas += [f'lab_errores_total{{operacion="{n}"}} {o["errores"]}' for n, o in datos["operaciones"].items()]
+        lineas.append("# TYPE lab_duracion_segundos histogram")
+        for nombre, operacion in datos["operaciones"].items():
+            acumulado = 0
+            for limite, conteo in operacion["histograma"].items():
+                acumulado += conteo
+                lineas.append(f'lab_duracion_segundos_bucket{{operacion="{nombre}",le="{limite}"}} {acumulado}')
+            lineas.append(f'lab_duracion_segundos_sum{{operacion="{nombre}"}} {operacion["segundos"]}')
+            lineas.append(f'lab_duracion_segundos_count{{operacion="{nombre}"}} {operacion["llamadas"]}')
+        for sentido, archivos in datos["bytes"].items():
+            lineas.append(f"# TYPE lab_bytes_{sentido}_total counter")
+            lineas += [f'lab_bytes_{sentido}_total{{archivo="{a}"}} {b}' for a, b in archivos.items()]
+        return "\n".join(lineas) + "\n"
+
+    def volcar(self, ruta):
+        """escribe las métricas en json, o en texto de Prometheus si la ruta termina en .prom o .txt"""
+        with open(ruta, "w", encoding="utf-8") as f:
+            if ruta.endswith((".prom", ".txt")):
+                f.write(self.a_prometheus())
+            else:
+                json.dump(self.a_dict(), f, indent=4)
+
+    def mostrar(self, cantidad=25):
+        """las operaciones que más tiempo acumulan y los bytes por archivo"""
+        datos = self.a_dict()
+        if not datos["operaciones"]:
+            print("todavía no hay métricas registradas")
+            return
+        print(f"\n{'operación':<50}{'llamadas':>10}{'total (s)':>12}{'promedio (ms)':>15}")
+        ordenadas = sorted(datos["operaciones"].items(), key=lambda x: x[1]["segundos"], reverse=True)
+        for nombre, operacion in ordenadas[:cantidad]:
+            print(f"{nombre:<50}{operacion['llamadas']:>10}{operacion['segundos']:>12.4f}"
+                  f"{operacion['promedio'] * 1000:>15.3f}")
+        for sentido, archivos in datos["bytes"].items():
+            for archivo, cantidad_bytes in archivos.items():
+                print(f"bytes {sentido} de {archivo}: {cantidad_bytes}")
+
+
+metricas = Metricas()
+
+
+def medido(funcion):
+    """decorador para los métodos que se miden; el nombre de la operación es Clase.método"""
+    if not ACTIVA:
+        return funcion
+    nombre = funcion.__qualname__
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        inicio = time.perf_counter()
+        error = True
+        try:
+            resultado = funcion(*args, **kwargs)
+            error = False
+            return resultado
+        finally:
+            metricas.registrar(nombre, time.perf_counter() - inicio, error)
+    return envoltura
+
+
+def contar_bytes(sentido, ruta, cantidad=None):
+    """anota bytes "leidos" o "escritos" de un archivo (si no se indica la cantidad, el tamaño del archivo)"""
+    if ACTIVA:
+        metricas.contar_bytes(sentido, ruta, os.path.getsize(ruta) if cantidad is None else cantidad)
+
+
+def capturar(funcion, modo="cprofile", ruta=None, cantidad=20):
+    """ejecuta una acción bajo cProfile ("cprofile") o tracemalloc ("memoria") y muestra lo más costoso;
+    con cProfile también se puede guardar el perfil completo en ruta (para pstats o snakeviz).
+    no necesita LAB_PERFIL"""
+    if modo == "cprofile":
+        import cProfile
+        import pstats
+        perfil = cProfile.Profile()
+        try:
+            perfil.runcall(funcion)
+        finally:
+            estadisticas = pstats.Stats(perfil)
+            estadisticas.sort_stats("cumulative").print_stats(cantidad)
+            if ruta:
+                estadisticas.dump_stats(ruta)
+                print(f"perfil guardado en {ruta}")
+    elif modo == "memoria":
+        import tracemalloc
+        ya_activo = tracemalloc.is_tracing()
+        if not ya_activo:
+            tracemalloc.start()
+        try:
+            antes = tracemalloc.take_snapshot()
+            funcion()
+        finally:
+            despues = tracemalloc.take_snapshot()
+            actual, pico = tracemalloc.get_traced_memory()
+            if not ya_activo:
+                tracemalloc.stop()
+            print(f"\nmemoria en uso: {actual / 2**20:.1f} MB, pico: {pico / 2**20:.1f} MB")
+            print("líneas que más memoria asignaron durante la acción:")
+            for diferencia in despues.compare_to(antes, "lineno")[:cantidad]:
+                print(f"  {diferencia}")
+    else:
+        raise ValueError(f"modo de captura desconocido: {modo}")
+
+
+if ACTIVA and os.environ.get("LAB_PERFIL_ARCHIVO"):
+    atexit.register(metricas.volcar, os.environ["LAB_PERFIL_ARCHIVO"])
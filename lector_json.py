@@ -0,0 +1,106 @@
+import codecs
+import json
+import re
+from instrumentacion import contar_bytes
+
+"""lectura por partes de colecciones grandes: un arreglo json o json lines, registro por registro y con memoria acotada"""
+
+TAMANO_BLOQUE = 1 << 16  # caracteres que se leen por vez
+TAMANO_MUESTRA = 1 << 20  # bytes que se miran para adivinar la codificación
+TAMANO_MAXIMO_REGISTRO = 1 << 26  # caracteres que puede ocupar un elemento del arreglo antes de darlo por dañado
+MARGEN_CORTE = 16  # un error a menos de esto del final del texto leído puede ser solo un elemento cortado (tr|ue, \u00|e9)
+
+_SEPARADORES = re.compile(r"[ \t\r\n,]*")
+
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"), (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def detectar_codificacion(ruta):
+    """mira solo el principio del archivo: primero la marca BOM, luego los bytes nulos típicos de utf-16
+    sin BOM (un json empieza con un carácter ascii) y por último si el comienzo es utf-8 válido o latin-1"""
+    with open(ruta, "rb") as f:
+        inicio = f.read(TAMANO_MUESTRA)
+    for bom, codificacion in _BOMS:
+        if inicio.startswith(bom):
+            return codificacion
+    if len(inicio) >= 2 and inicio[0] == 0 and inicio[1] != 0:
+        return "utf-16-be"
+    if len(inicio) >= 2 and inicio[0] != 0 and inicio[1] == 0:
+        return "utf-16-le"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(inicio, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def validar_registros(registros, campos_requeridos=(), ruta=""):
+    """recorre los registros comprobando que cada uno sea un diccionario con los campos requeridos"""
+    for i, registro in enumerate(registros):
+        if not isinstance(registro, dict) or not all(campo in registro for campo in campos_requeridos):
+            raise ValueError(f"el formato de los datos en {ruta} es incorrecto (registro {i})")
+        yield registro
+
+
+def iterar_registros(ruta, campos_requeridos=()):
+    """devuelve un generador con los registros del archivo, validados a medida que se leen.
+    el archivo se abre en el momento, así un FileNotFoundError se lanza aquí y no al recorrerlo"""
+    f = open(ruta, "r", encoding=detectar_codificacion(ruta), newline="")
+    contar_bytes("leidos", ruta)
+    return validar_registros(_leer(f), campos_requeridos, ruta)
+
+
+def _leer(f):
+    with f:
+        texto = f.read(TAMANO_BLOQUE)
+        inicio = len(texto) - len(texto.lstrip())
+        if texto[inicio:inicio + 1] == "[":
+            yield from _leer_arreglo(f, texto, inicio + 1)
+        else:
+            yield from _leer_lineas(f, texto)
+
+
+def _leer_arreglo(f, texto, posicion):
+    """decodifica los elementos del arreglo uno por uno; el texto ya procesado se descarta"""
+    decodificador = json.JSONDecoder()
+    fin_archivo = False
+    while True:
+        """saltar espacios y la coma entre elementos"""
+        while True:
+            posicion = _SEPARADORES.match(texto, posicion).end()
+            if posicion < len(texto) or fin_archivo:
+                break
+            texto, posicion = f.read(TAMANO_BLOQUE), 0
+            fin_archivo = not texto
+        if posicion >= len(texto):
+            raise ValueError("el arreglo json termina sin ']'")
+        if texto[posicion] == "]":
+            return
+        try:
+            registro, posicion = decodificador.raw_decode(texto, posicion)
+        except json.JSONDecodeError as e:
+            """si el error está lejos del final, el elemento está mal escrito (una cadena sin cerrar sí se informa
+            donde empieza). si no, quedó cortado al final del bloque: leer más y reintentar, cada vez tanto como
+            lo que ya hay para no volver a decodificar el mismo texto muchas veces"""
+            cortado = e.msg.startswith("Unterminated string") or e.pos >= len(texto) - MARGEN_CORTE
+            if fin_archivo or not cortado or len(texto) - posicion > TAMANO_MAXIMO_REGISTRO:
+                raise
+            bloque = f.read(max(TAMANO_BLOQUE, len(texto) - posicion))
+            fin_archivo = not bloque
+            texto, posicion = texto[posicion:] + bloque, 0
+            continue
+        yield registro
+
+
+def _leer_lineas(f, texto):
+    """json lines: un registro por línea, las líneas vacías se ignoran. se separa solo en "\n" (splitlines
+    también corta en U+2028, U+0085 o \x0c, que pueden estar sin escapar dentro de una cadena json)"""
+    lineas = (texto + f.readline()).split("\n")
+    yield from (json.loads(linea) for linea in lineas if linea.strip())
+    for linea in f:
+        if linea.strip():
+            yield json.loads(linea)
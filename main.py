@@ -1,31 +1,123 @@
-import json
-from gestion_reactivos import GestionReactivos
-from gestion_experimentos import GestionExperimentos
-from gestion_resultados import GestionResultados
-from gestion_estadisticas import GestionEstadisticas
+import sys
+import instrumentacion
+
+"""arranque rápido: main no importa ninguna gestión. el contexto y cada gestión se crean la primera vez que se
+elige su opción, y cada archivo se lee la primera vez que algo lo necesita. numpy, matplotlib y los motores de
+estadísticas solo se importan con la opción 4 o con las acciones que los usan (factibilidad, simulación,
+pronóstico...), nunca al entrar a reactivos o experimentos. python -m benchmarks.arranque mide cuánto tarda en
+aparecer el menú y tests/test_arranque.py comprueba que no pase del presupuesto"""
+
+
+class Laboratorio:
+    """el contexto compartido y las gestiones, creados al usarlos por primera vez"""
+
+    def __init__(self):
+        self._contexto = None
+        self._reactivos = None
+        self._experimentos = None
+        self._resultados = None
+        self._estadisticas = None
+        self._consumo_pendiente = []  # consumos de experimentos realizados antes de abrir las estadísticas
+
+    @property
+    def contexto(self):
+        if self._contexto is None:
+            from contexto_laboratorio import ContextoLaboratorio
+            self._contexto = ContextoLaboratorio()
+            self._contexto.activar_guardado_automatico()  # los cambios se escriben en segundo plano, agrupados
+        return self._contexto
+
+    @property
+    def reactivos(self):
+        if self._reactivos is None:
+            from gestion_reactivos import GestionReactivos
+            self._reactivos = GestionReactivos(self.contexto)
+        return self._reactivos
+
+    @property
+    def experimentos(self):
+        if self._experimentos is None:
+            from gestion_experimentos import GestionExperimentos
+            self._experimentos = GestionExperimentos(self.contexto, self.reactivos)
+            self._experimentos.suscribir(self._anotar_consumo)
+        return self._experimentos
+
+    def _anotar_consumo(self, evento, experimento, consumo=None):
+        """las estadísticas se arman recién con la opción 4: las altas y bajas de experimentos las recuperan
+        comparando firmas, pero lo consumido al realizarlos no se puede recalcular y se suma al archivo"""
+        if self._estadisticas is None and evento in ("realizado", "realizados") and consumo:
+            self._consumo_pendiente.append(consumo)
+            if not self.contexto.diferir("consumo", self._guardar_consumo):
+                self._guardar_consumo()
+
+    def _guardar_consumo(self):
+        pendiente, self._consumo_pendiente = self._consumo_pendiente, []
+        if pendiente:
+            from contadores_estadisticas import sumar_consumo
+            total = {}
+            for consumo in pendiente:
+                for reactivo_id, cantidad in consumo.items():
+                    total[reactivo_id] = total.get(reactivo_id, 0) + cantidad
+            sumar_consumo("estadisticas.json", total)
+
+    @property
+    def resultados(self):
+        if self._resultados is None:
+            from gestion_resultados import GestionResultados
+            self._resultados = GestionResultados(self.contexto)
+        return self._resultados
+
+    @property
+    def estadisticas(self):
+        if self._estadisticas is None:
+            from gestion_estadisticas import GestionEstadisticas
+            self._guardar_consumo()
+            self._estadisticas = GestionEstadisticas(self.contexto, self.experimentos)
+        return self._estadisticas
+
+    def cerrar(self):
+        """escribe lo pendiente y la instantánea, que el próximo arranque abre en lugar del json"""
+        if self._contexto is not None:
+            self._contexto.cerrar()
 
 
 """función PRINCIPAL que gestiona el menú del sistema del laboratorio"""
 def main():
-    """se inicializan las gestiones"""
-    gestion_reactivos = GestionReactivos()
-    gestion_experimentos = GestionExperimentos()
-    gestion_resultados = GestionResultados()
-    gestion_estadisticas = GestionEstadisticas(gestion_experimentos)
-    
-    """se cargan los datos de los archivos json"""
-    while True:
-        try:
-            gestion_reactivos.cargar_reactivos_json("reactivos.json")
-            gestion_experimentos.cargar_experimentos_json("experimentos.json")
-            gestion_estadisticas.cargar_datos_json()  # aqui te seguras de que los datos se estan cargando correctamente
-            break  # se sale del bucle si la carga es exitosa
-        except FileNotFoundError as e:
-            print(f"Error: {e}. Asegúrate de que los archivos JSON existan y estén correctamente formateados.")
-            respuesta = input("¿Deseas intentar cargar los archivos nuevamente? (s/n): ")
-            if respuesta.lower() != 's':
-                return
-    
+    """las gestiones comparten un mismo contexto: cada archivo json se lee una sola vez, la primera vez que
+    alguna gestión lo necesita"""
+    if len(sys.argv) > 1:
+        """con argumentos se usa la línea de comandos en lugar de los menús (python main.py --help)"""
+        import cli
+        sys.exit(cli.ejecutar(sys.argv[1:]))
+
+    laboratorio = Laboratorio()
+
+    def ejecutar_opcion(opcion):
+        """ejecuta una acción del menú principal; devuelve False si la opción no existe"""
+        if opcion == "1":
+            print("\n*gestión de reactivos*")
+            laboratorio.reactivos.menu()
+        elif opcion == "2":
+            print("\n*gestión de experimentos*")
+            laboratorio.experimentos.menu()
+        elif opcion == "3":
+            print("\n*gestión de resultados*")
+            nombre_experimento = input("ingrese el nombre del experimento que desea evaluar "
+                                       "(* para evaluar todos, ? para ver las estadísticas de las mediciones): ")
+            if nombre_experimento == "*":
+                laboratorio.resultados.evaluar_experimentos()
+            elif nombre_experimento == "?":
+                laboratorio.resultados.mostrar_mediciones()
+            else:
+                laboratorio.resultados.evaluar_experimento(nombre_experimento)
+        elif opcion == "4":
+            print("\n*gestión de estadísticas*")
+            laboratorio.estadisticas.mostrar_estadisticas()
+            laboratorio.estadisticas.graficar_estadisticas()
+        else:
+            return False
+        return True
+
     """menú principal"""
     while True:
         print("\nbienvenido al sapulaboratorio, elige la opcion de lo que quieras gestionar: ")
@@ -34,27 +126,56 @@ def main():
         print("3. gestión de resultados")
         print("4. gestión de estadísticas")
         print("5. salir")
+        print("6. perfil de rendimiento")
         
         opcion = input("seleccione una opción: ")
         
-        if opcion == "1":
-            print("\n*gestión de reactivos*")
-            gestion_reactivos.menu()
+        if opcion == "5":
+            print("saliendo del sistema...")
+            laboratorio.cerrar()
+            break
+        elif opcion == "6":
+            print("\n*perfil de rendimiento*")
+            menu_perfil(ejecutar_opcion)
+        elif not ejecutar_opcion(opcion):
+            print("opción no válida. Intente nuevamente.")
+
+
+"""menú de las métricas (con LAB_PERFIL=1) y de la captura de una acción con cProfile o tracemalloc"""
+def menu_perfil(ejecutar_opcion):
+    while True:
+        print("\n1. ver métricas")
+        print("2. guardar métricas (json, o texto de Prometheus si el archivo termina en .prom)")
+        print("3. perfilar una acción del menú con cProfile")
+        print("4. medir la memoria de una acción del menú con tracemalloc")
+        print("5. reiniciar métricas")
+        print("6. volver al menú principal")
+        opcion = input("seleccione una opción: ")
+
+        if opcion in ("1", "2", "5") and not instrumentacion.ACTIVA:
+            print("las métricas están desactivadas; inicie el programa con la variable de entorno LAB_PERFIL=1")
+        elif opcion == "1":
+            instrumentacion.metricas.mostrar()
         elif opcion == "2":
-            print("\n*gestión de experimentos*")
-            gestion_experimentos.menu()
-        elif opcion == "3":
-            print("\n*gestión de resultados*")
-            nombre_experimento = input("ingrese el nombre del experimento que desea evaluar: ")
-            gestion_resultados.evaluar_experimento(nombre_experimento)
-        elif opcion == "4":
-            print("\n*gestión de estadísticas*")
-            gestion_estadisticas.mostrar_estadisticas()
-            gestion_estadisticas.graficar_estadisticas()
+            ruta = input("archivo de destino (metricas.json): ") or "metricas.json"
+            instrumentacion.metricas.volcar(ruta)
+            print(f"métricas guardadas en {ruta}")
+        elif opcion in ("3", "4"):
+            accion = input("acción del menú principal a capturar (1-4): ")
+            if accion not in ("1", "2", "3", "4"):
+                print("opción no válida.")
+                continue
+            modo = "cprofile" if opcion == "3" else "memoria"
+            ruta = input("archivo para guardar el perfil (vacío para no guardarlo): ") if modo == "cprofile" else None
+            instrumentacion.capturar(lambda: ejecutar_opcion(accion), modo, ruta or None)
         elif opcion == "5":
-            print("saliendo del sistema...")
+            instrumentacion.metricas.reiniciar()
+            print("métricas reiniciadas")
+        elif opcion == "6":
             break
         else:
             print("opción no válida. Intente nuevamente.")
 
-main()
\ No newline at end of file
+"""protegido para que los procesos de la evaluación en paralelo puedan importar este módulo sin abrir el menú"""
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,147 @@
+from array import array
+import numpy as np
+
+"""motor de estadísticas vectorizado: guarda los experimentos en columnas numpy y calcula los agregados sobre ellas"""
+
+
+def dias(fechas):
+    """textos YYYY-MM-DD a datetime64[D]; los que no se pueden leer (datos viejos o cargados a mano) quedan
+    como NaT y no cuentan en los agregados por mes"""
+    try:
+        return np.array(fechas, dtype="datetime64[D]")
+    except (ValueError, TypeError):
+        return np.array([_dia(fecha) for fecha in fechas], dtype="datetime64[D]")
+
+
+def _dia(fecha):
+    try:
+        return np.datetime64(fecha, "D")
+    except (ValueError, TypeError):
+        return np.datetime64("NaT", "D")
+
+
+class MotorEstadisticas:
+    def __init__(self, receta_id, fecha, costo, responsables_indptr, responsables_codigos, personas):
+        """recibe las columnas ya construidas; los responsables van en formato CSR
+        (los del experimento i son personas[responsables_codigos[indptr[i]:indptr[i+1]]])"""
+        self.receta_id = np.asarray(receta_id, dtype=np.int64)
+        self.fecha = np.asarray(fecha, dtype="datetime64[D]")
+        self.costo = np.asarray(costo, dtype=np.float64)
+        self.responsables_indptr = np.asarray(responsables_indptr, dtype=np.int64)
+        self.responsables_codigos = np.asarray(responsables_codigos, dtype=np.int64)
+        self.personas = list(personas)
+        self._meses = None  # columna de meses (se calcula la primera vez que se necesita)
+
+    @staticmethod
+    def desde_experimentos(experimentos):
+        """construye las columnas en una sola pasada a partir de los experimentos (diccionarios del json);
+        acepta una lista o un generador, como el de lector_json, sin guardar los diccionarios"""
+        receta_id, costo = array("q"), array("d")
+        """fechas y personas se codifican por orden de aparición, así cada texto distinto se guarda una vez"""
+        codigos_fecha, fechas = {}, array("q")
+        codigos_persona = {}
+        indptr, codigos = array("q", [0]), array("q")
+        for e in experimentos:
+            receta_id.append(e["receta_id"])
+            costo.append(e["costo_asociado"])
+            fechas.append(codigos_fecha.setdefault(e["fecha"], len(codigos_fecha)))
+            for persona in e["personas_responsables"]:
+                codigos.append(codigos_persona.setdefault(persona, len(codigos_persona)))
+            indptr.append(len(codigos))
+        fecha = dias(list(codigos_fecha))[np.frombuffer(fechas, dtype=np.int64)] if fechas else []
+        return MotorEstadisticas(receta_id, fecha, costo, indptr, codigos, codigos_persona)
+
+    def __len__(self):
+        return len(self.receta_id)
+
+    def _recetas_por_aparicion(self):
+        """ids de receta únicos (en orden de primera aparición) y cuántas veces aparece cada uno"""
+        if not len(self):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        conteos = np.bincount(self.receta_id)  # los ids de receta son enteros pequeños y no negativos
+        ids = np.flatnonzero(conteos)
+        """en una asignación con índices repetidos gana la última escritura, así que al recorrer
+        al revés queda guardada la primera aparición de cada receta"""
+        primero = np.empty(len(conteos), dtype=np.int64)
+        posiciones = np.arange(len(self) - 1, -1, -1)
+        primero[self.receta_id[::-1]] = posiciones
+        orden = np.argsort(primero[ids], kind="stable")
+        return ids[orden], conteos[ids][orden]
+
+    def frecuencia_recetas(self):
+        """{receta_id: número de experimentos}"""
+        ids, conteos = self._recetas_por_aparicion()
+        return dict(zip(ids.tolist(), conteos.tolist()))
+
+    def receta_mas_menos_frecuente(self):
+        """(receta más realizada, receta menos realizada) o (None, None) si no hay experimentos"""
+        if not len(self):
+            return None, None
+        ids, conteos = self._recetas_por_aparicion()
+        return int(ids[np.argmax(conteos)]), int(ids[np.argmin(conteos)])
+
+    def conteo_investigadores(self):
+        """número de experimentos por persona (indexado por código de persona)"""
+        return np.bincount(self.responsables_codigos, minlength=len(self.personas))
+
+    def top_investigadores(self, k=1):
+        """las k personas con más experimentos, de mayor a menor"""
+        conteos = self.conteo_investigadores()
+        if not len(conteos):
+            return []
+        k = min(k, len(conteos))
+        candidatos = np.argpartition(-conteos, k - 1)[:k]
+        candidatos = candidatos[np.lexsort((candidatos, -conteos[candidatos]))]
+        return [(self.personas[c], int(conteos[c])) for c in candidatos]
+
+    def uso_reactivos(self, recetas):
+        """{reactivo_id: veces que se usó}, contando una vez por reactivo de la receta de cada experimento"""
+        ids, conteos = self._recetas_por_aparicion()
+        frecuencia = dict(zip(ids.tolist(), conteos.tolist()))
+        reactivos, pesos = [], []
+        for receta in recetas:
+            veces = frecuencia.get(receta["id"], 0)
+            if veces:
+                for reactivo in receta.get("reactivos_utilizados", []):
+                    reactivos.append(reactivo["reactivo_id"])
+                    pesos.append(veces)
+        if not reactivos:
+            return {}
+        unicos, inversa = np.unique(np.array(reactivos, dtype=np.int64), return_inverse=True)
+        usos = np.bincount(inversa, weights=np.array(pesos, dtype=np.float64))
+        return dict(zip(unicos.tolist(), usos.astype(np.int64).tolist()))
+
+    def costo_total(self):
+        return float(self.costo.sum())
+
+    def costo_por_receta(self):
+        """{receta_id: (costo total, costo promedio)}"""
+        totales = np.bincount(self.receta_id, weights=self.costo)
+        conteos = np.bincount(self.receta_id)
+        ids = np.flatnonzero(conteos)
+        return {int(i): (float(totales[i]), float(totales[i] / conteos[i])) for i in ids}
+
+    def costo_por_mes(self):
+        """{"YYYY-MM": costo total} ordenado por mes"""
+        primer_mes, indices, validas = self._indices_mes()
+        totales = np.bincount(indices, weights=self.costo[validas])
+        conteos = np.bincount(indices)
+        return {str(primer_mes + i): float(totales[i]) for i in np.flatnonzero(conteos)}
+
+    def experimentos_por_mes(self):
+        """{"YYYY-MM": número de experimentos} ordenado por mes"""
+        primer_mes, indices, _ = self._indices_mes()
+        conteos = np.bincount(indices)
+        return {str(primer_mes + i): int(conteos[i]) for i in np.flatnonzero(conteos)}
+
+    def _indices_mes(self):
+        """primer mes con datos, para cada experimento con fecha cuántos meses después de ese cae, y la
+        máscara de los experimentos que tienen fecha"""
+        if self._meses is None:
+            validas = ~np.isnat(self.fecha)
+            self._meses = validas, self.fecha[validas].astype("datetime64[M]").astype(np.int64)
+        validas, meses = self._meses
+        if not len(meses):
+            return np.datetime64("NaT", "M"), np.zeros(0, dtype=np.int64), validas
+        primero = meses.min()
+        return np.datetime64(int(primero), "M"), meses - primero, validas
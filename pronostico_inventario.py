@@ -0,0 +1,126 @@
+import datetime
+import numpy as np
+
+"""pronóstico de agotamiento de reactivos a partir del historial de experimentos y lista de compras consolidada"""
+
+PERDIDA_MEDIA = (0.001 + 0.225) / 2  # pérdida promedio por corrida que se suma a la cantidad de la receta
+HORIZONTE_MAXIMO_DIAS = 100 * 365  # más lejos que esto se considera que no se llega nunca
+
+
+def _dia(fecha):
+    """la fecha YYYY-MM-DD de un experimento como date; None si no se puede leer (no cuenta para el historial)"""
+    try:
+        return datetime.date.fromisoformat(fecha)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fecha(desde, dias):
+    """la fecha YYYY-MM-DD a esa cantidad de días de desde; None si no se llega nunca (consumo 0) o si queda
+    más allá del horizonte máximo, donde timedelta o date se desbordarían con un consumo casi nulo"""
+    if not np.isfinite(dias) or dias > HORIZONTE_MAXIMO_DIAS:
+        return None
+    try:
+        return (desde + datetime.timedelta(days=max(int(dias), 0))).isoformat()
+    except OverflowError:
+        return None
+
+
+class PronosticoInventario:
+    def __init__(self, gestion_reactivos, almacen_recetas, obtener_experimentos):
+        """obtener_experimentos devuelve la lista actual de experimentos (se vuelve a pedir al rearmar)"""
+        self.gestion_reactivos = gestion_reactivos
+        self.almacen_recetas = almacen_recetas
+        self.obtener_experimentos = obtener_experimentos
+        self.reconstruir()
+
+    def reconstruir(self):
+        """arma la matriz receta × reactivo y acumula el consumo de todo el historial"""
+        experimentos = self.obtener_experimentos()
+        recetas = self.almacen_recetas.recetas()
+        self._recetas = recetas  # lista con la que se armó la matriz (ver _al_dia)
+        self._fila = {r["id"]: i for i, r in enumerate(recetas)}
+        self._columna = {}
+        for receta in recetas:
+            for reactivo in receta["reactivos_utilizados"]:
+                self._columna.setdefault(reactivo["reactivo_id"], len(self._columna))
+        self.demanda = np.zeros((len(recetas), len(self._columna)))
+        for receta in recetas:
+            for reactivo_id, cantidad_base in self.almacen_recetas.requerimientos_base(receta["id"]):
+                self.demanda[self._fila[receta["id"]], self._columna[reactivo_id]] += cantidad_base
+
+        filas = np.fromiter((self._fila.get(e["receta_id"], -1) for e in experimentos), dtype=np.int64, count=len(experimentos))
+        filas = filas[filas >= 0]
+        self.corridas = np.bincount(filas, minlength=len(recetas)).astype(np.float64)
+        self.consumo = self.corridas @ self.demanda * (1 + PERDIDA_MEDIA)
+        fechas = [dia for dia in map(_dia, (e["fecha"] for e in experimentos)) if dia is not None]
+        self.primera_fecha = min(fechas) if fechas else None
+        self.ultima_fecha = max(fechas) if fechas else None
+
+    def registrar_experimento(self, experimento, delta=1):
+        """actualiza el consumo acumulado con un experimento nuevo (delta=1) o eliminado (delta=-1)"""
+        fila = self._fila.get(experimento["receta_id"])
+        if fila is None:
+            return
+        self.corridas[fila] += delta
+        self.consumo += delta * self.demanda[fila] * (1 + PERDIDA_MEDIA)
+        fecha = _dia(experimento["fecha"])
+        if delta > 0 and fecha is not None:
+            self.primera_fecha = min(self.primera_fecha or fecha, fecha)
+            self.ultima_fecha = max(self.ultima_fecha or fecha, fecha)
+
+    def _al_dia(self):
+        """si el almacén releyó recetas.json, las cantidades de la matriz pueden haber cambiado: se rearma"""
+        if self.almacen_recetas.recetas() is not self._recetas:
+            self.reconstruir()
+
+    def al_cambiar_experimento(self, evento, experimento, **datos):
+        """observador de GestionExperimentos"""
+        if evento == "creado":
+            self.registrar_experimento(experimento, 1)
+        elif evento == "eliminado":
+            self.registrar_experimento(experimento, -1)
+
+    def dias_de_historial(self):
+        if self.primera_fecha is None:
+            return 1
+        return (self.ultima_fecha - self.primera_fecha).days + 1
+
+    def pronosticar(self, horizonte_dias=30, desde=None):
+        """para todos los reactivos a la vez: consumo diario, días hasta el mínimo sugerido y hasta agotarse,
+        y cuánto comprar para cubrir el horizonte sin bajar del mínimo (en la unidad de cada reactivo)"""
+        self._al_dia()
+        desde = desde or datetime.date.today()
+        repositorio = self.gestion_reactivos.repositorio
+        reactivos = [r for r in repositorio if r.id in self._columna]
+        columnas = np.fromiter((self._columna[r.id] for r in reactivos), dtype=np.int64, count=len(reactivos))
+        """las filas de esos reactivos en la tabla columnar del repositorio (indexar copia, no guarda vistas)"""
+        tabla = repositorio.tabla()
+        filas = np.fromiter((tabla.posicion(r.id) for r in reactivos), dtype=np.int64, count=len(reactivos))
+        inventario, minimo, costo = (tabla.columna(nombre)[filas] for nombre in ("inventario", "minimo", "costo"))
+
+        tasa = self.consumo[columnas] / self.dias_de_historial()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dias_minimo = np.where(tasa > 0, (inventario - minimo) / tasa, np.inf)
+            dias_agotado = np.where(tasa > 0, inventario / tasa, np.inf)
+        comprar = np.maximum(tasa * horizonte_dias + minimo - inventario, 0)
+        factores = np.fromiter((r.factor for r in reactivos), dtype=np.float64, count=len(reactivos))
+
+        pronostico = []
+        for i in np.argsort(dias_minimo, kind="stable"):
+            pronostico.append({
+                "id": reactivos[i].id,
+                "nombre": reactivos[i].nombre,
+                "consumo_diario": float(tasa[i] / factores[i]),
+                "fecha_minimo": _fecha(desde, dias_minimo[i]),
+                "fecha_agotado": _fecha(desde, dias_agotado[i]),
+                "comprar": float(comprar[i] / factores[i]),
+                "costo_compra": float(comprar[i] * costo[i]),
+                "unidad_medida": reactivos[i].unidad_medida
+            })
+        return pronostico
+
+    def lista_de_compras(self, horizonte_dias=30, desde=None):
+        """solo los reactivos que hay que reponer, con el costo total de la compra"""
+        compras = [p for p in self.pronosticar(horizonte_dias, desde) if p["comprar"] > 0]
+        return compras, sum(p["costo_compra"] for p in compras)
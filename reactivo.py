@@ -1,25 +1,107 @@
-"""representa un reactivo químico con sus propiedades y funciones asociadas"""
+import sys
+from unidades import CONVERSIONES, compatibles, factor_base
+
+"""todos los reactivos con la misma tabla de conversiones comparten la misma lista"""
+_tablas_conversion = {}
+
+def conversiones_compartidas(conversiones):
+    """devuelve una única lista compartida por cada tabla de conversiones distinta"""
+    clave = tuple((c["unidad"], c["factor"]) for c in conversiones)
+    return _tablas_conversion.setdefault(clave, conversiones)
+
+for _tabla in CONVERSIONES.values():
+    conversiones_compartidas(_tabla)
+
+
+"""representa un reactivo químico con sus propiedades y funciones asociadas.
+el inventario y el mínimo se guardan en la unidad base de su familia (mL, g); el costo es por unidad base.
+si el reactivo está en un repositorio, cada cambio de inventario se copia también a la fila de su tabla columnar"""
 class Reactivo:
+    __slots__ = ("id", "nombre", "descripcion", "costo", "categoria", "_inventario", "_tabla", "factor",
+                 "_unidad_medida", "fecha_caducidad", "minimo_base", "conversiones_posibles")
+
     def __init__(self, id, nombre, descripcion, costo, categoria, inventario_disponible, unidad_medida, fecha_caducidad, minimo_sugerido, conversiones_posibles):
         """inicializa un reactivo con su información básica, inventario y conversiones posibles"""
         self.id = id
+        self._tabla = None  # TablaReactivos del repositorio que lo contiene
         self.nombre = nombre
         self.descripcion = descripcion
         self.costo = costo
-        self.categoria = categoria
-        self.inventario_disponible = inventario_disponible
+        self.categoria = sys.intern(categoria)
         self.unidad_medida = unidad_medida
-        self.fecha_caducidad = fecha_caducidad
+        self.inventario_disponible = inventario_disponible
+        self.fecha_caducidad = sys.intern(fecha_caducidad)
         self.minimo_sugerido = minimo_sugerido
-        self.conversiones_posibles = conversiones_posibles
+        self.conversiones_posibles = conversiones_compartidas(conversiones_posibles)
+
+    @property
+    def unidad_medida(self):
+        return self._unidad_medida
+
+    @unidad_medida.setter
+    def unidad_medida(self, unidad):
+        """cambiar la unidad no cambia la cantidad guardada en unidades base, solo cómo se expresa"""
+        self._unidad_medida = sys.intern(unidad)
+        self.factor = factor_base(unidad)
+
+    @property
+    def inventario_base(self):
+        return self._inventario
+
+    @inventario_base.setter
+    def inventario_base(self, cantidad):
+        self._inventario = cantidad
+        if self._tabla is not None:
+            self._tabla.actualizar_inventario(self.id, cantidad)
+
+    @property
+    def inventario_disponible(self):
+        """inventario expresado en la unidad de medida actual"""
+        return self.inventario_base / self.factor
+
+    @inventario_disponible.setter
+    def inventario_disponible(self, cantidad):
+        self.inventario_base = cantidad * self.factor
+
+    @property
+    def minimo_sugerido(self):
+        return self.minimo_base / self.factor
+
+    @minimo_sugerido.setter
+    def minimo_sugerido(self, cantidad):
+        self.minimo_base = cantidad * self.factor
+
+    @staticmethod
+    def desde_dict(datos):
+        """crea un reactivo a partir de un diccionario con el formato de reactivos.json"""
+        return Reactivo(
+            datos["id"], datos["nombre"], datos["descripcion"], datos["costo"],
+            datos["categoria"], datos["inventario_disponible"], datos["unidad_medida"],
+            datos["fecha_caducidad"], datos["minimo_sugerido"], datos["conversiones_posibles"]
+        )
+
+    def a_dict(self):
+        """retorna el reactivo como diccionario con el formato de reactivos.json"""
+        return {
+            "id": self.id,
+            "nombre": self.nombre,
+            "descripcion": self.descripcion,
+            "costo": self.costo,
+            "categoria": self.categoria,
+            "inventario_disponible": self.inventario_disponible,
+            "unidad_medida": self.unidad_medida,
+            "fecha_caducidad": self.fecha_caducidad,
+            "minimo_sugerido": self.minimo_sugerido,
+            "conversiones_posibles": self.conversiones_posibles
+        }
 
     def cambiar_unidad(self, nueva_unidad):
-        """convierte el inventario a una nueva unidad de medida si es posible"""
-        for conversion in self.conversiones_posibles:
-            if conversion['unidad'] == nueva_unidad:
-                self.unidad_medida = nueva_unidad
-                self.inventario_disponible *= conversion['factor']
-                break
+        """cambia la unidad en que se expresa el inventario si es de la misma familia; devuelve si se pudo.
+        como las cantidades están en unidades base, los cambios encadenados (mL -> L -> uL) no acumulan error"""
+        if not compatibles(self.unidad_medida, nueva_unidad):
+            return False
+        self.unidad_medida = nueva_unidad
+        return True
 
     def mostrar_reactivo(self):
         """retorna una descripción detallada del reactivo"""
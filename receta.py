@@ -1,26 +1,36 @@
+from unidades import normalizar
+
 """representa una receta química con su objetivo, reactivos y procedimiento"""
 class Receta:
-    def __init__(self, id, nombre, objetivo, reactivos, procedimiento, valores_esperados):
+    def __init__(self, id, nombre, objetivo, reactivos, procedimiento, valores_esperados, requerimientos=None):
         """inicializa una receta con su nombre, objetivo, reactivos y valores esperados"""
         self.id = id
         self.nombre = nombre
         self.objetivo = objetivo
-        self.reactivos = reactivos   #esto es una lista de reactivos requeridos y sus cantidades
+        self.reactivos = reactivos   #esto es una lista de reactivos requeridos y sus cantidades (reactivo_id, cantidad_necesaria, unidad_medida)
         self.procedimiento = procedimiento
         self.valores_esperados = valores_esperados  # de los experimentos
+        """(reactivo_id, cantidad en unidades base) por cada reactivo; se calcula una vez al crear la receta"""
+        if requerimientos is None:
+            cantidades = normalizar([r['cantidad_necesaria'] for r in reactivos], [r['unidad_medida'] for r in reactivos])
+            requerimientos = list(zip([r['reactivo_id'] for r in reactivos], cantidades))
+        self.requerimientos = requerimientos
 
     def mostrar_receta(self):
         """retorna una descripción detallada de la receta"""
-        reactivos_info = "\n".join([f"{r['nombre']} - {r['cantidad']} {r['unidad']}" for r in self.reactivos])
+        reactivos_info = "\n".join([f"reactivo {r['reactivo_id']} - {r['cantidad_necesaria']} {r['unidad_medida']}" for r in self.reactivos])
         return f"receta: {self.nombre}\nobjetivo: {self.objetivo}\nreactivos:\n{reactivos_info}\nprocedimiento: {self.procedimiento}\nvalores esperados: {self.valores_esperados}"
 
-    def verificar_reactivos_disponibles(self, gestion_reactivos):
-        """comprueba si los reactivos requeridos están disponibles en inventario"""
-        for reactivo in self.reactivos:
-            reactivo_en_inventario = next((r for r in gestion_reactivos.reactivos if r.nombre == reactivo['nombre']), None)
+    def verificar_reactivos_disponibles(self, gestion_reactivos, fecha=None):
+        """comprueba si los reactivos requeridos están disponibles en inventario (y sin caducar en la fecha, si se indica)"""
+        caducados = gestion_reactivos.ids_caducados(fecha) if fecha else set()
+        for reactivo_id, cantidad_base in self.requerimientos:
+            reactivo_en_inventario = gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
+            if reactivo_en_inventario and reactivo_en_inventario.id in caducados:
+                return False, f"el reactivo {reactivo_en_inventario.nombre} está caducado ({reactivo_en_inventario.fecha_caducidad})"
             if reactivo_en_inventario:
-                if reactivo_en_inventario.inventario_disponible < reactivo['cantidad']:
-                    return False, f"falta el reactivo {reactivo['nombre']} en la cantidad necesaria"
+                if reactivo_en_inventario.inventario_base < cantidad_base:
+                    return False, f"falta el reactivo {reactivo_en_inventario.nombre} en la cantidad necesaria"
             else:
-                return False, f"el reactivo {reactivo['nombre']} no está disponible en inventario"
+                return False, f"el reactivo {reactivo_id} no está disponible en inventario"
         return True, "todos los reactivos están disponibles."
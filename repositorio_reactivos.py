@@ -0,0 +1,156 @@
+import bisect
+from reactivo import Reactivo
+from busqueda import IndiceBusqueda
+from tabla_reactivos import TablaReactivos
+
+"""repositorio en memoria de reactivos con índices por id, nombre, categoría y fecha de caducidad, y la tabla
+columnar de inventario, costo y mínimo para los recorridos de todo el inventario"""
+class RepositorioReactivos:
+    def __init__(self, reactivos=None):
+        """inicializa los índices vacíos y carga los reactivos iniciales si se indican"""
+        self._por_id = {}
+        self._por_nombre = {}
+        self._por_categoria = {}
+        self._caducidad = []  # lista ordenada de (fecha_caducidad, id); las fechas ISO se ordenan como texto
+        self._busqueda = None  # índice de trigramas, se arma la primera vez que se busca
+        self._tabla = TablaReactivos()
+        self._id_maximo = 0  # None si se eliminó el reactivo con el ID máximo (se recalcula al pedirlo)
+        if reactivos:
+            self.cargar(reactivos)
+
+    def __iter__(self):
+        return iter(self._por_id.values())
+
+    def __len__(self):
+        return len(self._por_id)
+
+    def __contains__(self, nombre):
+        return nombre in self._por_nombre
+
+    def cargar(self, reactivos):
+        """reemplaza el contenido del repositorio; acepta objetos Reactivo o diccionarios del json"""
+        self._por_id = {}
+        self._por_nombre = {}
+        self._por_categoria = {}
+        self._busqueda = None
+        self._tabla = TablaReactivos()
+        self._id_maximo = 0
+        for reactivo in reactivos:
+            if isinstance(reactivo, dict):
+                reactivo = Reactivo.desde_dict(reactivo)
+            if reactivo.id in self._por_id:
+                self._desindexar(self._por_id[reactivo.id])
+            self._indexar(reactivo)
+        self._caducidad = sorted((r.fecha_caducidad, r.id) for r in self._por_id.values())
+
+    def agregar(self, reactivo):
+        """registra un reactivo en todos los índices"""
+        if reactivo.id in self._por_id:
+            self._desindexar(self._por_id[reactivo.id])
+            self._quitar_caducidad(self._por_id[reactivo.id])
+        self._indexar(reactivo)
+        bisect.insort(self._caducidad, (reactivo.fecha_caducidad, reactivo.id))
+
+    def eliminar(self, nombre):
+        """quita un reactivo por nombre; devuelve el reactivo eliminado o None"""
+        reactivo = self._por_nombre.get(nombre)
+        if reactivo:
+            self._desindexar(reactivo)
+            self._quitar_caducidad(reactivo)
+            del self._por_id[reactivo.id]
+            self._tabla.quitar(reactivo.id)
+            if reactivo.id == self._id_maximo:
+                self._id_maximo = None
+        return reactivo
+
+    def actualizar(self, reactivo, **campos):
+        """aplica los cambios a un reactivo manteniendo los índices correctos (incluye renombrados)"""
+        self._desindexar(reactivo)
+        self._quitar_caducidad(reactivo)
+        for campo, valor in campos.items():
+            setattr(reactivo, campo, valor)
+        self._indexar(reactivo)
+        bisect.insort(self._caducidad, (reactivo.fecha_caducidad, reactivo.id))
+
+    def siguiente_id(self):
+        """ID para un reactivo nuevo: el máximo registrado más uno. el máximo se lleva al día con cada alta y
+        solo se vuelve a buscar si se eliminó justo ese reactivo"""
+        if self._id_maximo is None:
+            self._id_maximo = max(self._por_id, default=0)
+        return self._id_maximo + 1
+
+    def obtener_por_id(self, reactivo_id):
+        return self._por_id.get(reactivo_id)
+
+    def obtener_por_nombre(self, nombre):
+        return self._por_nombre.get(nombre)
+
+    def obtener_por_categoria(self, categoria):
+        return list(self._por_categoria.get(categoria, {}).values())
+
+    def categorias(self):
+        return list(self._por_categoria)
+
+    def caducan_antes(self, fecha):
+        """reactivos cuya fecha de caducidad es anterior a la fecha (YYYY-MM-DD), del más viejo al más nuevo"""
+        fin = bisect.bisect_left(self._caducidad, (fecha,))
+        return [self._por_id[reactivo_id] for _, reactivo_id in self._caducidad[:fin]]
+
+    def caducan_entre(self, desde, hasta):
+        """reactivos que caducan entre las dos fechas (ambas incluidas)"""
+        inicio = bisect.bisect_left(self._caducidad, (desde,))
+        fin = bisect.bisect_right(self._caducidad, (hasta, float("inf")))
+        return [self._por_id[reactivo_id] for _, reactivo_id in self._caducidad[inicio:fin]]
+
+    def tabla(self):
+        """la tabla columnar de todos los reactivos (ver TablaReactivos); sus vistas no se deben guardar"""
+        return self._tabla
+
+    def busqueda(self):
+        """índice de búsqueda aproximada por nombre, descripción y categoría; una vez armado se mantiene
+        al día con cada alta, cambio y baja"""
+        if self._busqueda is None:
+            self._busqueda = IndiceBusqueda()
+            self._busqueda.cargar(self._entrada_busqueda(r) for r in self._por_id.values())
+        return self._busqueda
+
+    def buscar_aproximado(self, texto, cantidad=10):
+        """[(reactivo, puntaje)] con los nombres más parecidos al texto"""
+        return [(self._por_id[i], puntaje) for i, puntaje in self.busqueda().buscar(texto, cantidad)]
+
+    def autocompletar(self, prefijo, cantidad=10):
+        return [self._por_id[i] for i in self.busqueda().autocompletar(prefijo, cantidad)]
+
+    @staticmethod
+    def _entrada_busqueda(reactivo):
+        return reactivo.id, reactivo.nombre, (reactivo.descripcion, reactivo.categoria)
+
+    def _indexar(self, reactivo):
+        self._por_id[reactivo.id] = reactivo
+        if self._id_maximo is not None and reactivo.id > self._id_maximo:
+            self._id_maximo = reactivo.id
+        self._por_nombre[reactivo.nombre] = reactivo
+        self._por_categoria.setdefault(reactivo.categoria, {})[reactivo.id] = reactivo
+        self._tabla.agregar(reactivo)
+        reactivo._tabla = self._tabla
+        if self._busqueda is not None:
+            self._busqueda.agregar(*self._entrada_busqueda(reactivo))
+
+    def _quitar_caducidad(self, reactivo):
+        i = bisect.bisect_left(self._caducidad, (reactivo.fecha_caducidad, reactivo.id))
+        if i < len(self._caducidad) and self._caducidad[i] == (reactivo.fecha_caducidad, reactivo.id):
+            del self._caducidad[i]
+
+    def _desindexar(self, reactivo):
+        """saca el reactivo de los índices secundarios (nombre y categoría); su fila de la tabla se actualiza
+        al volver a indexarlo, y mientras tanto (o si se reemplaza por otro objeto) deja de escribir en ella"""
+        reactivo._tabla = None
+        if self._por_nombre.get(reactivo.nombre) is reactivo:
+            del self._por_nombre[reactivo.nombre]
+        categoria = self._por_categoria.get(reactivo.categoria)
+        if categoria is not None:
+            categoria.pop(reactivo.id, None)
+            if not categoria:
+                del self._por_categoria[reactivo.categoria]
+        if self._busqueda is not None:
+            self._busqueda.quitar(reactivo.id)
@@ -0,0 +1,87 @@
+import numpy as np
+
+"""simulación monte carlo de un plan de experimentos: cuánto reactivo y cuánto dinero consumirá, con sus márgenes"""
+
+PERDIDA_MIN, PERDIDA_MAX = 0.001, 0.225  # pérdida de reactivo por corrida (0.1% a 22.5%), como en realizar_experimento
+ERROR_MIN, ERROR_MAX = 0.1, 22.5  # error simulado que suma Experimento.calcular_costo
+
+MAX_EXACTO = 32  # hasta este número de corridas se suman las uniformes una por una
+TAMANO_BLOQUE = 200_000  # ensayos por bloque, para acotar la memoria
+
+
+def suma_uniformes(rng, n, a, b, tamano):
+    """muestras de la suma de n uniformes(a, b) independientes.
+    con pocas corridas se suman de verdad; con muchas se usa la aproximación normal (teorema central del límite)"""
+    if n <= 0:
+        return np.zeros(tamano)
+    if n <= MAX_EXACTO:
+        return rng.uniform(a, b, size=(tamano, n)).sum(axis=1)
+    media = n * (a + b) / 2
+    desviacion = np.sqrt(n * (b - a) ** 2 / 12)
+    return rng.normal(media, desviacion, size=tamano)
+
+
+class SimuladorExperimentos:
+    def __init__(self, gestion_reactivos, almacen_recetas):
+        self.gestion_reactivos = gestion_reactivos
+        self.almacen_recetas = almacen_recetas
+
+    def simular(self, plan, ensayos=10_000, semilla=None):
+        """plan: {receta_id: número de corridas}. devuelve el consumo por reactivo (en unidades base) y el costo del plan
+        a lo largo de los ensayos (media, percentiles y probabilidad de llegar al mínimo sugerido)"""
+        rng = np.random.default_rng(semilla)
+
+        """demanda por reactivo: lista de (cantidad por corrida, número de corridas)"""
+        demanda = {}
+        costo_base = 0.0
+        corridas_totales = 0
+        for receta_id, corridas in plan.items():
+            receta = self.almacen_recetas.obtener_por_id(receta_id)
+            if receta is None:
+                raise ValueError(f"no se encontró la receta con ID {receta_id}")
+            corridas_totales += corridas
+            for reactivo_id, cantidad_base in self.almacen_recetas.requerimientos_base(receta_id):
+                demanda.setdefault(reactivo_id, []).append((cantidad_base, corridas))
+                reactivo_lab = self.gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
+                if reactivo_lab:
+                    costo_base += corridas * reactivo_lab.costo * cantidad_base
+
+        consumo = {reactivo_id: np.empty(ensayos) for reactivo_id in demanda}
+        costo = np.empty(ensayos)
+        for inicio in range(0, ensayos, TAMANO_BLOQUE):
+            tamano = min(TAMANO_BLOQUE, ensayos - inicio)
+            bloque = slice(inicio, inicio + tamano)
+            for reactivo_id, usos in demanda.items():
+                total = np.zeros(tamano)
+                for cantidad, corridas in usos:
+                    total += cantidad * (corridas + suma_uniformes(rng, corridas, PERDIDA_MIN, PERDIDA_MAX, tamano))
+                consumo[reactivo_id][bloque] = total
+            costo[bloque] = costo_base + suma_uniformes(rng, corridas_totales, ERROR_MIN, ERROR_MAX, tamano)
+
+        informe = {"ensayos": ensayos, "reactivos": {}, "costo": self._resumen(costo)}
+        for reactivo_id, muestras in consumo.items():
+            reactivo_lab = self.gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
+            resumen = self._resumen(muestras)
+            if reactivo_lab:
+                restante = reactivo_lab.inventario_base - muestras
+                resumen["nombre"] = reactivo_lab.nombre
+                resumen["prob_minimo"] = float(np.mean(restante <= reactivo_lab.minimo_base))
+                resumen["prob_agotado"] = float(np.mean(restante < 0))
+            else:
+                resumen["nombre"] = f"reactivo {reactivo_id}"
+                resumen["prob_minimo"] = resumen["prob_agotado"] = 1.0
+            informe["reactivos"][reactivo_id] = resumen
+        return informe
+
+    def _resumen(self, muestras):
+        p5, p50, p95 = np.percentile(muestras, [5, 50, 95])
+        return {"media": float(muestras.mean()), "p5": float(p5), "p50": float(p50), "p95": float(p95)}
+
+    def mostrar_simulacion(self, informe):
+        print(f"\nsimulación con {informe['ensayos']} ensayos")
+        costo = informe["costo"]
+        print(f"costo esperado: ${costo['media']:.2f} (P95: ${costo['p95']:.2f})")
+        print("consumo por reactivo (media / P95), probabilidad de llegar al mínimo y de agotarse:")
+        for resumen in informe["reactivos"].values():
+            print(f"  - {resumen['nombre']}: {resumen['media']:.2f} / {resumen['p95']:.2f}, "
+                  f"{resumen['prob_minimo']:.1%} mínimo, {resumen['prob_agotado']:.1%} agotado")
@@ -0,0 +1,78 @@
+import math
+import operator
+from array import array
+
+"""tabla columnar de reactivos (estructura de arreglos): las columnas numéricas viven en arrays contiguos
+y se pueden ver como arreglos numpy sin copiar, para recorrer todo el inventario de una vez (numpy se importa
+recién al pedir una vista).
+inventario y mínimo están en unidades base, igual que el costo. el repositorio de reactivos mantiene una al
+día con cada alta, cambio y baja, y cada reactivo copia a su fila los cambios de inventario"""
+class TablaReactivos:
+    def __init__(self):
+        self.ids = array("q")
+        self.inventario = array("d")
+        self.costo = array("d")
+        self.minimo = array("d")
+        self._posicion = {}
+
+    @staticmethod
+    def desde_reactivos(reactivos):
+        tabla = TablaReactivos()
+        for reactivo in reactivos:
+            tabla.agregar(reactivo)
+        return tabla
+
+    def __len__(self):
+        return len(self.ids)
+
+    def agregar(self, reactivo):
+        """agrega el reactivo al final de las columnas, o actualiza su fila si ya existe"""
+        i = self._posicion.get(reactivo.id)
+        if i is not None:
+            self.inventario[i] = reactivo.inventario_base
+            self.costo[i] = reactivo.costo
+            self.minimo[i] = reactivo.minimo_base
+            return
+        self._posicion[reactivo.id] = len(self.ids)
+        self.ids.append(reactivo.id)
+        self.inventario.append(reactivo.inventario_base)
+        self.costo.append(reactivo.costo)
+        self.minimo.append(reactivo.minimo_base)
+
+    def quitar(self, reactivo_id):
+        """saca la fila del reactivo; la última fila pasa a ocupar su lugar"""
+        i = self._posicion.pop(reactivo_id, None)
+        if i is None:
+            return
+        ultima = len(self.ids) - 1
+        if i != ultima:
+            self._posicion[self.ids[ultima]] = i
+            for columna in (self.ids, self.inventario, self.costo, self.minimo):
+                columna[i] = columna[ultima]
+        for columna in (self.ids, self.inventario, self.costo, self.minimo):
+            columna.pop()
+
+    def posicion(self, reactivo_id):
+        return self._posicion.get(reactivo_id)
+
+    def actualizar_inventario(self, reactivo_id, inventario):
+        self.inventario[self._posicion[reactivo_id]] = inventario
+
+    def columna(self, nombre):
+        """vista numpy (sin copia) de una columna: "ids", "inventario", "costo" o "minimo".
+        mientras exista una vista no se pueden agregar filas (array no puede crecer con buffers exportados)"""
+        import numpy as np
+        datos = getattr(self, nombre)
+        return np.frombuffer(datos, dtype=np.int64 if datos.typecode == "q" else np.float64)
+
+    def bajo_minimo(self):
+        """IDs de los reactivos con inventario en o por debajo del mínimo sugerido. recorre las columnas sin
+        numpy: al listar o revisar el inventario desde el menú cuesta menos que importarlo"""
+        return [i for i, inventario, minimo in zip(self.ids, self.inventario, self.minimo) if inventario <= minimo]
+
+    def valor_inventario(self):
+        """costo total del inventario disponible"""
+        return math.fsum(map(operator.mul, self.inventario, self.costo))
+
+    def memoria_bytes(self):
+        return sum(c.itemsize * len(c) for c in (self.ids, self.inventario, self.costo, self.minimo))
@@ -0,0 +1,18 @@
+import os
+import shutil
+import sys
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+@pytest.fixture
+def datos(tmp_path, monkeypatch):
+    """directorio temporal con una copia de los json del repositorio, como directorio actual"""
+    for archivo in ("reactivos.json", "recetas.json", "experimentos.json"):
+        shutil.copy(os.path.join(RAIZ, archivo), tmp_path / archivo)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LAB_ALMACENAMIENTO", "json")
+    monkeypatch.setenv("LAB_AUTOGUARDADO_MS", "0")
+    return tmp_path
@@ -0,0 +1,37 @@
+import json
+import os
+from almacen_recetas import AlmacenRecetas, obtener_almacen_recetas
+
+
+def _reescribir(nombre):
+    with open("recetas.json", encoding="utf-8") as f:
+        recetas = json.load(f)
+    recetas[0]["nombre"] = nombre
+    with open("recetas.json", "w", encoding="utf-8") as f:
+        json.dump(recetas, f)
+    return recetas
+
+
+def test_un_almacen_por_ruta(datos):
+    assert obtener_almacen_recetas("recetas.json") is obtener_almacen_recetas(os.path.abspath("recetas.json"))
+
+
+def test_relee_solo_si_el_archivo_cambia(datos):
+    almacen = AlmacenRecetas("recetas.json")
+    recetas = almacen.recetas()
+    assert almacen.recetas() is recetas
+
+    estado = os.stat("recetas.json")
+    _reescribir("Titulación renombrada")
+    os.utime("recetas.json", ns=(estado.st_atime_ns, estado.st_mtime_ns + 1))
+    assert almacen.recetas() is not recetas
+    assert almacen.obtener_por_nombre("Titulación renombrada")["id"] == recetas[0]["id"]
+    assert almacen.obtener_por_nombre(recetas[0]["nombre"]) is None
+
+
+def test_invalidar_obliga_a_releer(datos):
+    almacen = AlmacenRecetas("recetas.json")
+    recetas = almacen.recetas()
+    almacen.invalidar()
+    assert almacen.recetas() is not recetas
+    assert almacen.recetas() == recetas
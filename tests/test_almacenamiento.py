@@ -0,0 +1,115 @@
+import json
+import os
+import sqlite3
+import pytest
+from almacenamiento import AlmacenamientoDiario, cambio_agregar, cambio_eliminar, cambio_guardar, escribir_atomico
+from almacenamiento_sqlite import AlmacenamientoSQLite
+from contexto_laboratorio import ContextoLaboratorio
+from gestion_estadisticas import GestionEstadisticas
+
+
+def test_sqlite_sincroniza_recetas(datos):
+    almacenamiento = AlmacenamientoSQLite("laboratorio.db")
+    almacenamiento.guardar("experimentos.json", [
+        {"id": 1, "receta_id": 1, "personas_responsables": ["Ana"], "fecha": "2024-05-01", "costo_asociado": 1.0,
+         "resultado": ""}
+    ])
+    estadisticas = GestionEstadisticas(ContextoLaboratorio(almacenamiento))
+    with open("recetas.json", encoding="utf-8") as f:
+        recetas = json.load(f)
+    usados = {r["reactivo_id"] for r in recetas[0]["reactivos_utilizados"]}
+    assert set(almacenamiento.contar_uso_reactivos()) == set()
+    estadisticas.reactivos_mas_usados()
+    assert set(almacenamiento.contar_uso_reactivos()) == usados
+
+    """al cambiar recetas.json la tabla se vuelve a copiar"""
+    recetas[0]["reactivos_utilizados"] = recetas[0]["reactivos_utilizados"][:1]
+    with open("recetas.json", "w", encoding="utf-8") as f:
+        json.dump(recetas, f)
+    estadisticas.reactivos_mas_usados()
+    assert set(almacenamiento.contar_uso_reactivos()) == {recetas[0]["reactivos_utilizados"][0]["reactivo_id"]}
+    almacenamiento.cerrar()
+
+
+def test_diario_se_aplica_sobre_el_snapshot(tmp_path):
+    ruta = str(tmp_path / "resultados.json")
+    almacenamiento = AlmacenamientoDiario()
+    almacenamiento.guardar(ruta, [{"id": 1, "v": "a"}, {"id": 2, "v": "b"}, {"v": "sin id"}])
+    almacenamiento.guardar_cambios(ruta, [cambio_guardar({"id": 1, "v": "a2"}), cambio_eliminar(2),
+                                          cambio_guardar({"id": 3, "v": "c"}), cambio_agregar({"v": "nuevo"})], list)
+    with open(almacenamiento.ruta_diario(ruta), "a", encoding="utf-8") as f:
+        f.write('{"op": "put", "regis')  # escritura cortada
+    assert AlmacenamientoDiario().cargar(ruta) == [{"id": 1, "v": "a2"}, {"v": "sin id"}, {"id": 3, "v": "c"},
+                                                   {"v": "nuevo"}]
+    with open(almacenamiento.ruta_diario(ruta), encoding="utf-8") as f:
+        assert f.read().endswith("\n")
+
+
+def test_compactacion_cortada_no_repite_el_diario(tmp_path):
+    ruta = str(tmp_path / "resultados.json")
+    almacenamiento = AlmacenamientoDiario()
+    almacenamiento.guardar_cambios(ruta, [cambio_agregar({"v": 1}), cambio_agregar({"v": 2})], list)
+    assert almacenamiento.cargar(ruta) == [{"v": 1}, {"v": 2}]
+
+    """la compactación reemplazó el snapshot pero no llegó a reemplazar el diario"""
+    escribir_atomico(ruta, [{"v": 1}, {"v": 2}])
+    assert AlmacenamientoDiario().cargar(ruta) == [{"v": 1}, {"v": 2}]
+
+    almacenamiento.guardar_cambios(ruta, [cambio_agregar({"v": 3})], list)
+    assert AlmacenamientoDiario().cargar(ruta) == [{"v": 1}, {"v": 2}, {"v": 3}]
+    assert not os.path.exists(almacenamiento.ruta_diario(ruta) + ".tmp")
+
+
+def test_linea_danada_en_el_medio_no_se_descarta(tmp_path):
+    ruta = str(tmp_path / "reactivos.json")
+    almacenamiento = AlmacenamientoDiario()
+    almacenamiento.guardar_cambios(ruta, [cambio_guardar({"id": 1, "v": 1})], list)
+    with open(almacenamiento.ruta_diario(ruta), "a", encoding="utf-8") as f:
+        f.write("basura\n")
+    almacenamiento.guardar_cambios(ruta, [cambio_guardar({"id": 1, "v": 3})], list)
+    with open(almacenamiento.ruta_diario(ruta), "rb") as f:
+        antes = f.read()
+    with pytest.raises(ValueError):
+        AlmacenamientoDiario().cargar(ruta)
+    with open(almacenamiento.ruta_diario(ruta), "rb") as f:
+        assert f.read() == antes
+
+
+def test_ultima_linea_sin_salto_se_conserva(tmp_path):
+    ruta = str(tmp_path / "reactivos.json")
+    almacenamiento = AlmacenamientoDiario()
+    almacenamiento.guardar_cambios(ruta, [cambio_guardar({"id": 1, "v": 1})], list)
+    with open(almacenamiento.ruta_diario(ruta), "a", encoding="utf-8") as f:
+        f.write(json.dumps(cambio_guardar({"id": 2, "v": 2})))
+    assert AlmacenamientoDiario().cargar(ruta) == [{"id": 1, "v": 1}, {"id": 2, "v": 2}]
+    almacenamiento.guardar_cambios(ruta, [cambio_guardar({"id": 3, "v": 3})], list)
+    assert [r["id"] for r in AlmacenamientoDiario().cargar(ruta)] == [1, 2, 3]
+
+
+def test_sqlite_resultados_ida_y_vuelta(tmp_path):
+    resultados = [
+        {"experimento": 5, "experimento_id": 5, "evaluacion": {"pH": True}, "valores": {"pH": 7.0}},
+        {"experimento": "titulación", "experimento_id": 6, "evaluacion": {"pH": "no registrado"}, "valores": {}},
+        {"experimento": "anterior", "evaluacion": {"resultado": "ok"}},
+    ]
+    almacenamiento = AlmacenamientoSQLite(str(tmp_path / "laboratorio.db"))
+    almacenamiento.guardar("resultados.json", resultados[:2])
+    almacenamiento.guardar_cambios("resultados.json", [cambio_agregar(resultados[2])], list)
+    assert almacenamiento.cargar("resultados.json") == resultados
+
+
+def test_sqlite_convierte_la_tabla_de_resultados_anterior(tmp_path):
+    ruta = str(tmp_path / "laboratorio.db")
+    conexion = sqlite3.connect(ruta)
+    conexion.executescript("""
+        CREATE TABLE resultados (id INTEGER PRIMARY KEY AUTOINCREMENT, experimento TEXT, evaluacion TEXT);
+        CREATE INDEX idx_resultados_experimento ON resultados(experimento);
+        INSERT INTO resultados (experimento, evaluacion) VALUES ('titulación', '{"pH": true}');
+    """)
+    conexion.close()
+    almacenamiento = AlmacenamientoSQLite(ruta)
+    assert almacenamiento.cargar("resultados.json") == [{"experimento": "titulación", "evaluacion": {"pH": True}}]
+    almacenamiento.guardar_cambios("resultados.json", [cambio_agregar({"experimento": 2, "experimento_id": 2,
+                                                                        "evaluacion": {}, "valores": {}})], list)
+    assert almacenamiento.cargar("resultados.json")[-1] == {"experimento": 2, "experimento_id": 2, "evaluacion": {},
+                                                            "valores": {}}
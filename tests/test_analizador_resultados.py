@@ -0,0 +1,19 @@
+import json
+import os
+from almacen_recetas import AlmacenRecetas
+from analizador_resultados import AnalizadorResultados
+
+
+def test_recetas_nuevas_recompilan_y_vuelven_a_medir(datos):
+    analizador = AnalizadorResultados(AlmacenRecetas("recetas.json"))
+    experimento = {"id": 1, "receta_id": 1, "resultado": "pH final: 7.0, rendimiento: 92%. pureza: 99"}
+    assert analizador.mediciones(experimento) == {"pH_final": 7.0, "rendimiento": 92.0}
+
+    with open("recetas.json", encoding="utf-8") as f:
+        recetas = json.load(f)
+    recetas[0]["valores_a_medir"].append({"nombre": "pureza", "minimo": 95, "maximo": 100})
+    with open("recetas.json", "w", encoding="utf-8") as f:
+        json.dump(recetas, f)
+    os.utime("recetas.json", ns=(0, 1))
+
+    assert analizador.mediciones(experimento) == {"pH_final": 7.0, "rendimiento": 92.0, "pureza": 99.0}
@@ -0,0 +1,15 @@
+import os
+from benchmarks import arranque
+
+
+def test_reactivos_y_experimentos_no_importan_numpy(datos):
+    assert arranque.modulos_pesados() == "[]"
+    opciones = ("1", "4", "9", "2", "4", "9")  # listar reactivos y experimentos
+    assert arranque.modulos_pesados(opciones=opciones) == "[]"
+    """la segunda vez los experimentos se abren desde la instantánea que dejó la primera"""
+    assert os.path.exists("experimentos.snap")
+    assert arranque.modulos_pesados(opciones=opciones) == "[]"
+
+
+def test_el_menu_aparece_dentro_del_presupuesto(datos):
+    assert arranque.main(["--veces", "5"]) == 0
@@ -0,0 +1,23 @@
+from busqueda import IndiceBusqueda, elegir
+
+
+def test_buscar_sin_tildes_ni_errores():
+    indice = IndiceBusqueda()
+    indice.cargar([(1, "HCl (Ácido Clorhídrico) 0.1N", ()), (2, "Ácido Sulfúrico", ()), (3, "Etanol", ("alcohol",))])
+    assert indice.buscar("acido clorhidirco")[0][0] == 1
+    assert indice.buscar("alcohol")[0][0] == 3
+    assert indice.autocompletar("aci clo") == [1]
+    indice.quitar(1)
+    assert indice.autocompletar("aci clo") == []
+
+
+def test_elegir_exacto_no_busca():
+    def sugerir(texto, cantidad):
+        raise AssertionError("no hacía falta buscar")
+    assert elegir("Etanol", "exacto", sugerir) == "exacto"
+
+
+def test_elegir_sugerencia(monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda mensaje: "2")
+    sugerencias = lambda texto, cantidad: [("a", "Etanol"), ("b", "Metanol")]
+    assert elegir("etanl", None, sugerencias) == "b"
@@ -0,0 +1,38 @@
+import io
+import json
+import os
+import subprocess
+import sys
+from cli import OperacionesLaboratorio
+from conftest import RAIZ
+
+
+def test_lote_informa_el_error_al_guardar(datos, monkeypatch):
+    operaciones = OperacionesLaboratorio()
+
+    def disco_lleno():
+        raise OSError("no queda espacio en el disco")
+
+    monkeypatch.setattr(operaciones.contexto, "guardar_pendientes", disco_lleno)
+    salida = io.StringIO()
+    fallidas = operaciones.ejecutar_lote(['{"op": "buscar", "texto": "agua"}', '{"op": "nada"}'], salida)
+    informes = [json.loads(linea) for linea in salida.getvalue().splitlines()]
+    assert [informe["ok"] for informe in informes] == [True, False, False]
+    assert informes[-1] == {"op": "guardar", "ok": False, "error": "no queda espacio en el disco"}
+    assert fallidas == 2
+
+
+def test_factibilidad_con_fecha_informa_las_no_realizables(datos):
+    operaciones = OperacionesLaboratorio()
+    assert "no_realizables" not in operaciones.factibilidad()
+    informe = operaciones.factibilidad(fecha="9999-12-31")
+    assert informe["no_realizables"] and set(informe["no_realizables"]) == {
+        receta_id for receta_id, corridas in informe["maximo_corridas"].items() if corridas is not None
+    }
+    assert all(corridas in (0, None) for corridas in informe["maximo_corridas"].values())
+
+
+def test_menu_principal_sale_con_5(datos):
+    proceso = subprocess.run([sys.executable, os.path.join(RAIZ, "main.py")], input="5\n", capture_output=True,
+                             text=True, timeout=60)
+    assert proceso.returncode == 0 and "saliendo del sistema" in proceso.stdout
@@ -0,0 +1,101 @@
+import json
+import pytest
+from contadores_estadisticas import ContadoresEstadisticas, ConteoOrdenado, firma_experimentos
+from contexto_laboratorio import ContextoLaboratorio
+from gestion_estadisticas import GestionEstadisticas
+from gestion_experimentos import GestionExperimentos
+from instantanea import Instantanea, escribir_instantanea
+
+EXPERIMENTO = {"id": 7, "receta_id": 2, "personas_responsables": ["Ana", "Luis"], "fecha": "2024-05-01",
+               "costo_asociado": 3.5, "resultado": ""}
+
+
+def test_firma_cambia_con_los_campos_contados():
+    firma = firma_experimentos([EXPERIMENTO])
+    for cambio in ({"receta_id": 3}, {"costo_asociado": 3.25}, {"personas_responsables": ["Ana"]},
+                   {"personas_responsables": ["Luis", "Ana"]}, {"id": 8}):
+        assert firma_experimentos([dict(EXPERIMENTO, **cambio)]) != firma
+    assert firma_experimentos([dict(EXPERIMENTO, resultado="otro", fecha="2024-06-01")]) == firma
+
+
+def test_firma_de_la_instantanea(datos):
+    contexto = ContextoLaboratorio()
+    assert escribir_instantanea("prueba.snap", contexto.experimentos)
+    assert Instantanea("prueba.snap").firma() == firma_experimentos(contexto.experimentos)
+
+
+def test_firma_incremental():
+    contadores = ContadoresEstadisticas()
+    otro = dict(EXPERIMENTO, id=8, personas_responsables=[])
+    contadores.registrar_experimento(EXPERIMENTO, None)
+    contadores.registrar_experimento(otro, None)
+    contadores.quitar_experimento(EXPERIMENTO, None)
+    assert contadores.firma == firma_experimentos([otro])
+
+
+def test_quitar_sin_registrar_no_deja_negativos():
+    conteo = ConteoOrdenado()
+    conteo.sumar("Ana", -1)
+    assert len(conteo) == 0 and conteo.maximo() is None
+    contadores = ContadoresEstadisticas()
+    contadores.quitar_experimento(EXPERIMENTO, {"reactivos_utilizados": [{"reactivo_id": 1}]})
+    assert contadores.uso_reactivos == {} and len(contadores.investigadores) == 0
+
+
+def _editar(ruta, funcion):
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    funcion(datos)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False)
+
+
+def test_contadores_guardados_se_invalidan(datos):
+    GestionEstadisticas(ContextoLaboratorio())
+    assert json.load(open("estadisticas.json", encoding="utf-8"))["firma_recetas"]
+
+    """editar a mano un experimento (misma cantidad, mismos ids) obliga a recalcular"""
+    def cambiar_responsable(experimentos):
+        experimentos[0]["personas_responsables"] = ["Persona Nueva"] * 50
+    _editar("experimentos.json", cambiar_responsable)
+    estadisticas = GestionEstadisticas(ContextoLaboratorio())
+    assert estadisticas.investigador_mas_activo() == "Persona Nueva"
+
+    """y también cambiar los reactivos de una receta, aunque sea con el programa abierto"""
+    receta_id = estadisticas.experimento_mas_menos_frecuente()[0]
+    def cambiar_receta(recetas):
+        receta = next(r for r in recetas if r["id"] == receta_id)
+        receta["reactivos_utilizados"] = [{"reactivo_id": 999, "cantidad_necesaria": 1, "unidad_medida": "mL"}]
+    _editar("recetas.json", cambiar_receta)
+    assert "reactivo 999" in " ".join(estadisticas.reactivos_mas_usados())
+    assert 999 in dict(GestionEstadisticas(ContextoLaboratorio()).contadores.uso_reactivos)
+
+
+def test_contadores_siguen_los_eventos(datos):
+    contexto = ContextoLaboratorio()
+    experimentos = GestionExperimentos(contexto)
+    estadisticas = GestionEstadisticas(contexto, experimentos)
+    experimentos.agregar_experimento("nuevo", "Titulación Ácido-Base HCl-NaOH", ["Zoe"] * 40, "2024-05-02", "")
+    assert estadisticas.contadores.firma == firma_experimentos(contexto.experimentos)
+    assert estadisticas.investigador_mas_activo() == "Zoe"
+    experimentos.eliminar_experimento("nuevo")
+    assert estadisticas.contadores.firma == firma_experimentos(contexto.experimentos)
+    assert "Zoe" not in estadisticas.contadores.investigadores.conteos
+
+
+def test_consumo_antes_de_abrir_las_estadisticas(datos):
+    """las estadísticas se arman recién con la opción 4; lo consumido antes llega igual a los contadores,
+    aunque se recalculen porque los guardados no corresponden a los experimentos"""
+    from main import Laboratorio
+    laboratorio = Laboratorio()
+    consumido = {}
+
+    def anotar(evento, experimentos, consumo=None):
+        for reactivo_id, cantidad in (consumo or {}).items():
+            consumido[reactivo_id] = consumido.get(reactivo_id, 0) + cantidad
+
+    laboratorio.experimentos.suscribir(anotar)
+    assert laboratorio.experimentos.realizar_experimentos([1, 2, 3], todo_o_nada=False, semilla=1)["realizados"]
+    assert laboratorio._estadisticas is None and consumido
+    assert laboratorio.estadisticas.contadores.consumo_reactivos == pytest.approx(consumido)
+    assert laboratorio.estadisticas.contadores.firma == firma_experimentos(laboratorio.contexto.experimentos)
@@ -0,0 +1,76 @@
+import pytest
+from factibilidad import FactibilidadRecetas
+from reactivo import Reactivo
+from repositorio_reactivos import RepositorioReactivos
+
+"""matriz chica resuelta a mano (cantidades por corrida en gramos, que es la unidad base):
+    receta 1: A 2, B 1      receta 2: B 2, C 10      receta 3: A 3      receta 4: sin reactivos      receta 5: D 0.1
+inventario: A 10 g a $1, B 6 g a $2, C 100 g a $0.1 (caduca el 2024-06-01) y D 0.3 g a $1"""
+RECETAS = {1: [(1, 2), (2, 1)], 2: [(2, 2), (3, 10)], 3: [(1, 3)], 4: [], 5: [(4, 0.1)]}
+CADUCADO = "2025-01-01"
+
+
+class Reactivos:
+    def __init__(self):
+        self.repositorio = RepositorioReactivos([
+            Reactivo(1, "A", "", 1.0, "", 10, "g", "2030-01-01", 0, []),
+            Reactivo(2, "B", "", 2.0, "", 6, "g", "2030-01-01", 0, []),
+            Reactivo(3, "C", "", 0.1, "", 100, "g", "2024-06-01", 0, []),
+            Reactivo(4, "D", "", 1.0, "", 0.3, "g", "2030-01-01", 0, []),
+        ])
+
+    def obtener_reactivo_por_id(self, reactivo_id):
+        return self.repositorio.obtener_por_id(reactivo_id)
+
+    def ids_caducados(self, fecha):
+        return {r.id for r in self.repositorio.caducan_antes(fecha)}
+
+
+class Recetas:
+    def __init__(self):
+        self._recetas = [{"id": receta_id, "nombre": f"receta {receta_id}"} for receta_id in RECETAS]
+
+    def recetas(self):
+        return self._recetas
+
+    def requerimientos_base(self, receta_id):
+        return RECETAS[receta_id]
+
+
+def _factibilidad():
+    return FactibilidadRecetas(Reactivos(), Recetas())
+
+
+def test_maximo_corridas():
+    factibilidad = _factibilidad()
+    """0.3 / 0.1 da 2.9999... y tiene que contar como 3"""
+    assert factibilidad.maximo_corridas() == {1: 5, 2: 3, 3: 3, 4: None, 5: 3}
+    """con C caducado la receta 2 no se puede correr"""
+    assert factibilidad.maximo_corridas(CADUCADO) == {1: 5, 2: 0, 3: 3, 4: None, 5: 3}
+    """25% de pérdida: la receta 1 pide A 2.5 y B 1.25, la 3 pide A 3.75"""
+    assert factibilidad.maximo_corridas(perdida=0.25) == {1: 4, 2: 2, 3: 2, 4: None, 5: 2}
+
+
+def test_mezcla_voraz():
+    """precio de cada reactivo = 1 / inventario y uso de una corrida = suma de cantidad × precio:
+    receta 3 usa 0.3 del inventario, la 5 0.333, la 1 0.367 y la 2 0.433. en ese orden la 3 se lleva A
+    (3 corridas, queda 1 g), la 5 se lleva D, a la 1 ya no le alcanza A y la 2 usa B y C"""
+    factibilidad = _factibilidad()
+    corridas, costo = factibilidad.mezcla()
+    assert corridas == {3: 3, 5: 3, 2: 3}
+    assert costo == pytest.approx(3 * 3 + 3 * 0.1 + 3 * 5)
+    """preferir las baratas (la 5 cuesta $0.1 por corrida) cambia el orden pero no el resultado"""
+    assert factibilidad.mezcla("costo")[0] == corridas
+
+
+def test_mezcla_con_caducados_limites_y_pesos():
+    factibilidad = _factibilidad()
+    """C caducado: la receta 2 queda fuera y sobra B"""
+    assert factibilidad.mezcla(fecha=CADUCADO) == ({3: 3, 5: 3}, pytest.approx(9.3))
+    """con la receta 3 limitada a 1 corrida quedan 7 g de A para la 1 (3 corridas) y 3 g de B para una de la 2"""
+    corridas, costo = factibilidad.mezcla(limites={3: 1})
+    assert corridas == {3: 1, 5: 3, 1: 3, 2: 1}
+    assert costo == pytest.approx(3 + 0.3 + 3 * 4 + 5)
+    """peso 0 excluye a la receta 3 y la 1 se lleva todo A"""
+    corridas, _ = factibilidad.mezcla({3: 0}, fecha=CADUCADO)
+    assert corridas == {5: 3, 1: 5}
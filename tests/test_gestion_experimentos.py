@@ -0,0 +1,35 @@
+import json
+from gestion_experimentos import GestionExperimentos
+
+
+def _preparar(gestion, reactivo_id, cantidad_base):
+    reactivo = gestion.gestion_reactivos.obtener_reactivo_por_id(reactivo_id)
+    reactivo.inventario_base = cantidad_base
+    return {r.id: r.inventario_base for r in gestion.gestion_reactivos.reactivos}
+
+
+def test_lote_todo_o_nada_no_toca_el_inventario(datos):
+    gestion = GestionExperimentos()
+    reactivo_id, cantidad = gestion.almacen_recetas.requerimientos_base(1)[0]
+    antes = _preparar(gestion, reactivo_id, cantidad * 1.5)  # alcanza para una corrida de la receta 1, no para dos
+    with open("experimentos.json", encoding="utf-8") as f:
+        guardados = json.load(f)
+
+    informe = gestion.realizar_experimentos([1, 2, 3], semilla=1)
+    assert informe["realizados"] == [] and reactivo_id in informe["faltantes"]
+    assert {r.id: r.inventario_base for r in gestion.gestion_reactivos.reactivos} == antes
+    assert [e["resultado"] for e in gestion.experimentos] == [e["resultado"] for e in guardados]
+    with open("experimentos.json", encoding="utf-8") as f:
+        assert json.load(f) == guardados
+
+
+def test_lote_parcial_acepta_en_orden_lo_que_alcanza(datos):
+    gestion = GestionExperimentos()
+    reactivo_id, cantidad = gestion.almacen_recetas.requerimientos_base(1)[0]
+    _preparar(gestion, reactivo_id, cantidad * 1.5)
+
+    informe = gestion.realizar_experimentos([1, 2, 3], todo_o_nada=False, semilla=1)
+    assert informe["realizados"] == [1, 3]
+    assert informe["rechazados"] == {2: "reactivos insuficientes"}
+    restante = gestion.gestion_reactivos.obtener_reactivo_por_id(reactivo_id).inventario_base
+    assert cantidad * 0.275 <= restante <= cantidad * 0.499
@@ -0,0 +1,50 @@
+import json
+from almacenamiento_sqlite import AlmacenamientoSQLite
+from contexto_laboratorio import ContextoLaboratorio
+from gestion_resultados import GestionResultados
+
+
+def test_reemplaza_evaluaciones_sin_experimento_id(datos):
+    with open("experimentos.json", encoding="utf-8") as f:
+        experimentos = json.load(f)
+    experimentos[0]["nombre"] = "titulacion"
+    with open("experimentos.json", "w", encoding="utf-8") as f:
+        json.dump(experimentos, f)
+    with open("resultados.json", "w", encoding="utf-8") as f:
+        json.dump([{"experimento": "titulacion", "evaluacion": {}}, {"experimento": "otro", "evaluacion": {}}], f)
+
+    gestion = GestionResultados()
+    nuevos = gestion.evaluar_experimentos(experimento_ids=[experimentos[0]["id"]], procesos=1)
+    assert [r["experimento"] for r in gestion.resultados] == ["otro", "titulacion"]
+    assert gestion.resultados[-1] is nuevos[0]
+
+
+def test_reevaluar_en_sqlite_no_duplica(datos):
+    almacenamiento = AlmacenamientoSQLite("laboratorio.db")
+    almacenamiento.importar_json()
+    gestion = GestionResultados(ContextoLaboratorio(almacenamiento))
+    gestion.evaluar_experimentos(procesos=1)
+    gestion = GestionResultados(ContextoLaboratorio(almacenamiento))
+    nuevos = gestion.evaluar_experimentos(procesos=1)
+    assert almacenamiento.cargar("resultados.json") == nuevos
+
+
+def test_evaluar_dos_veces_deja_un_resultado(datos):
+    with open("experimentos.json", encoding="utf-8") as f:
+        experimentos = json.load(f)
+    experimentos[0]["nombre"] = "titulacion"
+    experimentos[1]["nombre"] = "segunda"
+    with open("experimentos.json", "w", encoding="utf-8") as f:
+        json.dump(experimentos, f)
+
+    gestion = GestionResultados()
+    gestion.evaluar_experimento("titulacion")
+    gestion.evaluar_experimento("segunda")
+    gestion.evaluar_experimento("titulacion")
+    assert [r["experimento"] for r in gestion.resultados] == ["segunda", "titulacion"]
+    with open("resultados.json", encoding="utf-8") as f:
+        assert [r["experimento"] for r in json.load(f)] == ["segunda", "titulacion"]
+
+    del gestion.contexto.experimentos[0]
+    assert gestion.experimento_por_nombre("titulacion") is None
+    assert gestion.experimento_por_nombre("segunda")["id"] == experimentos[1]["id"]
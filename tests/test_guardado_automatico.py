@@ -0,0 +1,38 @@
+import time
+from guardado_automatico import GuardadoAutomatico
+from contexto_laboratorio import ContextoLaboratorio
+
+
+def test_un_error_no_detiene_el_hilo():
+    guardado = GuardadoAutomatico(intervalo_ms=10)
+    escritas = []
+    intentos = []
+
+    def falla_una_vez():
+        intentos.append(1)
+        if len(intentos) == 1:
+            raise TypeError("Object of type set is not JSON serializable")
+        escritas.append("experimentos")
+
+    guardado.marcar("experimentos", falla_una_vez)
+    guardado.marcar("reactivos", lambda: escritas.append("reactivos"))
+    limite = time.monotonic() + 5
+    while len(escritas) < 2 and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert sorted(escritas) == ["experimentos", "reactivos"]
+    assert guardado._hilo.is_alive()
+    guardado.marcar("resultados", lambda: escritas.append("resultados"))
+    guardado.cerrar()
+    assert escritas[-1] == "resultados" and not guardado.pendientes()
+
+
+def test_descartar_los_guardados_del_lote(datos):
+    contexto = ContextoLaboratorio()
+    with open("reactivos.json", "rb") as f:
+        antes = f.read()
+    with contexto.lote():
+        contexto.repositorio.obtener_por_id(1).inventario_disponible = 0
+        contexto.guardar_reactivos()
+        assert contexto.descartar_pendientes() == ["reactivos"]
+    with open("reactivos.json", "rb") as f:
+        assert f.read() == antes
@@ -0,0 +1,77 @@
+import json
+from gestion_experimentos import GestionExperimentos
+
+
+def _datos():
+    with open("recetas.json", encoding="utf-8") as f:
+        recetas = json.load(f)
+    with open("experimentos.json", encoding="utf-8") as f:
+        experimentos = json.load(f)
+    return recetas, experimentos
+
+
+def _reactivo_mas_usado(recetas):
+    usos = {}
+    for receta in recetas:
+        for r in receta["reactivos_utilizados"]:
+            usos[r["reactivo_id"]] = usos.get(r["reactivo_id"], 0) + 1
+    return max(usos, key=usos.get)
+
+
+def test_impacto_y_experimentos_con_reactivo(datos):
+    recetas, experimentos = _datos()
+    reactivo_id = _reactivo_mas_usado(recetas)
+    usan = {r["id"] for r in recetas if any(u["reactivo_id"] == reactivo_id for u in r["reactivos_utilizados"])}
+    afectados = [e for e in experimentos if e["receta_id"] in usan]
+    desde = sorted(e["fecha"] for e in afectados)[len(afectados) // 2]
+
+    indice = GestionExperimentos().contexto.indice_reactivos
+    impacto = indice.impacto(reactivo_id, desde)
+    assert {r["id"] for r in impacto["recetas"]} == usan
+    assert impacto["experimentos"] == len(afectados)
+    assert impacto["programados"] == sorted(e["id"] for e in afectados if e["fecha"] >= desde)
+    assert indice.experimentos_con_reactivo(reactivo_id) == sorted(e["id"] for e in afectados)
+    assert indice.experimentos_con_reactivo(reactivo_id, desde) == impacto["programados"]
+
+
+def test_el_indice_sigue_altas_y_bajas(datos):
+    recetas, _ = _datos()
+    gestion = GestionExperimentos()
+    indice = gestion.contexto.indice_reactivos
+    for receta in recetas:
+        reactivo_id = receta["reactivos_utilizados"][0]["reactivo_id"]
+        antes = indice.experimentos_con_reactivo(reactivo_id)
+        experimento = gestion.registrar_experimento("nuevo", receta["nombre"], ["Ana"], "2024-01-02")
+        if experimento is not None:
+            break
+    assert experimento is not None
+    assert indice.experimentos_con_reactivo(reactivo_id) == sorted(antes + [experimento["id"]])
+    assert experimento["id"] in indice.impacto(reactivo_id, "2024-01-02")["programados"]
+    gestion.eliminar_experimento("nuevo")
+    assert indice.experimentos_con_reactivo(reactivo_id) == antes
+
+
+def test_no_elimina_un_reactivo_en_uso(datos):
+    recetas, _ = _datos()
+    gestion_reactivos = GestionExperimentos().gestion_reactivos
+    reactivo = gestion_reactivos.obtener_reactivo_por_id(_reactivo_mas_usado(recetas))
+    with open("reactivos.json", encoding="utf-8") as f:
+        guardados = f.read()
+
+    assert not gestion_reactivos.eliminar_reactivo(reactivo.nombre)
+    assert gestion_reactivos.obtener_reactivo_por_id(reactivo.id) is reactivo
+    with open("reactivos.json", encoding="utf-8") as f:
+        assert f.read() == guardados
+
+    assert gestion_reactivos.eliminar_reactivo(reactivo.nombre, forzar=True)
+    assert gestion_reactivos.obtener_reactivo_por_id(reactivo.id) is None
+
+
+def test_elimina_un_reactivo_sin_recetas(datos):
+    gestion_reactivos = GestionExperimentos().gestion_reactivos
+    gestion_reactivos.agregar_reactivo({
+        "nombre": "sin uso", "descripcion": "", "costo": 1.0, "categoria": "", "inventario_disponible": 1.0,
+        "unidad_medida": "g", "fecha_caducidad": "2099-01-01", "minimo_sugerido": 0.0
+    })
+    assert gestion_reactivos.eliminar_reactivo("sin uso")
+    assert gestion_reactivos.buscar_reactivo("sin uso") is None
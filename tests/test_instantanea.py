@@ -0,0 +1,60 @@
+import json
+import os
+import pytest
+from contexto_laboratorio import ContextoLaboratorio
+from gestion_experimentos import fecha_valida
+from gestion_estadisticas import GestionEstadisticas
+from instantanea import Instantanea, abrir_instantanea, escribir_instantanea
+from cli import OperacionesLaboratorio
+from contadores_estadisticas import firma_experimentos
+
+EXPERIMENTOS = [
+    {"id": 1, "nombre": "exp 1", "receta_id": 3, "personas_responsables": ["Ana", "Luis"], "fecha": "2024-05-01",
+     "costo_asociado": 2.5, "resultado": "pH 7"},
+    {"id": 2, "receta_id": 1, "personas_responsables": [], "fecha": "2024-06-30", "costo_asociado": 0.0,
+     "resultado": {"pH": 6.8}},
+]
+
+
+def test_ida_y_vuelta(tmp_path):
+    ruta = str(tmp_path / "experimentos.snap")
+    assert escribir_instantanea(ruta, EXPERIMENTOS)
+    instantanea = Instantanea(ruta)
+    assert instantanea.registros() == EXPERIMENTOS
+    assert instantanea.firma() == firma_experimentos(EXPERIMENTOS)
+
+
+def test_fecha_mala_no_escribe(tmp_path):
+    ruta = str(tmp_path / "experimentos.snap")
+    for fecha in ("01/06/2024", "2024-06", "2024-6-1", None):
+        assert not escribir_instantanea(ruta, EXPERIMENTOS + [dict(EXPERIMENTOS[0], id=3, fecha=fecha)])
+        assert not os.path.exists(ruta)
+
+
+def test_fecha_valida():
+    assert fecha_valida("2024-06-01")
+    assert not fecha_valida("01/06/2024")
+    assert not fecha_valida("20240601")
+    assert not fecha_valida(None)
+
+
+def test_json_con_fecha_mala_sigue_cargando(datos):
+    with open("experimentos.json", encoding="utf-8") as f:
+        experimentos = json.load(f)
+    experimentos[0]["fecha"] = "01/06/2024"
+    with open("experimentos.json", "w", encoding="utf-8") as f:
+        json.dump(experimentos, f)
+    for _ in range(2):
+        contexto = ContextoLaboratorio()
+        assert len(contexto.experimentos) == len(experimentos)
+        assert abrir_instantanea("experimentos.json") is None
+        estadisticas = GestionEstadisticas(contexto)
+        assert "01/06/2024" not in estadisticas.costo_por_mes()
+
+
+def test_cli_rechaza_fecha_mala(datos):
+    operaciones = OperacionesLaboratorio()
+    cantidad = len(operaciones.contexto.experimentos)
+    with pytest.raises(ValueError, match="fecha"):
+        operaciones.crear_experimento("exp", "Titulación Ácido-Base HCl-NaOH", ["Ana"], "01/06/2024")
+    assert len(operaciones.contexto.experimentos) == cantidad
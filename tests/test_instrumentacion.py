@@ -0,0 +1,70 @@
+import json
+import pytest
+import instrumentacion
+from instrumentacion import Metricas
+
+
+@pytest.fixture
+def metricas(monkeypatch):
+    metricas = Metricas()
+    monkeypatch.setattr(instrumentacion, "ACTIVA", True)
+    monkeypatch.setattr(instrumentacion, "metricas", metricas)
+    return metricas
+
+
+def test_medido_inactivo_no_envuelve(monkeypatch):
+    monkeypatch.setattr(instrumentacion, "ACTIVA", False)
+
+    def funcion():
+        return 1
+    assert instrumentacion.medido(funcion) is funcion
+
+
+def test_medido_cuenta_llamadas_y_errores(metricas):
+    @instrumentacion.medido
+    def dividir(a, b):
+        return a / b
+
+    assert dividir(6, 3) == 2
+    with pytest.raises(ZeroDivisionError):
+        dividir(1, 0)
+    operacion = metricas.a_dict()["operaciones"]["test_medido_cuenta_llamadas_y_errores.<locals>.dividir"]
+    assert operacion["llamadas"] == 2 and operacion["errores"] == 1
+    assert sum(operacion["histograma"].values()) == 2
+
+
+def test_histograma_y_bytes(metricas, tmp_path):
+    metricas.registrar("carga", 0.0002)
+    metricas.registrar("carga", 0.002)
+    metricas.registrar("carga", 10.0)
+    ruta = tmp_path / "reactivos.json"
+    ruta.write_text("[]", encoding="utf-8")
+    instrumentacion.contar_bytes("leidos", str(ruta))
+    instrumentacion.contar_bytes("escritos", str(ruta), 10)
+
+    datos = metricas.a_dict()
+    histograma = datos["operaciones"]["carga"]["histograma"]
+    assert (histograma["0.0005"], histograma["0.005"], histograma["+Inf"]) == (1, 1, 1)
+    assert datos["bytes"] == {"leidos": {"reactivos.json": 2}, "escritos": {"reactivos.json": 10}}
+    metricas.reiniciar()
+    assert metricas.a_dict() == {"operaciones": {}, "bytes": {"leidos": {}, "escritos": {}}}
+
+
+def test_volcar_prometheus_y_json(metricas, tmp_path):
+    metricas.registrar("guardar", 0.0002)
+    metricas.registrar("guardar", 0.02, error=True)
+    metricas.contar_bytes("escritos", "experimentos.json", 128)
+
+    metricas.volcar(str(tmp_path / "metricas.prom"))
+    lineas = (tmp_path / "metricas.prom").read_text(encoding="utf-8").splitlines()
+    assert 'lab_llamadas_total{operacion="guardar"} 2' in lineas
+    assert 'lab_errores_total{operacion="guardar"} 1' in lineas
+    assert 'lab_duracion_segundos_bucket{operacion="guardar",le="0.0005"} 1' in lineas
+    assert 'lab_duracion_segundos_bucket{operacion="guardar",le="0.05"} 2' in lineas
+    assert 'lab_duracion_segundos_bucket{operacion="guardar",le="+Inf"} 2' in lineas
+    assert 'lab_duracion_segundos_count{operacion="guardar"} 2' in lineas
+    assert 'lab_bytes_escritos_total{archivo="experimentos.json"} 128' in lineas
+
+    metricas.volcar(str(tmp_path / "metricas.json"))
+    with open(tmp_path / "metricas.json", encoding="utf-8") as f:
+        assert json.load(f) == metricas.a_dict()
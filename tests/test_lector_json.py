@@ -0,0 +1,42 @@
+import json
+import pytest
+import lector_json
+from lector_json import iterar_registros
+
+REGISTROS = [{"id": i, "nombre": f"reactivo {i}", "descripcion": "una\u2028dos\u0085tres\x0ccuatro"} for i in range(300)]
+
+
+def test_json_lines_con_separadores_unicode(tmp_path):
+    ruta = tmp_path / "reactivos.jsonl"
+    ruta.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in REGISTROS), encoding="utf-8")
+    assert list(iterar_registros(str(ruta), ("id", "nombre"))) == REGISTROS
+
+
+def test_arreglo_leido_por_bloques(tmp_path, monkeypatch):
+    monkeypatch.setattr(lector_json, "TAMANO_BLOQUE", 7)
+    ruta = tmp_path / "reactivos.json"
+    ruta.write_text(json.dumps(REGISTROS, ensure_ascii=False, indent=4), encoding="utf-8")
+    assert list(iterar_registros(str(ruta))) == REGISTROS
+
+
+def test_elemento_mal_escrito_falla_sin_leer_el_resto(tmp_path, monkeypatch):
+    monkeypatch.setattr(lector_json, "TAMANO_BLOQUE", 64)
+    leidos = []
+    ruta = tmp_path / "reactivos.json"
+    ruta.write_text('[{"id": 1}, {"id" 2}, ' + ", ".join(json.dumps(r) for r in REGISTROS) + "]", encoding="utf-8")
+    with open(ruta, encoding="utf-8") as f:
+        texto = f.read(64)
+        with pytest.raises(json.JSONDecodeError):
+            for registro in lector_json._leer_arreglo(f, texto, 1):
+                leidos.append(registro)
+        assert f.tell() == 64
+    assert leidos == [{"id": 1}]
+
+
+def test_elemento_demasiado_grande(tmp_path, monkeypatch):
+    monkeypatch.setattr(lector_json, "TAMANO_BLOQUE", 64)
+    monkeypatch.setattr(lector_json, "TAMANO_MAXIMO_REGISTRO", 1000)
+    ruta = tmp_path / "reactivos.json"
+    ruta.write_text('[{"id": 1, "nombre": "' + "x" * 5000 + '"}]', encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        list(iterar_registros(str(ruta)))
@@ -0,0 +1,66 @@
+import random
+from collections import Counter
+import pytest
+from instantanea import abrir_instantanea, escribir_instantanea
+from motor_estadisticas import MotorEstadisticas
+
+PERSONAS = ["Ana", "Luis", "Carla", "Pedro", "Sofía"]
+RECETAS = [{"id": 1, "reactivos_utilizados": [{"reactivo_id": 10}, {"reactivo_id": 11}]},
+           {"id": 2, "reactivos_utilizados": [{"reactivo_id": 11}]},
+           {"id": 5, "reactivos_utilizados": [{"reactivo_id": 12}, {"reactivo_id": 10}]}]
+
+
+def _experimentos(cantidad=500, semilla=7):
+    azar = random.Random(semilla)
+    return [{
+        "id": i, "receta_id": azar.choice([1, 2, 5, 5]), "personas_responsables": azar.sample(PERSONAS, azar.randint(0, 3)),
+        "fecha": f"2024-{azar.randint(1, 12):02d}-{azar.randint(1, 28):02d}" if i % 50 else "01/05/2024",
+        "costo_asociado": round(azar.uniform(0, 20), 2), "resultado": ""
+    } for i in range(1, cantidad + 1)]
+
+
+def _comprobar(motor, experimentos):
+    recetas = Counter(e["receta_id"] for e in experimentos)
+    assert motor.frecuencia_recetas() == dict(recetas)
+    assert motor.receta_mas_menos_frecuente() == (max(recetas, key=recetas.get), min(recetas, key=recetas.get))
+
+    personas = Counter(p for e in experimentos for p in e["personas_responsables"])
+    assert motor.top_investigadores(3) == sorted(personas.items(), key=lambda x: -x[1])[:3]
+
+    uso = Counter()
+    for e in experimentos:
+        for receta in RECETAS:
+            if receta["id"] == e["receta_id"]:
+                uso.update(r["reactivo_id"] for r in receta["reactivos_utilizados"])
+    assert motor.uso_reactivos(RECETAS) == dict(uso)
+
+    assert motor.costo_total() == pytest.approx(sum(e["costo_asociado"] for e in experimentos))
+    for receta_id, (total, promedio) in motor.costo_por_receta().items():
+        costos = [e["costo_asociado"] for e in experimentos if e["receta_id"] == receta_id]
+        assert (total, promedio) == pytest.approx((sum(costos), sum(costos) / len(costos)))
+
+    con_fecha = [e for e in experimentos if e["fecha"][4] == "-"]
+    meses = Counter(e["fecha"][:7] for e in con_fecha)
+    assert motor.experimentos_por_mes() == dict(sorted(meses.items()))
+    costos_mes = motor.costo_por_mes()
+    assert list(costos_mes) == sorted(meses)
+    for mes, total in costos_mes.items():
+        assert total == pytest.approx(sum(e["costo_asociado"] for e in con_fecha if e["fecha"].startswith(mes)))
+
+
+def test_agregados_iguales_a_contar_en_python():
+    experimentos = _experimentos()
+    _comprobar(MotorEstadisticas.desde_experimentos(iter(experimentos)), experimentos)
+
+
+def test_agregados_sobre_la_instantanea(tmp_path):
+    experimentos = [e for e in _experimentos() if e["id"] % 50]  # la instantánea solo guarda fechas válidas
+    ruta = str(tmp_path / "experimentos.snap")
+    assert escribir_instantanea(ruta, experimentos)
+    _comprobar(abrir_instantanea(ruta).motor(), experimentos)
+
+
+def test_sin_experimentos():
+    motor = MotorEstadisticas.desde_experimentos([])
+    assert motor.receta_mas_menos_frecuente() == (None, None)
+    assert motor.top_investigadores() == [] and motor.costo_por_mes() == {} and motor.experimentos_por_mes() == {}
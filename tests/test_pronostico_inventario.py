@@ -0,0 +1,36 @@
+import datetime
+import json
+import os
+from gestion_experimentos import GestionExperimentos
+from pronostico_inventario import HORIZONTE_MAXIMO_DIAS, PronosticoInventario, _fecha
+
+
+def test_fecha_fuera_del_horizonte_es_none():
+    hoy = datetime.date(2024, 5, 1)
+    assert _fecha(hoy, 30.7) == "2024-05-31"
+    assert _fecha(hoy, -3.0) == "2024-05-01"
+    assert _fecha(hoy, float("inf")) is None
+    assert _fecha(hoy, 1e300) is None
+    assert _fecha(hoy, HORIZONTE_MAXIMO_DIAS + 1) is None
+    assert _fecha(datetime.date(9999, 12, 1), HORIZONTE_MAXIMO_DIAS - 1) is None
+
+
+def test_se_rearma_si_cambian_las_recetas(datos):
+    gestion = GestionExperimentos()
+    pronostico = gestion.obtener_pronostico()
+    receta = gestion.almacen_recetas.recetas()[0]
+    reactivo_id = receta["reactivos_utilizados"][0]["reactivo_id"]
+    antes = {p["id"]: p["consumo_diario"] for p in pronostico.pronosticar(desde=datetime.date(2024, 1, 1))}
+
+    with open("recetas.json", encoding="utf-8") as f:
+        recetas = json.load(f)
+    for uso in recetas[0]["reactivos_utilizados"]:
+        uso["cantidad_necesaria"] *= 3
+    with open("recetas.json", "w", encoding="utf-8") as f:
+        json.dump(recetas, f)
+    os.utime("recetas.json", ns=(0, 1))
+
+    despues = {p["id"]: p["consumo_diario"] for p in pronostico.pronosticar(desde=datetime.date(2024, 1, 1))}
+    assert despues[reactivo_id] > antes[reactivo_id]
+    assert despues == {p["id"]: p["consumo_diario"] for p in PronosticoInventario(
+        gestion.gestion_reactivos, gestion.almacen_recetas, lambda: gestion.experimentos).pronosticar()}
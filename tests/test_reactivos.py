@@ -0,0 +1,74 @@
+import numpy as np
+from reactivo import Reactivo
+from repositorio_reactivos import RepositorioReactivos
+from tabla_reactivos import TablaReactivos
+from contexto_laboratorio import ContextoLaboratorio
+from gestion_reactivos import GestionReactivos
+from gestion_experimentos import GestionExperimentos
+
+
+def reactivo(id, nombre, inventario=100, minimo=10, costo=0.5, categoria="Ácidos", caducidad="2030-01-01"):
+    return Reactivo(id, nombre, "", costo, categoria, inventario, "mL", caducidad, minimo, [])
+
+
+def _igual_a_reconstruida(repositorio):
+    tabla = repositorio.tabla()
+    nueva = TablaReactivos.desde_reactivos(repositorio)
+    orden = np.argsort(tabla.columna("ids"))
+    orden_nueva = np.argsort(nueva.columna("ids"))
+    for nombre in ("ids", "inventario", "costo", "minimo"):
+        assert tabla.columna(nombre)[orden].tolist() == nueva.columna(nombre)[orden_nueva].tolist()
+
+
+def test_tabla_del_repositorio_al_dia():
+    repositorio = RepositorioReactivos([reactivo(1, "HCl"), reactivo(2, "NaOH"), reactivo(3, "Etanol")])
+    repositorio.obtener_por_id(2).inventario_base -= 95
+    assert repositorio.tabla().bajo_minimo() == [2]
+    repositorio.eliminar("HCl")
+    repositorio.obtener_por_id(3).inventario_disponible = 1
+    assert sorted(repositorio.tabla().bajo_minimo()) == [2, 3]
+    repositorio.actualizar(repositorio.obtener_por_id(3), costo=2.0, minimo_sugerido=0.5)
+    repositorio.agregar(reactivo(2, "NaOH", inventario=500))
+    assert repositorio.tabla().bajo_minimo() == []
+    _igual_a_reconstruida(repositorio)
+
+
+def test_reemplazado_no_escribe_en_la_tabla():
+    viejo = reactivo(1, "HCl")
+    repositorio = RepositorioReactivos([viejo])
+    repositorio.agregar(reactivo(1, "HCl", inventario=50))
+    viejo.inventario_base = 0
+    assert repositorio.tabla().columna("inventario").tolist() == [50]
+
+
+def test_experimentos_descuentan_en_la_tabla(datos):
+    contexto = ContextoLaboratorio()
+    gestion_reactivos = GestionReactivos(contexto)
+    experimentos = GestionExperimentos(contexto, gestion_reactivos)
+    with contexto.lote():
+        experimentos.realizar_experimentos([e["id"] for e in contexto.experimentos[:5]], todo_o_nada=False, semilla=1)
+        gestion_reactivos.reducir_inventario("Agua destilada", 1)
+    _igual_a_reconstruida(contexto.repositorio)
+
+
+def test_siguiente_id():
+    repositorio = RepositorioReactivos()
+    assert repositorio.siguiente_id() == 1
+    repositorio.cargar([reactivo(4, "HCl"), reactivo(2, "NaOH")])
+    assert repositorio.siguiente_id() == 5
+    repositorio.agregar(reactivo(9, "Etanol"))
+    repositorio.eliminar("NaOH")
+    assert repositorio.siguiente_id() == 10
+    repositorio.eliminar("Etanol")  # como antes: el ID del último eliminado se vuelve a usar
+    assert repositorio.siguiente_id() == 5
+    repositorio.cargar([reactivo(1, "Agua")])
+    assert repositorio.siguiente_id() == 2
+
+
+def test_agregar_reactivo_asigna_el_siguiente_id(datos):
+    gestion = GestionReactivos()
+    esperado = max(r.id for r in gestion.repositorio) + 1
+    datos = reactivo(None, "Nuevo").a_dict()
+    del datos["id"]
+    assert gestion.agregar_reactivo(datos).id == esperado
+    assert gestion.agregar_reactivo(dict(datos, nombre="Otro")).id == esperado + 1
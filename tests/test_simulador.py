@@ -0,0 +1,69 @@
+import math
+import pytest
+from reactivo import Reactivo
+from simulador import SimuladorExperimentos
+
+"""planes chicos contra valores calculados a mano. una corrida consume cantidad * (1 + U(0.001, 0.225)) de cada
+reactivo y suma U(0.1, 22.5) al costo; con 200000 ensayos la media y el P95 quedan a menos de 0.5% del valor exacto"""
+ENSAYOS = 200_000
+
+
+class Reactivos:
+    def __init__(self, *reactivos):
+        self.por_id = {r.id: r for r in reactivos}
+
+    def obtener_reactivo_por_id(self, reactivo_id):
+        return self.por_id.get(reactivo_id)
+
+
+class Recetas:
+    def __init__(self, requerimientos):
+        self.requerimientos = requerimientos
+
+    def obtener_por_id(self, receta_id):
+        return {"id": receta_id} if receta_id in self.requerimientos else None
+
+    def requerimientos_base(self, receta_id):
+        return self.requerimientos[receta_id]
+
+
+def _simulador(requerimientos, inventario=100):
+    reactivos = Reactivos(Reactivo(1, "NaCl", "", 0.5, "Sales", inventario, "g", "2030-01-01", 0, []))
+    return SimuladorExperimentos(reactivos, Recetas(requerimientos))
+
+
+def test_una_corrida():
+    informe = _simulador({1: [(1, 10)]}, inventario=12).simular({1: 1}, ENSAYOS, semilla=3)
+    consumo = informe["reactivos"][1]
+    assert consumo["media"] == pytest.approx(10 * (1 + 0.113), rel=5e-3)
+    assert consumo["p95"] == pytest.approx(10 * (1 + 0.001 + 0.95 * 0.224), rel=5e-3)
+    """se agota si la pérdida pasa del 20%: (0.225 - 0.2) / 0.224"""
+    assert consumo["prob_agotado"] == pytest.approx(0.025 / 0.224, abs=5e-3)
+    """costo: 10 g a $0.5 más el error"""
+    assert informe["costo"]["media"] == pytest.approx(5 + 11.3, rel=5e-3)
+    assert informe["costo"]["p95"] == pytest.approx(5 + 0.1 + 0.95 * 22.4, rel=5e-3)
+
+
+def test_dos_corridas_suman_una_triangular():
+    informe = _simulador({1: [(1, 10)]}).simular({1: 2}, ENSAYOS, semilla=3)
+    consumo = informe["reactivos"][1]
+    assert consumo["media"] == pytest.approx(10 * (2 + 2 * 0.113), rel=5e-3)
+    """la suma de dos U(0, w) pasa de s con probabilidad (2w - s)² / 2w², que es 0.05 en s = w (2 - √0.1)"""
+    assert consumo["p95"] == pytest.approx(10 * (2 + 0.002 + 0.224 * (2 - math.sqrt(0.1))), rel=5e-3)
+    assert consumo["prob_minimo"] == consumo["prob_agotado"] == 0.0
+
+
+def test_muchas_corridas_y_reactivo_desconocido():
+    """con más de 32 corridas la pérdida se aproxima con una normal; el reactivo 2 no está en el inventario"""
+    informe = _simulador({1: [(1, 2), (2, 1)]}).simular({1: 100}, ENSAYOS, semilla=3)
+    media, desviacion = 100 * 0.113, math.sqrt(100 * 0.224 ** 2 / 12)
+    assert informe["reactivos"][1]["media"] == pytest.approx(2 * (100 + media), rel=5e-3)
+    assert informe["reactivos"][1]["p95"] == pytest.approx(2 * (100 + media + 1.6449 * desviacion), rel=5e-3)
+    assert informe["reactivos"][2]["nombre"] == "reactivo 2" and informe["reactivos"][2]["prob_agotado"] == 1.0
+    """el costo solo cuenta los reactivos conocidos: 100 corridas de 2 g a $0.5"""
+    assert informe["costo"]["media"] == pytest.approx(100 + 100 * 11.3, rel=5e-3)
+
+
+def test_receta_inexistente():
+    with pytest.raises(ValueError):
+        _simulador({}).simular({7: 1}, 10)
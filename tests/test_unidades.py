@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from unidades import compatibles, convertir, factor_base, normalizar, unidad_base
+
+
+def test_factores_y_bases():
+    assert factor_base("L") == 1000 and factor_base("uL") == 0.001
+    assert factor_base("kg") == 1000 and factor_base("mg") == 0.001
+    assert unidad_base("L") == "mL" and unidad_base("kg") == "g"
+    assert factor_base("tabletas") == 1.0 and unidad_base("tabletas") == "tabletas"
+
+
+def test_convertir():
+    assert convertir(2.5, "L", "mL") == pytest.approx(2500)
+    assert convertir(1, "kg", "mg") == pytest.approx(1e6)
+    assert convertir(750, "uL", "L") == pytest.approx(0.00075)
+    assert compatibles("uL", "L") and not compatibles("mL", "g")
+    with pytest.raises(ValueError):
+        convertir(1, "L", "g")
+    with pytest.raises(ValueError):
+        convertir(1, "tabletas", "g")
+
+
+def test_normalizar():
+    base = normalizar([1, 2, 3, 4], ["L", "g", "mg", "tabletas"])
+    assert np.allclose(base, [1000, 2, 0.003, 4])
+    assert len(normalizar([], [])) == 0
@@ -0,0 +1,11 @@
+import unicodedata
+
+"""utilidades de texto compartidas por la búsqueda y la lectura de resultados"""
+
+
+def plegar(texto):
+    """minúsculas y sin tildes (los símbolos que no son ascii se descartan, no hacen falta para comparar)"""
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    return unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
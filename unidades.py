@@ -0,0 +1,66 @@
+"""motor de unidades: arma una sola vez el grafo de conversiones de cada familia (volumen, masa) y precalcula
+cuántas unidades base hay en cada unidad, para que inventarios y recetas se guarden internamente en unidades base"""
+
+"""unidad base de cada familia; las conversiones son aristas desde la base (1 base = factor unidades)"""
+BASES = {"volumen": "mL", "masa": "g"}
+CONVERSIONES = {
+    "volumen": [{"unidad": "L", "factor": 0.001}, {"unidad": "uL", "factor": 1000}],
+    "masa": [{"unidad": "kg", "factor": 0.001}, {"unidad": "mg", "factor": 1000}],
+}
+
+
+def _construir_grafo():
+    """recorre el grafo de cada familia desde su unidad base y devuelve {unidad: (familia, unidades base por unidad)}"""
+    grafo = {}
+    for familia, base in BASES.items():
+        grafo.setdefault(base, [])
+        for conversion in CONVERSIONES[familia]:
+            """cantidad en destino = cantidad en origen * factor, en ambos sentidos"""
+            grafo[base].append((conversion["unidad"], conversion["factor"]))
+            grafo.setdefault(conversion["unidad"], []).append((base, 1 / conversion["factor"]))
+
+    unidades = {}
+    for familia, base in BASES.items():
+        unidades[base] = (familia, 1.0)
+        pendientes = [base]
+        while pendientes:
+            unidad = pendientes.pop()
+            for vecina, factor in grafo[unidad]:
+                if vecina not in unidades:
+                    unidades[vecina] = (familia, unidades[unidad][1] / factor)
+                    pendientes.append(vecina)
+    return unidades
+
+
+UNIDADES = _construir_grafo()
+
+
+def familia(unidad):
+    """familia de la unidad; una unidad desconocida forma su propia familia (y es su propia base)"""
+    return UNIDADES[unidad][0] if unidad in UNIDADES else unidad
+
+
+def factor_base(unidad):
+    """cuántas unidades base hay en una unidad (1 para unidades desconocidas)"""
+    return UNIDADES[unidad][1] if unidad in UNIDADES else 1.0
+
+
+def unidad_base(unidad):
+    return BASES.get(familia(unidad), unidad)
+
+
+def compatibles(unidad, otra):
+    return familia(unidad) == familia(otra)
+
+
+def convertir(cantidad, desde, hacia):
+    """convierte una cantidad entre dos unidades de la misma familia"""
+    if not compatibles(desde, hacia):
+        raise ValueError(f"no se puede convertir de {desde} a {hacia}")
+    return cantidad * factor_base(desde) / factor_base(hacia)
+
+
+def normalizar(cantidades, unidades):
+    """pasa una lista de cantidades a unidades base de una vez; cada unidad distinta se busca una sola vez"""
+    factores = {u: factor_base(u) for u in set(unidades)}
+    return [float(c) * factores[u] for c, u in zip(cantidades, unidades)]